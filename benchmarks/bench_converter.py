@@ -0,0 +1,251 @@
+"""
+Suite de benchmarks del convertidor.
+Genera árboles sintéticos en tmpfs y en disco, mide cada operación en un
+proceso hijo aislado (archivos/s, MB/s, RSS máximo y llamadas al sistema) y
+guarda el resultado en JSON para comparar versiones.
+
+Uso:
+    python -m benchmarks.bench_converter --scale 0.05 --output benchmarks/baselines/local.json
+    python -m benchmarks.bench_converter --scale 0.05 --compare benchmarks/baselines/local.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from .synthetic_tree import PROFILES, generate_tree
+
+# Casos medibles (operación del convertidor)
+CASES = ('get_image_files_from_folder', 'convert_single_file', 'convert_multiple_files')
+
+# Métricas donde un valor mayor es mejor (el resto: menor es mejor)
+_HIGHER_IS_BETTER = {'files_per_sec', 'mb_per_sec'}
+
+# Métricas que se comparan con la línea base
+_COMPARED_METRICS = ('files_per_sec', 'mb_per_sec', 'peak_rss_kb', 'syscalls_read', 'syscalls_write')
+
+
+def _read_proc_io() -> Dict[str, int]:
+    """Contadores de E/S del proceso (Linux); vacío si no están disponibles."""
+    try:
+        with open('/proc/self/io') as f:
+            return {key: int(value) for key, value in
+                    (line.split(': ') for line in f.read().splitlines())}
+    except OSError:
+        return {}
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """RSS máximo del proceso en KB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa en bytes, Linux en KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _remove_outputs(root: str):
+    """Eliminar las subcarpetas de salida para que cada medición parta de cero."""
+    from src.image_converter import ImageConverter
+    names = {ext[1:] for ext in ImageConverter.TARGET_EXTENSIONS}
+    for directory, subdirs, _ in os.walk(root):
+        for name in [d for d in subdirs if d in names]:
+            shutil.rmtree(os.path.join(directory, name))
+            subdirs.remove(name)
+
+
+def run_case(case: str, root: str, workers: int) -> dict:
+    """
+    Ejecutar un caso en este proceso y devolver sus métricas.
+    Se llama en un proceso hijo para que el RSS y los contadores sean propios.
+    """
+    from src.image_converter import ImageConverter
+
+    _remove_outputs(root)
+    converter = ImageConverter(max_workers=workers)
+    files = converter.get_image_files_from_folder(root, recursive=True, sort=False)
+    total_bytes = sum(os.path.getsize(f) for f in files)
+
+    io_before = _read_proc_io()
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        if case == 'get_image_files_from_folder':
+            processed = len(converter.get_image_files_from_folder(root, recursive=True))
+            total_bytes = 0
+        elif case == 'convert_single_file':
+            processed = sum(1 for f in files if converter.convert_single_file(f, '.1'))
+        else:
+            processed, _ = converter.convert_multiple_files(files, '.1')
+    elapsed = time.perf_counter() - start
+    io_after = _read_proc_io()
+
+    result = {
+        'case': case,
+        'workers': workers,
+        'files': processed,
+        'bytes': total_bytes,
+        'seconds': round(elapsed, 6),
+        'files_per_sec': round(processed / elapsed, 2) if elapsed else None,
+        'mb_per_sec': round(total_bytes / elapsed / (1024 * 1024), 2) if elapsed and total_bytes else None,
+        'peak_rss_kb': _peak_rss_kb(),
+    }
+    if io_before:
+        result['syscalls_read'] = io_after['syscr'] - io_before['syscr']
+        result['syscalls_write'] = io_after['syscw'] - io_before['syscw']
+    _remove_outputs(root)
+    return result
+
+
+def _strace_total(args: List[str]) -> Optional[int]:
+    """Contar todas las llamadas al sistema de un comando con strace -c."""
+    strace = shutil.which('strace')
+    if strace is None:
+        return None
+    with tempfile.NamedTemporaryFile('r', suffix='.strace') as summary:
+        subprocess.run([strace, '-f', '-c', '-o', summary.name] + args,
+                       check=True, stdout=subprocess.DEVNULL)
+        match = re.search(r'^\S.*?\s(\d+)\s+(?:\d+\s+)?total$', summary.read(), re.MULTILINE)
+        return int(match.group(1)) if match else None
+
+
+def measure(case: str, root: str, workers: int, use_strace: bool) -> dict:
+    """Ejecutar un caso en un proceso hijo aislado."""
+    command = [sys.executable, '-m', 'benchmarks.bench_converter',
+               '--run-case', case, '--root', root, '--workers', str(workers)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if use_strace:
+        result['syscalls_total'] = _strace_total(command)
+    return result
+
+
+def _filesystems(selected: List[str]) -> Dict[str, str]:
+    """Carpetas base por tipo de sistema de archivos."""
+    bases = {}
+    if 'tmpfs' in selected and os.path.isdir('/dev/shm'):
+        bases['tmpfs'] = '/dev/shm'
+    if 'disk' in selected:
+        bases['disk'] = os.environ.get('BENCH_DISK_DIR', tempfile.gettempdir())
+    return bases
+
+
+def run_suite(args) -> dict:
+    """Generar los árboles y medir todos los casos."""
+    results = []
+    for fs_name, base in _filesystems(args.fs).items():
+        for profile in args.profiles:
+            root = tempfile.mkdtemp(prefix=f"bench-{profile}-", dir=base)
+            try:
+                tree = generate_tree(root, profile, args.seed, args.scale)
+                print(f"[{fs_name}] {profile}: {tree['files']} archivos, "
+                      f"{tree['bytes'] / (1024 * 1024):.1f} MB", file=sys.stderr)
+                for case in args.cases:
+                    for workers in args.workers:
+                        if case != 'convert_multiple_files' and workers != args.workers[0]:
+                            continue
+                        result = measure(case, root, workers, args.strace)
+                        result.update({'fs': fs_name, 'profile': profile})
+                        results.append(result)
+                        print(f"  {case} (x{workers}): {result['files_per_sec']} archivos/s, "
+                              f"{result['mb_per_sec']} MB/s", file=sys.stderr)
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'seed': args.seed,
+            'scale': args.scale,
+        },
+        'results': results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Comparar con una línea base.
+
+    Returns:
+        List[str]: Descripción de cada regresión mayor que la tolerancia
+    """
+    def key(result):
+        return result['fs'], result['profile'], result['case'], result['workers']
+
+    reference = {key(r): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        base = reference.get(key(result))
+        if base is None:
+            continue
+        for metric in _COMPARED_METRICS:
+            new, old = result.get(metric), base.get(metric)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in _HIGHER_IS_BETTER else change
+            if worse > tolerance:
+                regressions.append(f"{'/'.join(map(str, key(result)))} {metric}: "
+                                   f"{old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la suite."""
+    parser = argparse.ArgumentParser(description="Benchmarks del convertidor de extensiones")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(PROFILES),
+                        default=['tiny', 'deep', 'mixed'])
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--fs", nargs="+", choices=['tmpfs', 'disk'], default=['tmpfs', 'disk'])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--strace", action="store_true",
+                        help="Contar todas las llamadas al sistema con strace -c")
+    parser.add_argument("--output", help="Guardar los resultados en este JSON")
+    parser.add_argument("--compare", help="JSON de línea base con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="Empeoramiento relativo permitido (por defecto 10%%)")
+    # Uso interno: ejecutar un único caso en el proceso hijo
+    parser.add_argument("--run-case", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.root, args.workers[0])))
+        return 0
+
+    report = run_suite(args)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        return 1 if regressions else 0
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark del arranque en frío de los modos sin interfaz.
+Importa cada punto de entrada en un intérprete nuevo (varias veces, se toma
+la mediana), comprueba que no se cargan módulos pesados que ese modo no usa
+(tkinter, PIL, multiprocessing) y puede fallar si se supera un presupuesto
+en milisegundos o si se empeora respecto a una línea base.
+
+Uso:
+    python -m benchmarks.bench_import --output benchmarks/baselines/import.json
+    python -m benchmarks.bench_import --compare benchmarks/baselines/import.json
+    python -m benchmarks.bench_import --budget-ms 150
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+# Módulo de cada punto de entrada sin interfaz
+ENTRY_POINTS = {
+    'cli': 'src.cli',
+    'console': 'src.app',
+    'converter': 'src.image_converter',
+    'daemon': 'src.daemon',
+    'watch': 'src.watcher',
+}
+
+# Módulos que ningún modo sin interfaz debe cargar al importarse
+FORBIDDEN_MODULES = ('tkinter', 'PIL', 'multiprocessing')
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Programa del proceso hijo: importar y devolver el tiempo y los módulos cargados
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in {forbidden!r}
+                if any(m == name or m.startswith(name + '.') for m in sys.modules))
+print(json.dumps({{'ms': elapsed * 1000, 'forbidden': loaded}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    """
+    Importar un módulo en 'runs' intérpretes nuevos.
+
+    Returns:
+        dict: Mediana y mínimo en ms y módulos prohibidos cargados
+    """
+    times = []
+    forbidden = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, forbidden=FORBIDDEN_MODULES)],
+            cwd=_ROOT, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        times.append(result['ms'])
+        forbidden = result['forbidden']
+    return {'module': module, 'median_ms': round(statistics.median(times), 2),
+            'min_ms': round(min(times), 2), 'forbidden': forbidden}
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Comparar las medianas con una línea base.
+
+    Returns:
+        List[str]: Descripción de cada regresión mayor que la tolerancia
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base:
+            continue
+        old, new = base['median_ms'], result['median_ms']
+        change = (new - old) / old
+        if change > tolerance:
+            regressions.append(f"{name} ({result['module']}): {old} ms -> {new} ms ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del benchmark."""
+    parser = argparse.ArgumentParser(description="Tiempo de importación de los modos sin interfaz")
+    parser.add_argument("--entries", nargs="+", choices=sorted(ENTRY_POINTS),
+                        default=sorted(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=7, help="Intérpretes por punto de entrada")
+    parser.add_argument("--budget-ms", type=float,
+                        help="Fallar si la mediana de algún punto de entrada lo supera")
+    parser.add_argument("--output", help="Guardar los resultados en este JSON")
+    parser.add_argument("--compare", help="JSON de línea base con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Empeoramiento relativo permitido (por defecto 25%%)")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, dict] = {name: measure(ENTRY_POINTS[name], args.runs)
+                                for name in args.entries}
+    report = {'python': sys.version.split()[0], 'runs': args.runs, 'results': results}
+
+    failures = []
+    for name, result in results.items():
+        if result['forbidden']:
+            failures.append(f"{name} carga {', '.join(result['forbidden'])} al importarse")
+        if args.budget_ms is not None and result['median_ms'] > args.budget_ms:
+            failures.append(f"{name}: {result['median_ms']} ms supera el presupuesto "
+                            f"de {args.budget_ms} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Resultados guardados en {args.output}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            failures += compare(report, json.load(f), args.tolerance)
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    for line in failures:
+        print(f"REGRESIÓN {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
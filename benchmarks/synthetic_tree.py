@@ -0,0 +1,110 @@
+"""
+Generador reproducible de árboles de imágenes sintéticas.
+El contenido no necesita ser una imagen decodificable: el convertidor solo
+mira la extensión (salvo validación o transcodificación), así que se usan
+bloques pseudoaleatorios con una cabecera JPEG/PNG válida.
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+MB = 1024 * 1024
+
+# Cabeceras mínimas por extensión (suficientes para la validación por firma)
+_HEADERS = {
+    '.jpg': b'\xff\xd8\xff\xe0\x00\x10JFIF\x00',
+    '.png': b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR',
+    '.gif': b'GIF89a',
+    '.tiff': b'II*\x00',
+}
+_TRAILERS = {'.jpg': b'\xff\xd9', '.png': b'IEND\xaeB`\x82', '.gif': b';', '.tiff': b''}
+
+# Perfiles: lista de (número de archivos, tamaño mínimo, tamaño máximo, profundidad)
+PROFILES: Dict[str, List[Tuple[int, int, int, int]]] = {
+    # Muchos archivos diminutos en una sola carpeta
+    'tiny': [(20000, 512, 8 * 1024, 0)],
+    # Pocos archivos enormes
+    'huge': [(3, 512 * MB, 1024 * MB, 0)],
+    # Anidamiento profundo con archivos pequeños en cada nivel
+    'deep': [(200, 4 * 1024, 64 * 1024, 12)],
+    # Unos pocos archivos grandes entre mucho relleno pequeño
+    'mixed': [(8, 16 * MB, 96 * MB, 0), (500, 16 * 1024, 2 * MB, 2)],
+}
+
+
+def _random_block(rng: random.Random, size: int = MB) -> bytes:
+    """Bloque pseudoaleatorio reproducible (compatible con Python 3.8)."""
+    return rng.getrandbits(size * 8).to_bytes(size, 'little')
+
+
+def _write_file(path: str, size: int, block: bytes, extension: str, index: int):
+    """Escribir un archivo de tamaño exacto con cabecera y cierre de imagen."""
+    header = _HEADERS[extension] + index.to_bytes(8, 'little')
+    trailer = _TRAILERS[extension]
+    body = max(0, size - len(header) - len(trailer))
+    with open(path, 'wb') as f:
+        f.write(header[:size])
+        remaining = body
+        while remaining > 0:
+            chunk = block[:remaining]
+            f.write(chunk)
+            remaining -= len(chunk)
+        if size > len(header):
+            f.write(trailer[:size - len(header)])
+
+
+def generate_tree(root: str, profile: str, seed: int = 42, scale: float = 1.0) -> dict:
+    """
+    Generar un árbol sintético.
+
+    Args:
+        root: Carpeta donde crear el árbol (se crea si no existe)
+        profile: Nombre del perfil ('tiny', 'huge', 'deep' o 'mixed')
+        seed: Semilla para que el árbol sea idéntico entre ejecuciones
+        scale: Factor para el número de archivos; si es menor que 1 también
+            reduce los tamaños (ej: 0.01 en CI)
+
+    Returns:
+        dict: Descripción del árbol (archivos, bytes, semilla...)
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil no válido: {profile}")
+    rng = random.Random(f"{profile}:{seed}")
+    block = _random_block(rng)
+    extensions = sorted(_HEADERS)
+    total_files = 0
+    total_bytes = 0
+
+    for group, (count, min_size, max_size, depth) in enumerate(PROFILES[profile]):
+        count = max(1, int(count * scale))
+        for i in range(count):
+            level = rng.randint(0, depth) if depth else 0
+            directory = os.path.join(root, *[f"g{group}_d{d}" for d in range(level)])
+            os.makedirs(directory, exist_ok=True)
+            extension = extensions[rng.randrange(len(extensions))]
+            size = max(64, int(rng.randint(min_size, max_size) * (scale if scale < 1 else 1)))
+            _write_file(os.path.join(directory, f"img_{group}_{i:06d}{extension}"),
+                        size, block, extension, i)
+            total_files += 1
+            total_bytes += size
+
+    return {'profile': profile, 'seed': seed, 'scale': scale,
+            'files': total_files, 'bytes': total_bytes}
+
+
+def main():
+    """Generar un árbol desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Generar árboles de imágenes sintéticas")
+    parser.add_argument("root", help="Carpeta de destino")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="tiny")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+    print(json.dumps(generate_tree(args.root, args.profile, args.seed, args.scale), indent=2))
+
+
+if __name__ == "__main__":
+    main()
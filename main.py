@@ -10,7 +10,22 @@ import os
 # Agregar el directorio src al path para importar módulos
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.app import main
-
 if __name__ == "__main__":
-    main()
+    # Los modos sin interfaz se resuelven antes de cargar la aplicación: ni
+    # tkinter ni Pillow se importan salvo que se necesiten
+    if len(sys.argv) > 1 and sys.argv[1] == "convert":
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        from src.daemon import main as daemon_main
+        sys.exit(daemon_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        from src.watcher import main as watch_main
+        sys.exit(watch_main(sys.argv[2:]))
+    from src.app import (main, run_console_mode, parse_workers, parse_output_mode,
+                         parse_thumbnail_cache)
+    if len(sys.argv) > 1 and sys.argv[1] == "--console":
+        sys.exit(run_console_mode(parse_workers(sys.argv), parse_output_mode(sys.argv),
+                                  "--incremental" in sys.argv, "--dedup" in sys.argv,
+                                  "--validate" in sys.argv))
+    main(parse_thumbnail_cache(sys.argv))
@@ -5,19 +5,24 @@ Contiene la lógica principal del programa.
 
 import sys
 import os
-from .gui import ImageConverterGUI
 
 
-def main():
+def main(thumbnail_cache_dir=None):
     """
     Función principal del programa.
+    
+    Args:
+        thumbnail_cache_dir: Carpeta de la caché de miniaturas en disco (opcional)
     """
     print("¡Bienvenido al Convertidor de Extensiones de Imágenes!")
     print("Iniciando interfaz gráfica...")
     
     try:
+        # tkinter se importa solo aquí: los modos sin interfaz no lo necesitan
+        from .gui import ImageConverterGUI
+        
         # Inicializar y ejecutar la interfaz gráfica
-        app = ImageConverterGUI()
+        app = ImageConverterGUI(thumbnail_cache_dir)
         app.run()
         
         print("Aplicación cerrada correctamente.")
@@ -33,9 +38,17 @@ def main():
         return 1
 
 
-def run_console_mode():
+def run_console_mode(max_workers=1, output_mode="copy", incremental=False, dedup=False,
+                     validate_content=False):
     """
     Modo consola para el convertidor (alternativo).
+    
+    Args:
+        max_workers: Número de trabajadores para la conversión en paralelo
+        output_mode: Modo de salida (copy, hardlink, symlink, reflink o move)
+        incremental: Omitir los archivos sin cambios desde la última conversión
+        dedup: Enlazar los destinos de imágenes con contenido idéntico
+        validate_content: Rechazar archivos cuya firma no sea de una imagen
     """
     print("\n=== MODO CONSOLA ===")
     print("Convertidor de Extensiones de Imágenes")
@@ -43,7 +56,13 @@ def run_console_mode():
     
     from .image_converter import ImageConverter
     
-    converter = ImageConverter()
+    if output_mode not in ImageConverter.OUTPUT_MODES:
+        print(f"Modo de salida no válido: {output_mode}")
+        return 1
+    
+    converter = ImageConverter(max_workers=max_workers, output_mode=output_mode,
+                               incremental=incremental, dedup=dedup,
+                               validate_content=validate_content)
     
     # Obtener carpeta de entrada
     folder = input("\nIngresa la ruta de la carpeta con imágenes: ").strip()
@@ -79,9 +98,64 @@ def run_console_mode():
     return 0
 
 
+def parse_workers(argv):
+    """
+    Obtener el número de trabajadores de los argumentos (--workers N).
+    
+    Args:
+        argv: Lista de argumentos de línea de comandos
+        
+    Returns:
+        int: Número de trabajadores (1 si no se indica o no es válido)
+    """
+    if "--workers" in argv:
+        index = argv.index("--workers")
+        try:
+            return max(1, int(argv[index + 1]))
+        except (IndexError, ValueError):
+            print("Número de trabajadores no válido, usando 1.")
+    return 1
+
+
+def parse_output_mode(argv):
+    """
+    Obtener el modo de salida de los argumentos (--mode MODO).
+    
+    Args:
+        argv: Lista de argumentos de línea de comandos
+        
+    Returns:
+        str: Modo de salida ('copy' si no se indica)
+    """
+    if "--mode" in argv:
+        index = argv.index("--mode")
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return "copy"
+
+
+def parse_thumbnail_cache(argv):
+    """
+    Obtener la carpeta de la caché de miniaturas (--thumbnail-cache CARPETA).
+    
+    Args:
+        argv: Lista de argumentos de línea de comandos
+        
+    Returns:
+        str o None: Carpeta indicada (None = miniaturas solo en memoria)
+    """
+    if "--thumbnail-cache" in argv:
+        index = argv.index("--thumbnail-cache")
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return None
+
+
 if __name__ == "__main__":
     # Verificar argumentos de línea de comandos
     if len(sys.argv) > 1 and sys.argv[1] == "--console":
-        exit(run_console_mode())
+        exit(run_console_mode(parse_workers(sys.argv), parse_output_mode(sys.argv),
+                              "--incremental" in sys.argv, "--dedup" in sys.argv,
+                              "--validate" in sys.argv))
     else:
-        exit(main())
+        exit(main(parse_thumbnail_cache(sys.argv)))
@@ -0,0 +1,284 @@
+"""
+Salida en archivo comprimido: en lugar de crear un archivo por imagen, cada
+extensión de destino se escribe como entradas de un único tar (opcionalmente
+gzip o zstd) o zip. Cada origen se copia en flujo a su entrada, sin copias
+intermedias; si cambia durante la lectura, la entrada se retira del archivo
+(en tar.gz y tar.zst, que no se pueden rebobinar, se descarta el archivo).
+El tar no guarda nada por entrada en memoria. tarfile, zipfile y gzip se
+importan al crear el primer archivo para no retrasar el arranque de las
+conversiones que no los usan.
+"""
+
+import os
+import time
+from typing import BinaryIO, Optional, Sequence, Tuple
+
+from .copy_backends import fsync_path, temp_sibling
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional solo para .tar.zst
+    zstandard = None
+
+# Formatos de archivo disponibles
+ARCHIVE_FORMATS = ('tar', 'tar.gz', 'tar.zst', 'zip')
+
+# Tamaño de bloque al leer los orígenes
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+
+# tarfile.BLOCKSIZE y tarfile.RECORDSIZE
+_BLOCK = 512
+_RECORD = 20 * _BLOCK
+
+
+def check_archive_format(archive_format: str):
+    """
+    Comprobar que un formato de archivo existe y se puede escribir.
+
+    Raises:
+        ValueError: Si el formato no es válido o falta su dependencia
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Formato de archivo no válido: {archive_format}")
+    if archive_format == 'tar.zst' and zstandard is None:
+        raise ValueError("El formato tar.zst requiere el paquete 'zstandard'")
+
+
+def archive_path_for(archive_dir: str, target_extension: str, archive_format: str) -> str:
+    """Ruta del archivo de una extensión (ej: salida/1.tar.gz)."""
+    return os.path.join(archive_dir, f"{target_extension[1:]}.{archive_format}")
+
+
+def archive_entry_name(target_path: str, base_dir: str) -> str:
+    """
+    Nombre de una entrada: la ruta del destino relativa a base_dir si está
+    dentro, o la ruta absoluta sin la barra inicial (como hace tar).
+
+    Args:
+        target_path: Ruta que tendría el destino como archivo suelto
+        base_dir: Carpeta de referencia (la del archivo de salida)
+    """
+    target = os.path.abspath(target_path)
+    base = os.path.abspath(base_dir)
+    if os.path.commonpath([target, base]) == base:
+        name = os.path.relpath(target, base)
+    else:
+        name = os.path.splitdrive(target)[1].lstrip(os.sep)
+    return name.replace(os.sep, '/')
+
+
+class ArchiveWriter:
+    """
+    Archivo de salida de una extensión. Admite una entrada abierta a la vez:
+    begin(), write() por bloques y end(). Se escribe en un temporal que se
+    renombra al cerrar, así que nunca queda un archivo a medias con el nombre final.
+    """
+
+    def __init__(self, path: str, archive_format: str, fsync: bool = False):
+        """
+        Args:
+            path: Ruta final del archivo
+            archive_format: Uno de ARCHIVE_FORMATS
+            fsync: Forzar el archivo a disco antes de renombrarlo
+        """
+        check_archive_format(archive_format)
+        self.path = path
+        self.format = archive_format
+        self.fsync = fsync
+        self.entries = 0
+        self._temp_path = temp_sibling(path)
+        self._raw: BinaryIO = open(self._temp_path, 'wb')
+        self._stream: Optional[BinaryIO] = None
+        self._zip = None
+        self._entry: Optional[BinaryIO] = None
+        self._entry_size = 0
+        self._entry_start = (0, 0)
+        self._offset = 0
+        self._aborted = False
+
+        if archive_format == 'zip':
+            # Las imágenes ya están comprimidas: se guardan sin recomprimir.
+            # El índice central del zip guarda una entrada pequeña por archivo
+            import zipfile
+            self._zip = zipfile.ZipFile(self._raw, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        elif archive_format == 'tar.gz':
+            import gzip
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=6)
+        elif archive_format == 'tar.zst':
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+
+    def begin(self, name: str, size: int, mtime: float, mode: int = 0o644):
+        """
+        Abrir una entrada nueva.
+
+        Args:
+            name: Nombre de la entrada dentro del archivo
+            size: Tamaño exacto de los datos que se escribirán
+            mtime: Fecha de modificación
+            mode: Permisos
+        """
+        if self._aborted:
+            raise OSError(f"El archivo se descartó: {self.path}")
+        if self._entry is not None or self._entry_size:
+            raise RuntimeError("Ya hay una entrada abierta")
+        if self._zip is not None:
+            import zipfile
+            # Dónde empieza la entrada, por si hay que retirarla con discard()
+            self._entry_start = (self._zip.start_dir, self._offset)
+            info = zipfile.ZipInfo(name, date_time=_zip_date(mtime))
+            info.external_attr = (mode & 0o7777) << 16
+            info.file_size = size
+            self._entry = self._zip.open(info, 'w', force_zip64=size >= zipfile.ZIP64_LIMIT)
+        else:
+            import tarfile
+            self._entry_start = (self._raw.tell(), self._offset)
+            info = tarfile.TarInfo(name)
+            info.size = size
+            info.mtime = int(mtime)
+            info.mode = mode & 0o7777
+            header = info.tobuf(tarfile.PAX_FORMAT)
+            self._stream.write(header)
+            self._offset += len(header)
+        self._entry_size = size
+
+    def write(self, data):
+        """Escribir un bloque de datos de la entrada abierta."""
+        if self._entry is not None:
+            self._entry.write(data)
+        else:
+            self._stream.write(data)
+            self._offset += len(data)
+
+    def end(self):
+        """Cerrar la entrada abierta."""
+        if self._entry is not None:
+            self._entry.close()
+            self._entry = None
+        else:
+            remainder = self._entry_size % _BLOCK
+            if remainder:
+                self._stream.write(b'\0' * (_BLOCK - remainder))
+                self._offset += _BLOCK - remainder
+        self._entry_size = 0
+        self.entries += 1
+
+    def discard(self):
+        """
+        Retirar la entrada abierta como si no se hubiera empezado: el tar y el
+        zip sin comprimir se recortan hasta donde empezaba. Un tar.gz o
+        tar.zst no se puede rebobinar, así que se descarta el archivo entero.
+
+        Raises:
+            OSError: Si se tuvo que descartar el archivo
+        """
+        if self._stream is not None and self._stream is not self._raw:
+            self.abort()
+            raise OSError(f"No se puede retirar una entrada de {self.format}; "
+                          f"archivo descartado: {self.path}")
+        position, self._offset = self._entry_start
+        if self._entry is not None:
+            # Cerrar la entrada la añade al índice del zip: se quita de nuevo
+            self._entry.close()
+            self._entry = None
+            info = self._zip.filelist.pop()
+            del self._zip.NameToInfo[info.filename]
+            self._zip.start_dir = position
+        self._raw.seek(position)
+        self._raw.truncate()
+        self._entry_size = 0
+
+    def add_bytes(self, name: str, data: bytes, mtime: float, mode: int = 0o644):
+        """Añadir una entrada completa ya en memoria (ej: una imagen recodificada)."""
+        self.begin(name, len(data), mtime, mode)
+        self.write(data)
+        self.end()
+
+    def close(self):
+        """Terminar el archivo y renombrarlo a su ruta final."""
+        if self._raw.closed:
+            if self._aborted:
+                raise OSError(f"El archivo se descartó: {self.path}")
+            return
+        if self._zip is not None:
+            self._zip.close()
+        else:
+            # Fin de archivo: dos bloques vacíos y relleno hasta el registro
+            self._stream.write(b'\0' * (2 * _BLOCK))
+            self._offset += 2 * _BLOCK
+            remainder = self._offset % _RECORD
+            if remainder:
+                self._stream.write(b'\0' * (_RECORD - remainder))
+            if self._stream is not self._raw:
+                self._stream.close()
+        self._raw.close()
+        if self.fsync:
+            fsync_path(self._temp_path)
+        os.replace(self._temp_path, self.path)
+        if self.fsync:
+            fsync_path(os.path.dirname(os.path.abspath(self.path)), directory=True)
+
+    def abort(self):
+        """Descartar el archivo sin terminar."""
+        self._aborted = True
+        if not self._raw.closed:
+            self._raw.close()
+        if os.path.exists(self._temp_path):
+            os.unlink(self._temp_path)
+
+
+def stream_file(source_path: str, entries: Sequence[Tuple[ArchiveWriter, str]],
+                size: int, mtime: float, mode: int = 0o644, hasher=None):
+    """
+    Copiar un origen a una entrada de cada archivo con una sola lectura.
+    Si el origen se acorta, crece o falla a mitad de lectura, las entradas se
+    retiran de los archivos (ver ArchiveWriter.discard) y se lanza el error.
+
+    Args:
+        source_path: Ruta del archivo origen
+        entries: Pares (archivo, nombre de la entrada)
+        size: Tamaño del origen según su stat
+        mtime: Fecha de modificación del origen
+        mode: Permisos de las entradas
+        hasher: Objeto hash que recibe el contenido leído (opcional)
+
+    Raises:
+        OSError: Si el origen no se pudo leer completo o cambió de tamaño
+    """
+    begun = []
+    with open(source_path, 'rb') as source:
+        try:
+            for writer, name in entries:
+                writer.begin(name, size, mtime, mode)
+                begun.append(writer)
+            remaining = size
+            while remaining:
+                chunk = source.read(min(ARCHIVE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if hasher is not None:
+                    hasher.update(chunk)
+                for writer in begun:
+                    writer.write(chunk)
+                remaining -= len(chunk)
+            if remaining or source.read(1):
+                raise OSError(f"El archivo cambió durante la lectura: {source_path}")
+        except BaseException as error:
+            discarded = []
+            for writer in begun:
+                try:
+                    writer.discard()
+                except OSError as e:
+                    discarded.append(e)
+            if discarded:
+                raise discarded[0] from error
+            raise
+    for writer in begun:
+        writer.end()
+
+
+def _zip_date(mtime: float):
+    """Fecha para el zip (no admite años anteriores a 1980)."""
+    year, month, day, hour, minute, second = time.localtime(max(mtime, 315532800))[:6]
+    return year, month, day, hour, minute, second
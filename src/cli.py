@@ -0,0 +1,234 @@
+"""
+Interfaz de línea de comandos no interactiva.
+Acepta carpetas, patrones glob o una lista de rutas por stdin (separadas por
+salto de línea o NUL) y escribe un resultado JSON por archivo en stdout, de
+modo que se puede encadenar con xargs, GNU parallel, jq, etc.
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+from typing import IO, Iterator, List, Optional
+
+from .image_converter import ImageConverter
+from .planner import CollisionError
+from .transcoder import MAX_PIXELS, TRANSCODE_FORMATS, TranscodeOptions
+
+# Códigos de salida
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+# Tamaño de bloque al leer la lista de rutas de stdin
+_STDIN_CHUNK_SIZE = 64 * 1024
+
+_GLOB_CHARS = set('*?[')
+
+
+def read_paths(stream: IO[bytes], separator: bytes = b'\n') -> Iterator[str]:
+    """
+    Leer rutas de un flujo binario sin cargar la lista completa.
+
+    Args:
+        stream: Flujo binario (normalmente sys.stdin.buffer)
+        separator: b'\\n' o b'\\0'
+
+    Yields:
+        str: Cada ruta no vacía
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(_STDIN_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(separator)
+        pending = parts.pop()
+        for part in parts:
+            if separator == b'\n':
+                part = part.rstrip(b'\r')
+            if part:
+                yield os.fsdecode(part)
+    if separator == b'\n':
+        pending = pending.rstrip(b'\r')
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def iter_inputs(converter: ImageConverter, inputs: List[str], args) -> Iterator[str]:
+    """
+    Expandir las entradas (carpetas, globs, archivos o '-') en rutas de imagen.
+
+    Args:
+        converter: Convertidor (para explorar carpetas y filtrar extensiones)
+        inputs: Entradas indicadas en la línea de comandos
+        args: Argumentos ya analizados
+
+    Yields:
+        str: Rutas de archivo a convertir
+    """
+    separator = b'\0' if args.null else b'\n'
+    for item in inputs:
+        if item == '-':
+            yield from read_paths(sys.stdin.buffer, separator)
+        elif os.path.isdir(item):
+            yield from converter.iter_image_files(item, recursive=args.recursive,
+                                                  max_depth=args.max_depth,
+                                                  include=args.include,
+                                                  exclude=args.exclude)
+        elif _GLOB_CHARS & set(item):
+            for match in glob.iglob(item, recursive=True):
+                if converter.is_image_file(match) and os.path.isfile(match):
+                    yield match
+        else:
+            # Rutas explícitas: si no existen la conversión informa el error
+            yield item
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construir el analizador de argumentos del comando 'convert'."""
+    parser = argparse.ArgumentParser(
+        prog="main.py convert",
+        description="Convertir imágenes a extensiones personalizadas (resultado en JSONL)")
+    parser.add_argument("inputs", nargs="*",
+                        help="Carpetas, patrones glob o archivos; '-' o nada para leer de stdin")
+    parser.add_argument("-e", "--ext", required=True, action="append",
+                        choices=ImageConverter.TARGET_EXTENSIONS,
+                        help="Extensión de destino; se puede repetir (-e .1 -e .3) para "
+                             "escribir varias con una sola lectura de cada origen")
+    parser.add_argument("--fan-out", choices=ImageConverter.FAN_OUT_MODES, default="hardlink",
+                        help="Cómo se crean las extensiones adicionales a partir de la primera")
+    parser.add_argument("-0", "--null", action="store_true",
+                        help="Las rutas de stdin están separadas por NUL (find -print0)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Trabajadores en paralelo (por defecto uno por núcleo)")
+    parser.add_argument("--executor", choices=ImageConverter.EXECUTOR_TYPES, default="thread")
+    parser.add_argument("--mode", choices=ImageConverter.OUTPUT_MODES, default="copy",
+                        help="Modo de salida")
+    parser.add_argument("--per-device", type=int,
+                        help="Trabajadores simultáneos como máximo en cada disco")
+    parser.add_argument("--io-order", choices=ImageConverter.IO_ORDERS, default="none",
+                        help="Orden dentro de cada disco: inodo, posición física (FIEMAP) "
+                             "o el de la lista; los archivos grandes van primero")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="Explorar subcarpetas de las carpetas indicadas")
+    parser.add_argument("--max-depth", type=int, help="Niveles máximos de subcarpetas")
+    parser.add_argument("--include", action="append", help="Patrón glob de archivos a incluir")
+    parser.add_argument("--exclude", action="append", help="Patrón glob a excluir")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Omitir archivos sin cambios desde la última conversión")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Enlazar los destinos de imágenes idénticas")
+    parser.add_argument("--validate", action="store_true",
+                        help="Rechazar archivos cuya firma no sea de una imagen")
+    parser.add_argument("--transcode", type=str.upper, choices=TRANSCODE_FORMATS,
+                        help="Recodificar con Pillow al formato indicado")
+    parser.add_argument("--quality", type=int, default=85, help="Calidad de transcodificación")
+    parser.add_argument("--max-size", type=int, help="Lado máximo en píxeles al transcodificar")
+    parser.add_argument("--max-pixels", type=int, default=MAX_PIXELS,
+                        help="Píxeles decodificados como máximo por imagen al transcodificar")
+    parser.add_argument("--on-collision", choices=ImageConverter.COLLISION_POLICIES,
+                        default="suffix",
+                        help="Orígenes con el mismo destino (a.jpg y a.png): "
+                             "suffix = a_1.1, skip, fail u overwrite")
+    parser.add_argument("--fsync", choices=ImageConverter.FSYNC_POLICIES, default="none",
+                        help="Durabilidad: fsync por archivo, por lote o ninguno")
+    parser.add_argument("--cache", choices=ImageConverter.CACHE_POLICIES, default="normal",
+                        help="Caché de páginas: normal, nocache (no desplazar datos de "
+                             "otros servicios) o direct (además O_DIRECT en archivos grandes)")
+    parser.add_argument("--checksum", action="store_true",
+                        help="Calcular el hash BLAKE2b de cada copia sin releer el origen "
+                             "(campo 'digest' del resultado)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Comprobar cada copia contra el hash antes de darla por buena")
+    parser.add_argument("--journal",
+                        help="Diario del trabajo para reanudarlo si se interrumpe")
+    parser.add_argument("--archive", choices=ImageConverter.ARCHIVE_FORMATS,
+                        help="Escribir cada extensión como un único archivo comprimido "
+                             "(tar.zst requiere el paquete zstandard)")
+    parser.add_argument("--archive-dir", default=".",
+                        help="Carpeta de los archivos comprimidos (por defecto la actual)")
+    parser.add_argument("--metrics-file",
+                        help="Guardar métricas por fase al terminar (.prom = Prometheus, otro = JSON)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="Descartar los mensajes informativos (por defecto van a stderr)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada del comando 'convert'.
+
+    Returns:
+        int: 0 si todo se convirtió, 1 si algún archivo falló,
+            2 si los argumentos no son válidos, 130 si se interrumpió
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers debe ser mayor que 0")
+
+    try:
+        transcode = None
+        if args.transcode:
+            transcode = TranscodeOptions(args.transcode, args.quality, args.max_size,
+                                         args.max_pixels)
+        converter = ImageConverter(max_workers=args.workers, executor=args.executor,
+                                   output_mode=args.mode, incremental=args.incremental,
+                                   dedup=args.dedup, validate_content=args.validate,
+                                   transcode=transcode, metrics_path=args.metrics_file,
+                                   collision_policy=args.on_collision,
+                                   fan_out_mode=args.fan_out, fsync_policy=args.fsync,
+                                   journal_path=args.journal, archive_format=args.archive,
+                                   archive_dir=args.archive_dir,
+                                   device_workers=args.per_device, io_order=args.io_order,
+                                   cache_policy=args.cache, checksum=args.checksum,
+                                   verify=args.verify)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # stdout queda reservado para el JSONL; los mensajes del convertidor van aparte
+    results = sys.stdout
+    messages = open(os.devnull, 'w') if args.quiet else sys.stderr
+
+    def on_progress(processed, total, file_path, ok):
+        record = {'file': file_path, 'ok': ok}
+        if ok:
+            record['target'] = str(converter.target_path_for(file_path, args.ext[0])[1])
+            if converter.checksum:
+                record['digest'] = converter.last_digest(file_path)
+            if len(args.ext) > 1:
+                record['targets'] = [str(converter.target_path_for(file_path, ext)[1])
+                                     for ext in args.ext]
+        else:
+            record['error'] = converter.last_error(file_path)
+        results.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    try:
+        with contextlib.redirect_stdout(messages):
+            success, failed = converter.convert_multiple_files(
+                iter_inputs(converter, args.inputs or ['-'], args), args.ext,
+                progress_callback=on_progress)
+    except CollisionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_FAILURES
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # El consumidor cerró la tubería (ej: | head): terminar sin traza
+        sys.stdout = open(os.devnull, 'w')
+        return EXIT_FAILURES
+    finally:
+        with contextlib.suppress(BrokenPipeError):
+            results.flush()
+        if args.quiet:
+            messages.close()
+
+    return EXIT_OK if failed == 0 else EXIT_FAILURES
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,479 @@
+"""
+Backends de copia de archivos.
+Delegan la copia al kernel cuando es posible (reflink, copy_file_range,
+sendfile) y recurren a un bucle en Python solo como último recurso.
+"""
+
+import errno
+import mmap
+import os
+import shutil
+import sys
+import threading
+from typing import Optional, Sequence, Tuple
+
+from .hashing import file_digest
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# ioctl FICLONE de Linux (_IOW(0x94, 9, int)): clona los extents del origen
+FICLONE = 0x40049409
+
+# Tamaño de bloque por defecto para el bucle en Python
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Bloque máximo del bucle en Python: el bloque se duplica hasta aquí en
+# archivos grandes (menos llamadas al sistema) y es el tamaño del búfer
+# reutilizable de cada hilo
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Uso de la caché de páginas en el bucle en Python:
+#   normal  = la del sistema
+#   nocache = lectura secuencial (POSIX_FADV_SEQUENTIAL) y liberar las
+#             páginas ya escritas (POSIX_FADV_DONTNEED) para no desplazar los
+#             datos de otros servicios
+#   direct  = nocache y además O_DIRECT al leer archivos muy grandes
+CACHE_POLICIES = ('normal', 'nocache', 'direct')
+
+# Bytes escritos entre cada liberación de páginas con nocache
+WRITEBACK_WINDOW = 32 * 1024 * 1024
+
+# Tamaño a partir del cual la política 'direct' lee con O_DIRECT
+DIRECT_IO_MIN_SIZE = 64 * 1024 * 1024
+
+# Búfer de copia de cada hilo (alineado a página, necesario para O_DIRECT)
+_buffers = threading.local()
+
+# Estrategias disponibles, en orden de preferencia
+COPY_STRATEGIES = ('reflink', 'copy_file_range', 'sendfile', 'python', 'shutil')
+
+# Errores que indican que una estrategia no es aplicable a este par de archivos
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+    errno.ENOTTY, errno.EBADF, errno.EPERM,
+}
+if hasattr(errno, 'ENOTSUP'):
+    _UNSUPPORTED_ERRNOS.add(errno.ENOTSUP)
+
+
+class StrategyUnsupported(Exception):
+    """La estrategia de copia no es aplicable; probar la siguiente."""
+
+
+def default_strategies(cache_policy: str = 'normal') -> Sequence[str]:
+    """
+    Obtener la cadena de estrategias por defecto para esta plataforma.
+
+    Args:
+        cache_policy: Con 'nocache' o 'direct' se omiten copy_file_range y
+            sendfile, que siempre pasan por la caché de páginas
+
+    Returns:
+        Sequence[str]: Estrategias en orden de preferencia
+    """
+    if sys.platform.startswith('linux'):
+        if cache_policy != 'normal':
+            return ('reflink', 'python')
+        return ('reflink', 'copy_file_range', 'sendfile', 'python')
+    # En otras plataformas shutil ya usa la vía rápida del sistema (fcopyfile, etc.)
+    return ('shutil',)
+
+
+def _reflink(src_fd: int, dst_fd: int, size: int):
+    """Clonar el archivo con FICLONE (mismo sistema de archivos CoW)."""
+    if fcntl is None or not sys.platform.startswith('linux'):
+        raise StrategyUnsupported('reflink')
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int):
+    """Copiar dentro del kernel con copy_file_range."""
+    if not hasattr(os, 'copy_file_range'):
+        raise StrategyUnsupported('copy_file_range')
+    offset = 0
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+        if copied == 0:
+            break
+        offset += copied
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int):
+    """Copiar dentro del kernel con sendfile."""
+    if not hasattr(os, 'sendfile') or not sys.platform.startswith('linux'):
+        raise StrategyUnsupported('sendfile')
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+        if sent == 0:
+            break
+        offset += sent
+
+
+def _copy_buffer() -> memoryview:
+    """Búfer reutilizable del hilo actual (se reserva una sola vez)."""
+    view = getattr(_buffers, 'view', None)
+    if view is None:
+        # mmap anónimo: memoria alineada a página y sin inicializar en Python
+        view = _buffers.view = memoryview(mmap.mmap(-1, MAX_CHUNK_SIZE))
+    return view
+
+
+def _read_into(fd: int, view: memoryview) -> int:
+    """Leer directamente en el búfer (os.read + copia donde no hay readv)."""
+    if hasattr(os, 'readv'):
+        return os.readv(fd, [view])
+    data = os.read(fd, len(view))
+    view[:len(data)] = data
+    return len(data)
+
+
+def _fadvise(fd: int, offset: int, length: int, advice_name: str):
+    """posix_fadvise si la plataforma lo tiene (solo es una sugerencia al kernel)."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+
+def _enable_direct_io(fd: int) -> bool:
+    """Activar O_DIRECT en un descriptor abierto (False si no se admite)."""
+    if fcntl is None or not hasattr(os, 'O_DIRECT'):
+        return False
+    try:
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_DIRECT)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_python(src_fd: int, dst_fd: int, size: int, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 cache_policy: str = 'normal', hasher=None):
+    """
+    Copiar en bloques a través de Python (último recurso).
+    Lee con readv sobre un búfer por hilo que se reutiliza, sin crear un
+    objeto bytes por bloque. El bloque empieza en chunk_size (o el tamaño
+    del archivo si es menor) y se duplica hasta MAX_CHUNK_SIZE mientras las
+    lecturas vienen completas. Con hasher, cada bloque se añade al hash
+    mientras está en el búfer (sin una segunda lectura).
+    """
+    buffer = _copy_buffer()
+    nocache = cache_policy != 'normal'
+    direct = cache_policy == 'direct' and size >= DIRECT_IO_MIN_SIZE and \
+        _enable_direct_io(src_fd)
+    if nocache:
+        _fadvise(src_fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+    page = mmap.PAGESIZE
+    chunk = max(page, min(chunk_size, MAX_CHUNK_SIZE, size or page))
+    if direct:
+        # O_DIRECT exige longitudes múltiplo del bloque del dispositivo
+        chunk = max(page, chunk - chunk % page)
+
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    offset = 0
+    released = 0
+    try:
+        while True:
+            read = _read_into(src_fd, buffer[:chunk])
+            if not read:
+                break
+            view = buffer[:read]
+            if hasher is not None:
+                hasher.update(view)
+            while view:
+                written = os.write(dst_fd, view)
+                view = view[written:]
+            offset += read
+            if read == chunk and chunk < MAX_CHUNK_SIZE:
+                chunk = min(chunk * 2, MAX_CHUNK_SIZE)
+            if nocache and offset - released >= WRITEBACK_WINDOW:
+                # Las páginas sucias no se pueden liberar: escribirlas primero
+                os.fdatasync(dst_fd)
+                _fadvise(dst_fd, released, offset - released, 'POSIX_FADV_DONTNEED')
+                _fadvise(src_fd, released, offset - released, 'POSIX_FADV_DONTNEED')
+                released = offset
+    finally:
+        if direct:
+            fcntl.fcntl(src_fd, fcntl.F_SETFL, fcntl.fcntl(src_fd, fcntl.F_GETFL) & ~os.O_DIRECT)
+    if nocache and offset > released:
+        os.fdatasync(dst_fd)
+        _fadvise(dst_fd, released, 0, 'POSIX_FADV_DONTNEED')
+        _fadvise(src_fd, released, 0, 'POSIX_FADV_DONTNEED')
+
+
+_FD_STRATEGIES = {
+    'reflink': _reflink,
+    'copy_file_range': _copy_file_range,
+    'sendfile': _sendfile,
+}
+
+
+def copy_file(source_path: str, target_path: str,
+              strategies: Optional[Sequence[str]] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE,
+              preserve_metadata: bool = True,
+              cache_policy: str = 'normal', hasher=None) -> str:
+    """
+    Copiar un archivo probando las estrategias en orden.
+    Si una estrategia no es aplicable, el destino se trunca y se prueba la
+    siguiente, de modo que nunca queda un archivo a medio copiar.
+
+    Args:
+        source_path: Ruta del archivo origen
+        target_path: Ruta del archivo destino
+        strategies: Estrategias a probar (por defecto las de la plataforma)
+        chunk_size: Tamaño del bloque inicial para la estrategia 'python'
+        preserve_metadata: Copiar permisos y fechas como shutil.copy2
+        cache_policy: Uso de la caché de páginas en la estrategia 'python'
+            (ver CACHE_POLICIES); con 'nocache' o 'direct' el origen también
+            se libera de la caché tras las copias del kernel
+        hasher: Objeto hash (hashing.new_hasher) que recibe el contenido
+            copiado; obliga a usar la estrategia 'python', la única en la que
+            los datos pasan por el proceso
+
+    Returns:
+        str: Nombre de la estrategia que realizó la copia
+    """
+    if cache_policy not in CACHE_POLICIES:
+        raise ValueError(f"Política de caché no válida: {cache_policy}")
+    strategies = tuple(strategies or default_strategies(cache_policy))
+    if hasher is not None:
+        strategies = ('python',)
+    for name in strategies:
+        if name not in COPY_STRATEGIES:
+            raise ValueError(f"Estrategia de copia no válida: {name}")
+
+    used = None
+    if strategies == ('shutil',):
+        shutil.copyfile(source_path, target_path)
+        used = 'shutil'
+    else:
+        src_fd = os.open(source_path, os.O_RDONLY)
+        try:
+            size = os.fstat(src_fd).st_size
+            dst_fd = os.open(target_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                for name in strategies:
+                    if name == 'shutil':
+                        continue
+                    try:
+                        if name == 'python':
+                            _copy_python(src_fd, dst_fd, size, chunk_size, cache_policy, hasher)
+                        else:
+                            _FD_STRATEGIES[name](src_fd, dst_fd, size)
+                            if cache_policy != 'normal':
+                                _fadvise(src_fd, 0, 0, 'POSIX_FADV_DONTNEED')
+                        used = name
+                        break
+                    except StrategyUnsupported:
+                        continue
+                    except OSError as e:
+                        if e.errno not in _UNSUPPORTED_ERRNOS or name == 'python':
+                            raise
+                        # Descartar cualquier copia parcial antes de la siguiente estrategia
+                        os.ftruncate(dst_fd, 0)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+
+        if used is None:
+            if 'shutil' not in strategies:
+                raise OSError(f"Ninguna estrategia de copia disponible para {source_path}")
+            shutil.copyfile(source_path, target_path)
+            used = 'shutil'
+
+    if preserve_metadata:
+        shutil.copystat(source_path, target_path)
+    return used
+
+
+# Modos de salida: cómo se materializa el archivo destino
+OUTPUT_MODES = ('copy', 'hardlink', 'symlink', 'reflink', 'move')
+
+# Errores por los que un enlace o renombrado no es posible y se recurre a copiar
+_LINK_FALLBACK_ERRNOS = _UNSUPPORTED_ERRNOS | {errno.EMLINK, errno.EACCES}
+
+
+# Políticas de fsync: por archivo, por lote (el convertidor sincroniza cada
+# SYNC_BATCH_SIZE archivos) o ninguna (el kernel decide cuándo escribir)
+FSYNC_POLICIES = ('file', 'batch', 'none')
+
+# Archivos entre sincronizaciones con la política 'batch'
+SYNC_BATCH_SIZE = 500
+
+
+def temp_sibling(target_path: str) -> str:
+    """Ruta temporal junto al destino para reemplazarlo de forma atómica."""
+    directory, name = os.path.split(target_path)
+    return os.path.join(directory, f".{name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def is_stale_temp(name: str) -> bool:
+    """
+    Comprobar si un nombre es un temporal de temp_sibling cuyo proceso ya
+    no existe (quedó tras una caída y se puede borrar).
+
+    Args:
+        name: Nombre del archivo (sin carpeta)
+    """
+    if not (name.startswith('.') and name.endswith('.tmp')):
+        return False
+    owner = name[:-len('.tmp')].rsplit('.', 1)[-1].split('-', 1)[0]
+    if not owner.isdigit():
+        return False
+    pid = int(owner)
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        # Existe pero es de otro usuario
+        return False
+    return False
+
+
+def fsync_path(path: str, directory: bool = False):
+    """Forzar a disco un archivo ya cerrado o una carpeta (sus entradas)."""
+    flags = os.O_RDONLY
+    if directory and hasattr(os, 'O_DIRECTORY'):
+        flags |= os.O_DIRECTORY
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        # Windows no permite abrir carpetas
+        if directory:
+            return
+        raise
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def sync_all():
+    """Escribir en disco todos los datos pendientes (fin de un lote)."""
+    if hasattr(os, 'sync'):
+        os.sync()
+
+
+def write_atomically(create, target_path: str, fsync: bool = False):
+    """
+    Crear el destino en un temporal de su misma carpeta y renombrarlo sobre
+    el final: tras una caída el destino es el anterior o el nuevo completo,
+    nunca uno truncado.
+
+    Args:
+        create: Función que recibe la ruta temporal y crea ahí el archivo
+        target_path: Ruta final
+        fsync: Forzar a disco los datos antes del renombrado y la carpeta después
+    """
+    temp_path = temp_sibling(target_path)
+    if os.path.lexists(temp_path):
+        os.unlink(temp_path)
+    try:
+        create(temp_path)
+        if fsync and not os.path.islink(temp_path):
+            fsync_path(temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        # Error o cancelación: no dejar el temporal a medias
+        if os.path.lexists(temp_path):
+            os.unlink(temp_path)
+        raise
+    # rename no hace nada si ambos nombres ya apuntan al mismo inodo
+    if os.path.lexists(temp_path):
+        os.unlink(temp_path)
+    if fsync:
+        fsync_path(os.path.dirname(target_path) or '.', directory=True)
+
+
+def place_file(source_path: str, target_path: str, mode: str = 'copy',
+               strategies: Optional[Sequence[str]] = None,
+               fsync: bool = False, cache_policy: str = 'normal',
+               hasher=None, verify: bool = False) -> Tuple[str, str]:
+    """
+    Materializar el destino a partir del origen según el modo de salida.
+    Si el modo no es posible (por ejemplo un enlace duro entre dispositivos)
+    se recurre a una copia normal. Todas las escrituras van a un temporal que
+    se renombra sobre el destino, así que un destino que sea un enlace al
+    origen se reemplaza sin tocar el original.
+
+    Args:
+        source_path: Ruta del archivo origen
+        target_path: Ruta del archivo destino
+        mode: 'copy', 'hardlink', 'symlink', 'reflink' o 'move'
+        strategies: Estrategias de copia para el modo 'copy' y los respaldos
+        fsync: Forzar a disco el destino y su carpeta antes de volver
+        cache_policy: Uso de la caché de páginas en las copias (ver CACHE_POLICIES)
+        hasher: Objeto hash que recibe el contenido si se copia (los enlaces y
+            renombrados no leen datos: la estrategia devuelta no es 'python')
+        verify: Con hasher, releer la copia antes de renombrarla (sus páginas
+            siguen en caché) y fallar si no coincide con lo leído del origen
+
+    Returns:
+        Tuple[str, str]: (modo realmente usado, estrategia o operación aplicada)
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Modo de salida no válido: {mode}")
+
+    try:
+        if mode == 'hardlink':
+            write_atomically(lambda temp: os.link(source_path, temp), target_path, fsync)
+            return 'hardlink', 'link'
+        if mode == 'symlink':
+            absolute = os.path.abspath(source_path)
+            write_atomically(lambda temp: os.symlink(absolute, temp), target_path, fsync)
+            return 'symlink', 'symlink'
+        if mode == 'move':
+            try:
+                linked = os.path.samestat(os.lstat(source_path), os.lstat(target_path))
+            except FileNotFoundError:
+                linked = False
+            if linked:
+                # El destino ya es un enlace duro del origen (de una ejecución
+                # anterior): rename no haría nada, basta con quitar el origen
+                os.unlink(source_path)
+            else:
+                # rename es atómico dentro del mismo dispositivo
+                os.replace(source_path, target_path)
+            if fsync:
+                fsync_path(os.path.dirname(target_path) or '.', directory=True)
+            return 'move', 'rename'
+    except OSError as e:
+        if e.errno not in _LINK_FALLBACK_ERRNOS:
+            raise
+
+    used = []
+
+    def copy_to(temp_path, chosen):
+        used.append(copy_file(source_path, temp_path, chosen, cache_policy=cache_policy,
+                              hasher=hasher))
+        if verify and hasher is not None and file_digest(temp_path, hasher.name) != \
+                hasher.hexdigest():
+            raise OSError(f"La verificación de la copia falló: {target_path}")
+
+    # Con hash los datos tienen que pasar por el proceso: no hay reflink
+    if mode == 'reflink' and hasher is None:
+        try:
+            write_atomically(lambda temp: copy_to(temp, ('reflink',)), target_path, fsync)
+            return 'reflink', used[-1]
+        except OSError:
+            pass
+
+    write_atomically(lambda temp: copy_to(temp, strategies), target_path, fsync)
+    if mode == 'move':
+        # Movimiento entre dispositivos: copiar y después eliminar el origen
+        os.unlink(source_path)
+        return 'move', used[-1]
+    return 'copy', used[-1]
@@ -0,0 +1,334 @@
+"""
+Demonio de conversión local sobre un socket Unix.
+Mantiene un pool de trabajadores y las cachés calientes entre trabajos, de
+modo que cada lote pequeño no paga el arranque del intérprete ni las
+importaciones. El protocolo es JSON por líneas:
+
+    cliente -> {"files": [...], "target_extension": ".1" (o [".1", ".3"]), "options": {...}}
+    demonio -> {"file": ..., "ok": true, "target": ...}   (uno por archivo)
+    demonio -> {"done": true, "success": N, "failed": M}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import tempfile
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, List, Optional, Union
+
+from .image_converter import ImageConverter
+from .sniffing import HeaderCache
+from .transcoder import MAX_PIXELS, TranscodeOptions
+
+# Opciones de ImageConverter que un cliente puede indicar por trabajo
+JOB_OPTIONS = ('output_mode', 'incremental', 'manifest_hash', 'dedup', 'validate_content',
+               'collision_policy', 'fan_out_mode')
+
+# Tamaño máximo de una línea de petición (listas grandes de archivos)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+def default_socket_path() -> str:
+    """
+    Obtener la ruta por defecto del socket (privada para el usuario).
+
+    Returns:
+        str: Ruta del socket Unix
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, 'getuid') else 0
+    return os.path.join(runtime_dir, f"image-converter-{uid}.sock")
+
+
+def _encode(message: dict) -> bytes:
+    """Serializar un mensaje como una línea JSON."""
+    return (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+class ConversionDaemon:
+    """
+    Servidor asyncio que atiende trabajos de conversión concurrentes.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 max_jobs: int = 8):
+        """
+        Args:
+            socket_path: Ruta del socket Unix (por defecto default_socket_path())
+            max_workers: Trabajadores del pool compartido (por defecto núcleos * 2)
+            max_jobs: Trabajos atendidos a la vez
+        """
+        self.socket_path = socket_path or default_socket_path()
+        self.max_workers = max_workers or (os.cpu_count() or 1) * 2
+        self.header_cache = HeaderCache()
+        # Pool caliente compartido por todos los trabajos
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                       thread_name_prefix="convert")
+        self._process_pool: Optional[Executor] = None
+        # Hilos que coordinan cada trabajo (convert_multiple_files es bloqueante)
+        self.job_pool = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="job")
+        self._server = None
+        # El socket es de este demonio (no se borra el de otro al cerrar)
+        self._bound = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        # Se activa cuando el socket ya acepta conexiones
+        self.ready = threading.Event()
+
+    def _pool_for(self, converter: ImageConverter):
+        """Elegir el pool caliente adecuado (procesos para transcodificar)."""
+        if converter.transcode is None:
+            return self.pool
+        if self._process_pool is None:
+            # multiprocessing solo se carga con el primer trabajo que transcodifica
+            from concurrent.futures import ProcessPoolExecutor
+            self._process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return self._process_pool
+
+    def _build_converter(self, options: dict) -> ImageConverter:
+        """Crear el convertidor de un trabajo a partir de sus opciones."""
+        unknown = set(options) - set(JOB_OPTIONS) - {'transcode'}
+        if unknown:
+            raise ValueError(f"Opciones no válidas: {', '.join(sorted(unknown))}")
+
+        kwargs = {name: options[name] for name in JOB_OPTIONS if name in options}
+        transcode = options.get('transcode')
+        if transcode is not None and not isinstance(transcode, dict):
+            raise ValueError("'transcode' debe ser un objeto con format, quality y max_dimension")
+        if transcode:
+            kwargs['transcode'] = TranscodeOptions(
+                transcode.get('format', 'JPEG'), transcode.get('quality', 85),
+                transcode.get('max_dimension'), transcode.get('max_pixels', MAX_PIXELS))
+        return ImageConverter(max_workers=self.max_workers, header_cache=self.header_cache,
+                              **kwargs)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atender un trabajo: leer la petición y transmitir los resultados."""
+        loop = asyncio.get_running_loop()
+        cancelled = threading.Event()
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                files = request['files']
+                # Una extensión o una lista de ellas (fan-out)
+                target_extension = request['target_extension']
+                extensions = [target_extension] if isinstance(target_extension, str) \
+                    else list(target_extension)
+                if not extensions:
+                    raise ValueError("No se indicó ninguna extensión de destino")
+                for extension in extensions:
+                    if extension not in ImageConverter.TARGET_EXTENSIONS:
+                        raise ValueError(f"Extensión de destino no válida: {extension}")
+                converter = self._build_converter(request.get('options') or {})
+            except (ValueError, KeyError, TypeError) as e:
+                writer.write(_encode({'error': f"Petición no válida: {e}"}))
+                await writer.drain()
+                return
+
+            results: asyncio.Queue = asyncio.Queue()
+            finished = object()
+
+            def on_progress(processed, total, file_path, ok):
+                message = {'file': file_path, 'ok': ok}
+                if ok:
+                    message['target'] = str(converter.target_path_for(file_path, extensions[0])[1])
+                    if len(extensions) > 1:
+                        message['targets'] = [str(converter.target_path_for(file_path, ext)[1])
+                                              for ext in extensions]
+                else:
+                    message['error'] = converter.last_error(file_path)
+                loop.call_soon_threadsafe(results.put_nowait, message)
+
+            def run_job():
+                return converter.convert_multiple_files(
+                    files, extensions, max_workers=self.max_workers,
+                    progress_callback=on_progress, should_cancel=cancelled.is_set,
+                    pool=self._pool_for(converter))
+
+            job = loop.run_in_executor(self.job_pool, run_job)
+            job.add_done_callback(lambda _: results.put_nowait(finished))
+
+            while True:
+                message = await results.get()
+                if message is finished:
+                    break
+                writer.write(_encode(message))
+                await writer.drain()
+
+            try:
+                success, failed = job.result()
+                writer.write(_encode({'done': True, 'success': success, 'failed': failed}))
+            except Exception as e:
+                writer.write(_encode({'error': f"Error durante la conversión: {e}"}))
+            await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # El cliente se desconectó: detener su trabajo
+            cancelled.set()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        """Escuchar en el socket hasta recibir SIGINT o SIGTERM."""
+        if not hasattr(asyncio, 'start_unix_server'):
+            raise OSError("Los sockets Unix no están disponibles en esta plataforma")
+        _remove_stale_socket(self.socket_path)
+
+        try:
+            # Los permisos se fijan entre bind() y listen(): hasta listen() el
+            # socket rechaza las conexiones, así que nadie más llega a entrar
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.bind(self.socket_path)
+                self._bound = True
+                os.chmod(self.socket_path, 0o600)
+            except BaseException:
+                sock.close()
+                raise
+            self._server = await asyncio.start_unix_server(
+                self.handle_client, sock=sock, limit=MAX_REQUEST_BYTES)
+            print(f"Demonio de conversión escuchando en {self.socket_path} "
+                  f"({self.max_workers} trabajadores)")
+
+            self._stop = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self._loop.add_signal_handler(signum, self._stop.set)
+                except (NotImplementedError, RuntimeError):
+                    # Fuera del hilo principal no se pueden instalar manejadores
+                    pass
+
+            self.ready.set()
+            async with self._server:
+                await self._stop.wait()
+        finally:
+            self.close()
+
+    def stop(self):
+        """Pedir la parada del demonio (seguro desde cualquier hilo)."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def close(self):
+        """Liberar el socket y los pools."""
+        if self._bound and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+            self._bound = False
+        self.job_pool.shutdown(wait=False)
+        self.pool.shutdown(wait=False)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False)
+        print("Demonio de conversión detenido.")
+
+
+def _remove_stale_socket(socket_path: str):
+    """Eliminar un socket abandonado; fallar si otro demonio lo está usando."""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+        return
+    finally:
+        probe.close()
+    raise OSError(f"Ya hay un demonio escuchando en {socket_path}")
+
+
+def submit(files: Iterable[str], target_extension: Union[str, List[str]],
+           options: Optional[dict] = None,
+           socket_path: Optional[str] = None, output=sys.stdout) -> int:
+    """
+    Cliente ligero: enviar un trabajo al demonio y escribir cada resultado.
+
+    Args:
+        files: Rutas de archivos
+        target_extension: Extensión de destino (o lista de extensiones)
+        options: Opciones del trabajo (ver JOB_OPTIONS y 'transcode')
+        socket_path: Ruta del socket (por defecto default_socket_path())
+        output: Flujo donde escribir las líneas JSON de resultado
+
+    Returns:
+        int: 0 si todo se convirtió, 1 si hubo fallos, 2 si no hubo conexión
+    """
+    request = {'files': [os.path.abspath(f) for f in files],
+               'target_extension': target_extension,
+               'options': options or {}}
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path or default_socket_path())
+    except OSError as e:
+        print(f"No se pudo conectar con el demonio: {e}", file=sys.stderr)
+        client.close()
+        return 2
+
+    exit_code = 2
+    with client, client.makefile('rwb') as stream:
+        stream.write(_encode(request))
+        stream.flush()
+        for line in stream:
+            output.write(line.decode('utf-8'))
+            message = json.loads(line)
+            if message.get('done'):
+                exit_code = 0 if message['failed'] == 0 else 1
+            elif 'error' in message and 'file' not in message:
+                exit_code = 2
+    output.flush()
+    return exit_code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punto de entrada: 'serve' arranca el demonio y 'submit' envía un trabajo.
+    """
+    parser = argparse.ArgumentParser(prog="main.py daemon",
+                                     description="Demonio de conversión de extensiones")
+    parser.add_argument("--socket", help="Ruta del socket Unix")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="Arrancar el demonio")
+    serve_parser.add_argument("--workers", type=int, help="Trabajadores del pool compartido")
+    serve_parser.add_argument("--max-jobs", type=int, default=8, help="Trabajos simultáneos")
+
+    submit_parser = commands.add_parser("submit", help="Enviar un trabajo al demonio")
+    submit_parser.add_argument("-e", "--ext", required=True, action="append",
+                               choices=ImageConverter.TARGET_EXTENSIONS,
+                               help="Extensión de destino (repetible para fan-out)")
+    submit_parser.add_argument("--fan-out", dest="fan_out_mode",
+                               choices=ImageConverter.FAN_OUT_MODES)
+    submit_parser.add_argument("--mode", dest="output_mode", choices=ImageConverter.OUTPUT_MODES)
+    submit_parser.add_argument("--incremental", action="store_true")
+    submit_parser.add_argument("--dedup", action="store_true")
+    submit_parser.add_argument("--validate", dest="validate_content", action="store_true")
+    submit_parser.add_argument("--on-collision", dest="collision_policy",
+                               choices=ImageConverter.COLLISION_POLICIES)
+    submit_parser.add_argument("files", nargs="*",
+                               help="Archivos a convertir (por defecto una ruta por línea en stdin)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        daemon = ConversionDaemon(args.socket, args.workers, args.max_jobs)
+        try:
+            asyncio.run(daemon.serve())
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    files = args.files or [line.rstrip("\n") for line in sys.stdin if line.strip()]
+    options = {name: getattr(args, name) for name in JOB_OPTIONS
+               if getattr(args, name, None)}
+    extensions = args.ext[0] if len(args.ext) == 1 else args.ext
+    return submit(files, extensions, options, args.socket)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
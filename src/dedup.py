@@ -0,0 +1,51 @@
+"""
+Detección de imágenes con contenido idéntico.
+Agrupa primero por tamaño (solo un stat por archivo) y calcula el hash
+únicamente de los archivos que comparten tamaño con algún otro.
+"""
+
+import os
+from typing import Dict, Iterable, List
+
+from .hashing import file_digest
+
+
+def find_duplicates(file_paths: Iterable[str]) -> Dict[str, str]:
+    """
+    Encontrar archivos con el mismo contenido.
+
+    Args:
+        file_paths: Rutas de archivos; el primero de cada grupo (en este
+            orden) se toma como copia canónica
+
+    Returns:
+        Dict[str, str]: Ruta duplicada -> ruta canónica con el mismo contenido
+    """
+    by_size: Dict[int, List[str]] = {}
+    seen = set()
+    for file_path in file_paths:
+        if file_path in seen:
+            continue
+        seen.add(file_path)
+        try:
+            size = os.stat(file_path).st_size
+        except OSError:
+            continue
+        by_size.setdefault(size, []).append(file_path)
+
+    duplicates: Dict[str, str] = {}
+    for size, candidates in by_size.items():
+        if len(candidates) < 2:
+            continue
+
+        by_digest: Dict[str, str] = {}
+        for file_path in candidates:
+            try:
+                digest = file_digest(file_path)
+            except OSError:
+                continue
+            canonical = by_digest.setdefault(digest, file_path)
+            if canonical != file_path:
+                duplicates[file_path] = canonical
+
+    return duplicates
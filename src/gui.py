@@ -4,12 +4,16 @@ Interfaz gráfica para el convertidor de extensiones de imágenes.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from pathlib import Path
+import base64
 import threading
+import queue
+import time
 import os
 from typing import List, Optional
 
 from .image_converter import ImageConverter
+from .thumbnails import THUMBNAIL_SIZE, DiskThumbnailCache, ThumbnailWorker
+from .widgets import VirtualFileList
 
 
 class ImageConverterGUI:
@@ -17,19 +21,52 @@ class ImageConverterGUI:
     Interfaz gráfica para el convertidor de extensiones de imágenes.
     """
     
-    def __init__(self):
-        """Inicializar la interfaz gráfica."""
+    # Intervalo de refresco del progreso en milisegundos (20 Hz)
+    PROGRESS_INTERVAL_MS = 50
+    
+    # Subcarpetas que se enumeran en el mensaje final
+    MAX_LISTED_SUBFOLDERS = 20
+    
+    # Intervalo de recogida de miniaturas terminadas en milisegundos
+    THUMBNAIL_INTERVAL_MS = 40
+    
+    def __init__(self, thumbnail_cache_dir: Optional[str] = None):
+        """
+        Inicializar la interfaz gráfica.
+        
+        Args:
+            thumbnail_cache_dir: Carpeta donde conservar las miniaturas entre
+                sesiones (None = solo en memoria)
+        """
         self.root = tk.Tk()
         self.converter = ImageConverter()
         self.selected_files = []
+        self._selected_set = set()
+        # Copia de la selección que usa la conversión en curso
+        self._conversion_files = []
         self.conversion_cancelled = False
+        # Se activa cuando el tamaño total está confirmado (o al cancelar)
+        self._size_checked = threading.Event()
         self.start_time = None
+        # El hilo de conversión publica aquí su progreso; el bucle de Tk lo consume
+        self.progress_queue = queue.Queue()
+        self._file_sizes = {}
+        self._bytes_total = 0
+        self._bytes_done = 0
+        self._target_extensions = []
+        # Las miniaturas se generan en otro hilo, solo para las filas visibles
+        disk_cache = DiskThumbnailCache(thumbnail_cache_dir) if thumbnail_cache_dir else None
+        self.thumbnail_worker = ThumbnailWorker(disk_cache=disk_cache)
+        self._visible_files = []
+        self._preview_path = None
+        self._preview_image = None
+        self._preview_pending = False
         self.setup_gui()
     
     def setup_gui(self):
         """Configurar la interfaz gráfica."""
         self.root.title("Convertidor de Extensiones de Imágenes")
-        self.root.geometry("700x450")
+        self.root.geometry("900x470")
         self.root.resizable(True, True)
         
         # Configurar estilo
@@ -56,45 +93,99 @@ class ImageConverterGUI:
         files_frame.columnconfigure(1, weight=1)
         
         # Botón para seleccionar archivos individuales
-        ttk.Button(files_frame, text="Seleccionar Imágenes", 
-                  command=self.select_files).grid(row=0, column=0, padx=(0, 10))
+        select_files_button = ttk.Button(files_frame, text="Seleccionar Imágenes", 
+                                         command=self.select_files)
+        select_files_button.grid(row=0, column=0, padx=(0, 10))
         
         # Botón para seleccionar carpeta
-        ttk.Button(files_frame, text="Seleccionar Carpeta", 
-                  command=self.select_folder).grid(row=0, column=1, padx=(0, 10))
+        select_folder_button = ttk.Button(files_frame, text="Seleccionar Carpeta", 
+                                          command=self.select_folder)
+        select_folder_button.grid(row=0, column=1, padx=(0, 10))
         
         # Botón para limpiar selección
-        ttk.Button(files_frame, text="Limpiar", 
-                  command=self.clear_selection).grid(row=0, column=2)
-        
-        # Lista de archivos seleccionados
-        self.files_listbox = tk.Listbox(files_frame, height=6)
-        self.files_listbox.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(10, 0))
-        
-        # Scrollbar para la lista
-        scrollbar = ttk.Scrollbar(files_frame, orient="vertical", command=self.files_listbox.yview)
-        scrollbar.grid(row=1, column=3, sticky=(tk.N, tk.S))
-        self.files_listbox.configure(yscrollcommand=scrollbar.set)
+        clear_button = ttk.Button(files_frame, text="Limpiar", command=self.clear_selection)
+        clear_button.grid(row=0, column=2)
+        
+        # Se desactivan durante la conversión para no cambiar la selección en curso
+        self.selection_buttons = (select_files_button, select_folder_button, clear_button)
+        
+        # Lista de archivos seleccionados (virtualizada: solo se dibujan las filas visibles)
+        self.files_list = VirtualFileList(files_frame, self.selected_files, height=6,
+                                          on_select=self.show_preview,
+                                          on_view_change=self.on_files_view_change)
+        self.files_list.grid(row=1, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        # Vista previa del archivo seleccionado (tamaño fijo para que no salte el diseño)
+        preview_frame = ttk.Frame(files_frame, width=THUMBNAIL_SIZE[0] + 20,
+                                  height=THUMBNAIL_SIZE[1] + 40)
+        preview_frame.grid(row=1, column=4, sticky=(tk.N, tk.S), padx=(10, 0), pady=(10, 0))
+        preview_frame.grid_propagate(False)
+        preview_frame.columnconfigure(0, weight=1)
+        preview_frame.rowconfigure(0, weight=1)
+        self.preview_label = ttk.Label(preview_frame, text="Sin vista previa", compound="top",
+                                       anchor=tk.CENTER, justify=tk.CENTER,
+                                       wraplength=THUMBNAIL_SIZE[0])
+        self.preview_label.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Sección 2: Configuración de conversión
         config_frame = ttk.LabelFrame(main_frame, text="Configuración de Conversión", padding="10")
         config_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
         config_frame.columnconfigure(1, weight=1)
         
-        # Selección de extensión de destino
+        # Selección de extensiones de destino (varias = una sola lectura por archivo)
         ttk.Label(config_frame, text="Extensión de destino:").grid(row=0, column=0, sticky=tk.W)
         
-        self.target_var = tk.StringVar(value=".1")
-        target_combo = ttk.Combobox(config_frame, textvariable=self.target_var, 
-                                   values=ImageConverter.TARGET_EXTENSIONS, 
-                                   state="readonly", width=10)
-        target_combo.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        self.target_vars = {ext: tk.BooleanVar(value=(ext == ".1"))
+                            for ext in ImageConverter.TARGET_EXTENSIONS}
+        self.target_button = ttk.Menubutton(config_frame, width=10)
+        target_menu = tk.Menu(self.target_button, tearoff=False)
+        for ext, var in self.target_vars.items():
+            target_menu.add_checkbutton(label=ext, variable=var,
+                                        command=self.update_target_label)
+        self.target_button["menu"] = target_menu
+        self.target_button.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        self.update_target_label()
+        
+        # Número de trabajadores para la conversión en paralelo
+        ttk.Label(config_frame, text="Trabajadores:").grid(row=1, column=0, sticky=tk.W, pady=(10, 0))
+        
+        self.workers_var = tk.IntVar(value=min(4, os.cpu_count() or 1))
+        workers_spin = ttk.Spinbox(config_frame, from_=1, to=64, 
+                                   textvariable=self.workers_var, width=8)
+        workers_spin.grid(row=1, column=1, sticky=tk.W, padx=(10, 0), pady=(10, 0))
+        
+        # Modo de salida (copia, enlaces o movimiento)
+        ttk.Label(config_frame, text="Modo de salida:").grid(row=2, column=0, sticky=tk.W, pady=(10, 0))
+        
+        self.mode_var = tk.StringVar(value="copy")
+        mode_combo = ttk.Combobox(config_frame, textvariable=self.mode_var, 
+                                  values=ImageConverter.OUTPUT_MODES, 
+                                  state="readonly", width=10)
+        mode_combo.grid(row=2, column=1, sticky=tk.W, padx=(10, 0), pady=(10, 0))
+        
+        # Conversión incremental (omitir archivos sin cambios)
+        self.incremental_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Omitir archivos sin cambios (incremental)", 
+                        variable=self.incremental_var).grid(row=2, column=2, sticky=tk.W, 
+                                                            padx=(10, 0), pady=(10, 0))
+        
+        # Deduplicación de contenido idéntico
+        self.dedup_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Enlazar imágenes duplicadas (deduplicar)", 
+                        variable=self.dedup_var).grid(row=1, column=2, sticky=tk.W, 
+                                                      padx=(10, 0), pady=(10, 0))
+        
+        # Validación del contenido por firma (magic bytes)
+        self.validate_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(config_frame, text="Rechazar archivos que no son imágenes reales", 
+                        variable=self.validate_var).grid(row=0, column=2, sticky=tk.W, 
+                                                         padx=(10, 0))
         
         # Información sobre organización automática
         info_label = ttk.Label(config_frame, 
                               text="Los archivos se organizarán automáticamente en subcarpetas", 
                               font=("Arial", 9, "italic"), foreground="gray")
-        info_label.grid(row=1, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
+        info_label.grid(row=3, column=0, columnspan=3, sticky=tk.W, pady=(10, 0))
         
         # Sección 3: Botones de acción
         action_frame = ttk.Frame(main_frame)
@@ -134,6 +225,16 @@ class ImageConverterGUI:
         
         # Inicializar interfaz
         self.update_file_count()
+        self.thumbnail_worker.start()
+        self.root.after(self.THUMBNAIL_INTERVAL_MS, self.drain_thumbnail_queue)
+    
+    def selected_extensions(self) -> List[str]:
+        """Extensiones de destino marcadas, en el orden de TARGET_EXTENSIONS."""
+        return [ext for ext, var in self.target_vars.items() if var.get()]
+    
+    def update_target_label(self):
+        """Mostrar en el botón las extensiones marcadas."""
+        self.target_button.config(text=", ".join(self.selected_extensions()) or "(ninguna)")
     
     def select_files(self):
         """Seleccionar archivos de imagen individuales."""
@@ -150,9 +251,7 @@ class ImageConverterGUI:
         if files:
             # Filtrar solo archivos de imagen válidos
             valid_files = [f for f in files if self.converter.is_image_file(f)]
-            self.selected_files.extend(valid_files)
-            self.selected_files = list(set(self.selected_files))  # Eliminar duplicados
-            self.update_files_list()
+            self.add_files(valid_files)
     
     def select_folder(self):
         """Seleccionar carpeta con imágenes."""
@@ -160,26 +259,91 @@ class ImageConverterGUI:
         
         if folder:
             files = self.converter.get_image_files_from_folder(folder)
-            self.selected_files.extend(files)
-            self.selected_files = list(set(self.selected_files))  # Eliminar duplicados
-            self.update_files_list()
+            self.add_files(files)
     
+    def add_files(self, files):
+        """
+        Agregar archivos a la selección conservando el orden de inserción.
+        El coste es proporcional a los archivos nuevos, no al total.
+        
+        Args:
+            files: Rutas de archivos a agregar
+        """
+        for file_path in files:
+            if file_path not in self._selected_set:
+                self._selected_set.add(file_path)
+                self.selected_files.append(file_path)
+        self.update_files_list()
     
     def clear_selection(self):
         """Limpiar selección de archivos."""
-        self.selected_files = []
+        # Vaciar en el sitio: la lista virtual lee esta misma secuencia
+        self.selected_files.clear()
+        self._selected_set.clear()
         self.update_files_list()
+        self.set_preview(None)
     
     def update_files_list(self):
         """Actualizar lista de archivos seleccionados."""
-        self.files_listbox.delete(0, tk.END)
-        
-        for file_path in self.selected_files:
-            filename = Path(file_path).name
-            self.files_listbox.insert(tk.END, filename)
-        
+        self.files_list.set_items(self.selected_files)
         self.update_file_count()
     
+    def on_files_view_change(self, first, last):
+        """
+        Pedir las miniaturas de las filas visibles (llamado en cada desplazamiento).
+        Solo copia la porción visible y encola la petición: nunca bloquea Tk.
+        """
+        self._visible_files = self.selected_files[first:last]
+        self.request_thumbnails()
+    
+    def request_thumbnails(self):
+        """Pedir primero la vista previa pendiente y después las filas visibles."""
+        paths = list(self._visible_files)
+        if self._preview_pending:
+            paths.insert(0, self._preview_path)
+        self.thumbnail_worker.request(paths)
+    
+    def show_preview(self, index, file_path):
+        """Mostrar la miniatura del archivo seleccionado en cuanto esté lista."""
+        self.set_preview(file_path)
+        self.preview_label.config(text=f"{os.path.basename(file_path)}\nCargando...")
+        self._preview_pending = True
+        self.request_thumbnails()
+    
+    def set_preview(self, file_path, data=None):
+        """
+        Cambiar el contenido de la vista previa.
+        
+        Args:
+            file_path: Archivo mostrado (None = vaciar)
+            data: Miniatura en PNG (None = sin imagen)
+        """
+        self._preview_path = file_path
+        self._preview_pending = False
+        self._preview_image = tk.PhotoImage(data=base64.b64encode(data)) if data else None
+        if file_path is None:
+            text = "Sin vista previa"
+        elif data:
+            text = os.path.basename(file_path)
+        else:
+            text = f"{os.path.basename(file_path)}\nSin vista previa"
+        self.preview_label.config(image=self._preview_image or "", text=text)
+    
+    def drain_thumbnail_queue(self):
+        """Recoger las miniaturas terminadas y mostrar la seleccionada (en el bucle de Tk)."""
+        while True:
+            try:
+                file_path, data = self.thumbnail_worker.results.get_nowait()
+            except queue.Empty:
+                break
+            # Las de filas visibles solo calientan la caché
+            if file_path == self._preview_path and self._preview_pending:
+                try:
+                    self.set_preview(file_path, data)
+                except tk.TclError:
+                    self.set_preview(file_path)
+        self.root.after(self.THUMBNAIL_INTERVAL_MS, self.drain_thumbnail_queue)
+    
     def update_file_count(self):
         """Actualizar contador de archivos."""
         count = len(self.selected_files)
@@ -194,45 +358,83 @@ class ImageConverterGUI:
             messagebox.showwarning("Advertencia", "No hay archivos seleccionados.")
             return
         
-        # Verificar tamaño total de archivos
-        total_size = self.calculate_total_size()
-        if total_size > 500 * 1024 * 1024:  # 500MB
-            result = messagebox.askyesno(
-                "Archivos Grandes Detectados", 
-                f"Se detectaron archivos grandes ({self.format_size(total_size)}). "
-                f"La conversión puede tardar varios minutos.\n\n¿Deseas continuar?"
-            )
-            if not result:
-                return
+        self._target_extensions = self.selected_extensions()
+        if not self._target_extensions:
+            messagebox.showwarning("Advertencia", "Selecciona al menos una extensión de destino.")
+            return
         
-        # Preparar para conversión
+        # Preparar para conversión (el tamaño total lo calcula el hilo de
+        # conversión y se confirma en drain_progress_queue si es grande)
         self.conversion_cancelled = False
-        self.start_time = None
+        self._conversion_files = list(self.selected_files)
+        self._size_checked = threading.Event()
+        self.start_time = time.time()
+        self._bytes_total = 0
+        self._bytes_done = 0
         
-        # Deshabilitar botón y habilitar cancelar
+        # Deshabilitar botón y selección y habilitar cancelar
         self.convert_button.config(state="disabled")
+        self.set_selection_enabled(False)
         self.cancel_button.config(state="normal")
         
         # Iniciar conversión en hilo separado
         thread = threading.Thread(target=self.convert_files)
         thread.daemon = True
         thread.start()
+        
+        # Consumir el progreso a ritmo fijo desde el bucle de Tk
+        self.root.after(self.PROGRESS_INTERVAL_MS, self.drain_progress_queue)
+    
+    def set_selection_enabled(self, enabled):
+        """Activar o desactivar los botones que cambian la selección."""
+        for button in self.selection_buttons:
+            button.config(state="normal" if enabled else "disabled")
     
     def cancel_conversion(self):
         """Cancelar la conversión en curso."""
         self.conversion_cancelled = True
+        self._size_checked.set()
         self.progress_var.set("Cancelando conversión...")
     
-    def calculate_total_size(self):
-        """Calcular el tamaño total de los archivos seleccionados."""
+    def calculate_total_size(self, file_paths):
+        """
+        Calcular el tamaño total de los archivos a convertir (en el hilo de
+        conversión). Guarda el tamaño de cada archivo para estimar el tiempo
+        por bytes.
+        
+        Args:
+            file_paths: Rutas de los archivos
+        """
         total_size = 0
-        for file_path in self.selected_files:
+        self._file_sizes = {}
+        for file_path in file_paths:
             try:
-                total_size += os.path.getsize(file_path)
-            except:
-                pass
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+            self._file_sizes[file_path] = size
+            total_size += size
         return total_size
     
+    def confirm_total_size(self, total_size):
+        """
+        Recibir el tamaño total calculado por el hilo de conversión y, si es
+        grande, preguntar antes de seguir. El hilo espera la respuesta.
+        
+        Args:
+            total_size: Bytes de todos los archivos a convertir
+        """
+        self._bytes_total = total_size
+        if total_size > 500 * 1024 * 1024 and not self.conversion_cancelled:  # 500MB
+            result = messagebox.askyesno(
+                "Archivos Grandes Detectados", 
+                f"Se detectaron archivos grandes ({self.format_size(total_size)}). "
+                f"La conversión puede tardar varios minutos.\n\n¿Deseas continuar?"
+            )
+            if not result:
+                self.conversion_cancelled = True
+        self._size_checked.set()
+    
     def format_size(self, size_bytes):
         """Formatear tamaño en bytes a formato legible."""
         if size_bytes == 0:
@@ -245,79 +447,141 @@ class ImageConverterGUI:
         return f"{size_bytes:.1f} {size_names[i]}"
     
     def convert_files(self):
-        """Convertir archivos (ejecutado en hilo separado)."""
-        import time
+        """
+        Convertir archivos (ejecutado en hilo separado).
+        No toca Tk directamente: todo se publica en progress_queue.
+        """
+        progress_queue = self.progress_queue
+        # Copia tomada al empezar: la lista visible puede cambiar en el hilo de Tk
+        file_paths = self._conversion_files
+        size_checked = self._size_checked
         
         try:
-            target_extension = self.target_var.get()
-            total_files = len(self.selected_files)
+            target_extensions = self._target_extensions
+            total_files = len(file_paths)
+            try:
+                max_workers = max(1, int(self.workers_var.get()))
+            except (tk.TclError, ValueError):
+                max_workers = 1
             
             # Configurar barra de progreso
-            self.root.after(0, lambda: self.progress_bar.config(maximum=total_files, value=0))
-            self.root.after(0, lambda: self.progress_var.set(f"Preparando conversión de {total_files} archivos..."))
+            progress_queue.put(("start", total_files))
             
-            # Registrar tiempo de inicio
-            self.start_time = time.time()
-            success_count = 0
-            failed_count = 0
+            # Verificar tamaño total de archivos aquí y no en el hilo de Tk:
+            # con millones de archivos los stat bloquearían la ventana
+            total_size = self.calculate_total_size(file_paths)
+            progress_queue.put(("size", total_size))
+            size_checked.wait()
+            if self.conversion_cancelled:
+                progress_queue.put(("status", "Conversión cancelada por el usuario"))
+                return
             
-            for i, file_path in enumerate(self.selected_files):
-                # Verificar si se canceló la conversión
-                if self.conversion_cancelled:
-                    self.root.after(0, lambda: self.progress_var.set("Conversión cancelada por el usuario"))
-                    break
-                
-                # Calcular progreso y tiempo estimado
-                current_progress = i + 1
-                percentage = (current_progress / total_files) * 100
-                
-                # Calcular tiempo estimado
-                elapsed_time = time.time() - self.start_time
-                if i > 0:
-                    avg_time_per_file = elapsed_time / i
-                    remaining_files = total_files - i
-                    estimated_remaining = avg_time_per_file * remaining_files
-                    time_str = self.format_time(estimated_remaining)
-                else:
-                    time_str = "Calculando..."
-                
-                # Actualizar interfaz
-                filename = os.path.basename(file_path)
-                self.root.after(0, lambda p=percentage, f=filename, t=time_str, curr=current_progress, total=total_files: 
-                    self.update_progress_display(p, f, t, curr, total))
-                
-                # Convertir archivo
-                try:
-                    if self.converter.convert_single_file(file_path, target_extension):
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                except Exception as e:
-                    failed_count += 1
-                    print(f"Error al convertir {file_path}: {e}")
-                
-                # Pequeña pausa para mantener la interfaz responsiva
-                time.sleep(0.01)
+            self.converter.output_mode = self.mode_var.get()
+            self.converter.incremental = self.incremental_var.get()
+            self.converter.dedup = self.dedup_var.get()
+            self.converter.validate_content = self.validate_var.get()
+            
+            def on_progress(current_progress, total, file_path, ok):
+                progress_queue.put(("progress", current_progress, file_path,
+                                    self._file_sizes.get(file_path, 0)))
+            
+            success_count, failed_count = self.converter.convert_multiple_files(
+                file_paths, target_extensions,
+                max_workers=max_workers,
+                progress_callback=on_progress,
+                should_cancel=lambda: self.conversion_cancelled)
             
             # Finalizar
-            if not self.conversion_cancelled:
-                # Actualizar barra al 100%
-                self.root.after(0, lambda: self.progress_bar.config(value=total_files))
-                
+            if self.conversion_cancelled:
+                progress_queue.put(("status", "Conversión cancelada por el usuario"))
+            else:
                 # Calcular tiempo total
                 total_time = time.time() - self.start_time
                 time_str = self.format_time(total_time)
-                
-                # Mostrar mensaje de éxito
-                self.root.after(0, lambda: self.show_success_message(success_count, failed_count, total_files, time_str))
+                progress_queue.put(("done", success_count, failed_count, total_files, time_str))
             
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Error durante la conversión: {e}"))
+            progress_queue.put(("error", f"Error durante la conversión: {e}"))
         
         finally:
-            # Restaurar interfaz
-            self.root.after(0, lambda: self.convert_button.config(state="normal"))
-            self.root.after(0, lambda: self.cancel_button.config(state="disabled"))
+            progress_queue.put(("finished",))
+    
+    def drain_progress_queue(self):
+        """
+        Consumir los mensajes del hilo de conversión (en el bucle de Tk).
+        Todos los avances acumulados se resumen en una sola actualización.
+        """
+        latest = None
+        finished = False
+        
+        def flush():
+            nonlocal latest
+            if latest is not None:
+                self.show_progress(*latest)
+                latest = None
+        
+        while True:
+            try:
+                message = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            kind = message[0]
+            if kind == "progress":
+                _, current, file_path, size = message
+                self._bytes_done += size
+                latest = (current, file_path)
+                continue
+            
+            flush()
+            if kind == "start":
+                total_files = message[1]
+                self.progress_bar.config(maximum=total_files, value=0)
+                self.progress_var.set(f"Preparando conversión de {total_files} archivos...")
+            elif kind == "size":
+                self.confirm_total_size(message[1])
+            elif kind == "status":
+                self.progress_var.set(message[1])
+            elif kind == "done":
+                _, success_count, failed_count, total_files, time_str = message
+                # Actualizar barra al 100%
+                self.progress_bar.config(value=total_files)
+                self.show_success_message(success_count, failed_count, total_files, time_str)
+            elif kind == "error":
+                messagebox.showerror("Error", message[1])
+            elif kind == "finished":
+                # Restaurar interfaz
+                self.convert_button.config(state="normal")
+                self.set_selection_enabled(True)
+                self.cancel_button.config(state="disabled")
+                finished = True
+        
+        flush()
+        if not finished:
+            self.root.after(self.PROGRESS_INTERVAL_MS, self.drain_progress_queue)
+    
+    def show_progress(self, current, file_path):
+        """
+        Mostrar el avance con un tiempo restante estimado por bytes copiados.
+        
+        Args:
+            current: Archivos procesados
+            file_path: Último archivo procesado
+        """
+        total_files = len(self._conversion_files) or 1
+        percentage = (current / total_files) * 100
+        elapsed_time = time.time() - self.start_time
+        
+        if self._bytes_total and self._bytes_done:
+            bytes_per_second = self._bytes_done / max(elapsed_time, 1e-6)
+            estimated_remaining = max(0, self._bytes_total - self._bytes_done) / bytes_per_second
+        else:
+            # Sin tamaños conocidos: estimar por número de archivos
+            estimated_remaining = elapsed_time / current * (total_files - current)
+        time_str = self.format_time(estimated_remaining)
+        
+        self.update_progress_display(percentage, os.path.basename(file_path), time_str,
+                                     current, total_files)
     
     def update_progress_display(self, percentage, filename, time_str, current, total):
         """Actualizar la visualización de progreso."""
@@ -342,9 +606,14 @@ class ImageConverterGUI:
         subfolders_info = ""
         if success_count > 0:
             summary = self.converter.get_conversion_summary()
-            subfolders = set(item['subfolder'] for item in summary['converted'])
+            subfolders = sorted(summary['subfolders'])
             if subfolders:
-                subfolders_info = f"\n\n📁 Subcarpetas creadas:\n" + "\n".join(f"   • {subfolder}" for subfolder in sorted(subfolders))
+                subfolders_info = f"\n\n📁 Subcarpetas creadas:\n" + "\n".join(
+                    f"   • {subfolder}" for subfolder in subfolders[:self.MAX_LISTED_SUBFOLDERS])
+                if len(subfolders) > self.MAX_LISTED_SUBFOLDERS:
+                    subfolders_info += f"\n   … y {len(subfolders) - self.MAX_LISTED_SUBFOLDERS} más"
+            if summary['bytes_saved']:
+                subfolders_info += f"\n\n♻ Espacio ahorrado por duplicados: {self.format_size(summary['bytes_saved'])}"
         
         # Mensaje principal
         if failed_count == 0:
@@ -373,15 +642,21 @@ class ImageConverterGUI:
     
     def run(self):
         """Ejecutar la aplicación."""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.thumbnail_worker.close()
 
 
-def main():
+def main(thumbnail_cache_dir=None):
     """
     Función principal para ejecutar la GUI.
+    
+    Args:
+        thumbnail_cache_dir: Carpeta de la caché de miniaturas en disco (opcional)
     """
     try:
-        app = ImageConverterGUI()
+        app = ImageConverterGUI(thumbnail_cache_dir)
         app.run()
     except Exception as e:
         messagebox.showerror("Error", f"Error al iniciar la aplicación: {e}")
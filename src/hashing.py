@@ -0,0 +1,52 @@
+"""
+Utilidades de hash de contenido en streaming.
+"""
+
+import hashlib
+
+# Algoritmo por defecto: BLAKE2b es rápido y está en la biblioteca estándar
+DEFAULT_ALGORITHM = 'blake2b'
+
+# Tamaño de bloque para leer los archivos
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM):
+    """
+    Crear un objeto hash incremental.
+
+    Args:
+        algorithm: Nombre del algoritmo de hashlib
+
+    Returns:
+        Objeto hash de hashlib
+    """
+    if algorithm == 'blake2b':
+        # 128 bits bastan para identificar contenido y reducen el tamaño del índice
+        return hashlib.blake2b(digest_size=16)
+    return hashlib.new(algorithm)
+
+
+def file_digest(file_path: str, algorithm: str = DEFAULT_ALGORITHM,
+                chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    Calcular el hash de un archivo leyéndolo en bloques.
+
+    Args:
+        file_path: Ruta del archivo
+        algorithm: Nombre del algoritmo de hashlib
+        chunk_size: Tamaño del bloque de lectura
+
+    Returns:
+        str: Hash en hexadecimal
+    """
+    hasher = new_hasher(algorithm)
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+    return hasher.hexdigest()
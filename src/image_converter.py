@@ -3,11 +3,28 @@ Módulo para conversión de extensiones de imágenes.
 Convierte imágenes a extensiones personalizadas (.1, .2, .3, .4, .5, .6)
 """
 
+import io
 import os
-import shutil
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
-from typing import List, Tuple
-from PIL import Image
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .archive import (ARCHIVE_FORMATS, ArchiveWriter, archive_entry_name, archive_path_for,
+                      check_archive_format, stream_file)
+from .copy_backends import (CACHE_POLICIES, FSYNC_POLICIES, OUTPUT_MODES, SYNC_BATCH_SIZE,
+                            place_file, sync_all, write_atomically)
+from .dedup import find_duplicates
+from .hashing import file_digest, new_hasher
+from .journal import ConversionJournal
+from .manifest import ManifestSet
+from .metrics import ConversionMetrics
+from .planner import COLLISION_POLICIES, BatchPlanner, CollisionError, PlannedFile
+from .results import MAX_FAILURES, MAX_RECORDS, ResultStore
+from .scanner import iter_image_files
+from .scheduler import SCHEDULE_ORDERS, DeviceScheduler
+from .sniffing import BATCH_SIZE, HeaderCache
+from .transcoder import TranscodeOptions, transcode_file, transcode_to
 
 
 class ImageConverter:
@@ -21,10 +38,194 @@ class ImageConverter:
     # Extensiones de destino disponibles
     TARGET_EXTENSIONS = ['.1', '.2', '.3', '.4', '.5', '.6']
     
-    def __init__(self):
-        """Inicializar el convertidor."""
-        self.converted_files = []
-        self.failed_files = []
+    # Tipos de ejecutor disponibles para el modo paralelo
+    EXECUTOR_TYPES = ('thread', 'process')
+    
+    # Modos de salida disponibles (copy = copia física completa)
+    OUTPUT_MODES = OUTPUT_MODES
+    
+    # Cómo se crean los destinos adicionales a partir del primero (fan-out)
+    FAN_OUT_MODES = ('hardlink', 'reflink', 'copy')
+    
+    # Políticas de fsync ('file', 'batch' o 'none')
+    FSYNC_POLICIES = FSYNC_POLICIES
+    
+    # Uso de la caché de páginas al copiar ('normal', 'nocache' o 'direct')
+    CACHE_POLICIES = CACHE_POLICIES
+    
+    # Políticas ante orígenes distintos con el mismo destino
+    COLLISION_POLICIES = COLLISION_POLICIES
+    
+    # Formatos de archivo comprimido para la salida en archivo
+    ARCHIVE_FORMATS = ARCHIVE_FORMATS
+    
+    # Orden de los archivos dentro de cada dispositivo ('none' = el de la lista)
+    IO_ORDERS = SCHEDULE_ORDERS
+    
+    # Error registrado para archivos cuya firma no es de una imagen
+    INVALID_CONTENT_ERROR = "Contenido no reconocido como imagen"
+    
+    def __init__(self, max_workers: int = 1, executor: str = 'thread',
+                 copy_strategies: Optional[Sequence[str]] = None,
+                 output_mode: str = 'copy', incremental: bool = False,
+                 manifest_hash: bool = False, dedup: bool = False,
+                 transcode: Optional[TranscodeOptions] = None,
+                 validate_content: bool = False,
+                 header_cache: Optional[HeaderCache] = None,
+                 collect_metrics: bool = False,
+                 metrics_path: Optional[str] = None,
+                 max_records: Optional[int] = MAX_RECORDS,
+                 max_failures: Optional[int] = MAX_FAILURES,
+                 results_log: Optional[str] = None,
+                 collision_policy: str = 'suffix',
+                 fan_out_mode: str = 'hardlink',
+                 fsync_policy: str = 'none',
+                 journal_path: Optional[str] = None,
+                 archive_format: Optional[str] = None,
+                 archive_dir: str = '.',
+                 device_workers: Optional[int] = None,
+                 io_order: str = 'none',
+                 cache_policy: str = 'normal',
+                 checksum: bool = False,
+                 verify: bool = False):
+        """
+        Inicializar el convertidor.
+        
+        Args:
+            max_workers: Número de trabajadores para conversiones múltiples
+                (1 = modo secuencial)
+            executor: Tipo de ejecutor paralelo ('thread' o 'process')
+            copy_strategies: Estrategias de copia en orden de preferencia
+                (por defecto reflink, copy_file_range, sendfile y bucle Python en Linux)
+            output_mode: Cómo se crea el destino: 'copy', 'hardlink', 'symlink',
+                'reflink' o 'move' (con copia como respaldo si no es posible)
+            incremental: Omitir los archivos sin cambios desde la última
+                conversión según el manifiesto de cada carpeta de salida
+            manifest_hash: Guardar el hash del contenido en el manifiesto para
+                reconocer archivos idénticos aunque cambien sus metadatos
+            dedup: Escribir una sola copia por contenido único y enlazar
+                (enlace duro) los demás destinos a ella
+            transcode: Opciones para recodificar las imágenes con Pillow en lugar
+                de copiar los bytes (None = solo cambiar la extensión)
+            validate_content: Rechazar antes de copiar los archivos cuya firma
+                (magic bytes) no sea de una imagen o que estén truncados
+            header_cache: Caché de firmas compartida (por defecto una propia)
+            collect_metrics: Medir la latencia de cada fase, los bytes por
+                estrategia y los errores (ver get_conversion_summary())
+            metrics_path: Archivo donde guardar las métricas al terminar cada
+                conversión múltiple (.prom = Prometheus, otro = JSON);
+                implica collect_metrics
+            max_records: Resultados detallados que se conservan en memoria
+                (los totales cubren siempre toda la ejecución; None = todos)
+            max_failures: Fallos detallados que se conservan en memoria
+                (None = todos)
+            results_log: Archivo JSONL donde volcar el resultado de cada archivo
+            collision_policy: Qué hacer cuando dos orígenes de una conversión
+                múltiple tienen el mismo destino (a.jpg y a.png -> a.1):
+                'suffix' (a_1.1), 'skip', 'fail' u 'overwrite'
+            fan_out_mode: Con varias extensiones de destino, cómo se crean las
+                adicionales a partir del primer destino sin volver a leer el
+                origen: 'hardlink' (con copia como respaldo), 'reflink' o 'copy'
+            fsync_policy: Durabilidad de las escrituras: 'file' (fsync de cada
+                destino), 'batch' (sincronizar cada SYNC_BATCH_SIZE archivos)
+                o 'none' (el kernel decide); las escrituras siempre son
+                atómicas (temporal + renombrado)
+            journal_path: Diario del trabajo: si una conversión múltiple se
+                interrumpe, la siguiente con el mismo diario continúa donde se quedó
+            archive_format: En las conversiones múltiples, escribir cada
+                extensión como entradas de un único archivo 'tar', 'tar.gz',
+                'tar.zst' o 'zip' en lugar de un archivo suelto por imagen
+                (None = archivos sueltos)
+            archive_dir: Carpeta de los archivos comprimidos (<extensión>.<formato>);
+                los nombres de las entradas son relativos a ella
+            device_workers: Trabajos simultáneos como máximo en cada
+                dispositivo (st_dev), para que un disco lento no retenga al
+                resto (None = sin límite)
+            io_order: Orden de ejecución dentro de cada dispositivo: 'inode',
+                'physical' (posición en disco con FIEMAP) o 'none'; en ambos
+                casos los archivos grandes empiezan primero
+            cache_policy: Uso de la caché de páginas al copiar: 'normal',
+                'nocache' (no desplazar los datos de otros servicios) o
+                'direct' (además O_DIRECT al leer archivos muy grandes)
+            checksum: Calcular el hash BLAKE2b del contenido mientras se copia
+                (sin releer el origen) y guardarlo en los resultados ('digest');
+                los datos pasan por el bucle de copia en Python
+            verify: Releer cada copia antes de renombrarla, con sus páginas aún
+                en caché, y rechazarla si no coincide con el origen; implica checksum
+        """
+        if executor not in self.EXECUTOR_TYPES:
+            raise ValueError(f"Tipo de ejecutor no válido: {executor}")
+        if output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"Modo de salida no válido: {output_mode}")
+        if collision_policy not in self.COLLISION_POLICIES:
+            raise ValueError(f"Política de colisiones no válida: {collision_policy}")
+        if fan_out_mode not in self.FAN_OUT_MODES:
+            raise ValueError(f"Modo de fan-out no válido: {fan_out_mode}")
+        if fsync_policy not in self.FSYNC_POLICIES:
+            raise ValueError(f"Política de fsync no válida: {fsync_policy}")
+        if cache_policy not in self.CACHE_POLICIES:
+            raise ValueError(f"Política de caché no válida: {cache_policy}")
+        if io_order not in self.IO_ORDERS:
+            raise ValueError(f"Orden de E/S no válido: {io_order}")
+        if device_workers is not None and device_workers < 1:
+            raise ValueError(f"Trabajadores por dispositivo no válidos: {device_workers}")
+        if archive_format is not None:
+            check_archive_format(archive_format)
+            if output_mode != 'copy' or incremental or journal_path:
+                raise ValueError("La salida en archivo solo admite el modo 'copy', "
+                                 "sin modo incremental ni diario")
+        self.max_workers = max(1, int(max_workers))
+        self.executor = executor
+        self.copy_strategies = tuple(copy_strategies) if copy_strategies else None
+        self.output_mode = output_mode
+        self.incremental = incremental
+        self.manifest_hash = manifest_hash
+        self.dedup = dedup
+        self.transcode = transcode
+        self.validate_content = validate_content
+        self._header_cache = header_cache if header_cache is not None else HeaderCache()
+        self.collision_policy = collision_policy
+        self.fan_out_mode = fan_out_mode
+        self.fsync_policy = fsync_policy
+        self.journal_path = journal_path
+        self.archive_format = archive_format
+        self.device_workers = device_workers
+        self.io_order = io_order
+        self.cache_policy = cache_policy
+        self.verify = verify
+        self.checksum = checksum or verify
+        self.archive_dir = archive_dir
+        # Archivos comprimidos de la última conversión múltiple por extensión
+        self._archive_paths: Dict[str, str] = {}
+        # Plan de la última conversión múltiple (destinos renombrados)
+        self._planner: Optional[BatchPlanner] = None
+        self.max_records = max_records
+        self.max_failures = max_failures
+        self.results_log = results_log
+        self.results = self._new_result_store()
+        self.bytes_saved = 0
+        self.metrics_path = metrics_path
+        self.metrics = ConversionMetrics() if collect_metrics or metrics_path else None
+        self._lock = threading.Lock()
+    
+    def _new_result_store(self) -> ResultStore:
+        """Crear el almacén de resultados de una ejecución."""
+        return ResultStore(self.max_records, self.max_failures, self.results_log)
+    
+    @property
+    def converted_files(self):
+        """Registros de las conversiones exitosas más recientes."""
+        return self.results.records
+    
+    @property
+    def failed_files(self):
+        """Fallos más recientes ({'file': ruta, 'error': mensaje})."""
+        return self.results.failures
+    
+    @property
+    def skipped_files(self):
+        """Archivos omitidos más recientes por no tener cambios."""
+        return self.results.skipped
     
     def is_image_file(self, file_path: str) -> bool:
         """
@@ -42,35 +243,92 @@ class ImageConverter:
         except Exception:
             return False
     
-    def get_image_files_from_folder(self, folder_path: str) -> List[str]:
+    def iter_image_files(self, folder_path: str, recursive: bool = False,
+                         max_depth: Optional[int] = None,
+                         include: Optional[Sequence[str]] = None,
+                         exclude: Optional[Sequence[str]] = None) -> Iterator[str]:
+        """
+        Generar las rutas de imagen de una carpeta a medida que se encuentran.
+        Es la vía rápida: no ordena y permite empezar a convertir antes de
+        terminar la exploración.
+        
+        Args:
+            folder_path: Ruta de la carpeta
+            recursive: Incluir subcarpetas
+            max_depth: Niveles máximos de subcarpetas (None = sin límite)
+            include: Patrones glob que deben cumplir los archivos
+            exclude: Patrones glob de archivos y carpetas a ignorar
+            
+        Yields:
+            str: Ruta de cada archivo de imagen
+        """
+        return iter_image_files(folder_path, self.SUPPORTED_EXTENSIONS,
+                                recursive=recursive, max_depth=max_depth,
+                                include=include, exclude=exclude,
+                                onerror=lambda e: print(f"Error al leer carpeta: {e}"))
+    
+    def get_image_files_from_folder(self, folder_path: str, recursive: bool = False,
+                                    max_depth: Optional[int] = None,
+                                    include: Optional[Sequence[str]] = None,
+                                    exclude: Optional[Sequence[str]] = None,
+                                    sort: bool = True) -> List[str]:
         """
         Obtener lista de archivos de imagen de una carpeta.
         
         Args:
             folder_path: Ruta de la carpeta
+            recursive: Incluir subcarpetas
+            max_depth: Niveles máximos de subcarpetas (None = sin límite)
+            include: Patrones glob que deben cumplir los archivos
+            exclude: Patrones glob de archivos y carpetas a ignorar
+            sort: Ordenar la lista por ruta
             
         Returns:
             List[str]: Lista de rutas de archivos de imagen
         """
-        image_files = []
-        try:
-            folder = Path(folder_path)
-            if not folder.exists():
-                return image_files
-            
-            for file_path in folder.iterdir():
-                if file_path.is_file() and self.is_image_file(str(file_path)):
-                    image_files.append(str(file_path))
-        except Exception as e:
-            print(f"Error al leer carpeta: {e}")
+        if not os.path.isdir(folder_path):
+            return []
         
-        return sorted(image_files)
+        image_files = list(self.iter_image_files(folder_path, recursive, max_depth,
+                                                 include, exclude))
+        if sort:
+            image_files.sort()
+        return image_files
+    
+    def target_path_for(self, source_path: str, target_extension: str) -> Tuple[Path, Path]:
+        """
+        Calcular la subcarpeta y la ruta de destino de un archivo.
+        
+        Args:
+            source_path: Ruta del archivo original
+            target_extension: Nueva extensión (ej: '.1')
+            
+        Returns:
+            Tuple[Path, Path]: (subcarpeta de salida, ruta del archivo destino)
+        """
+        planner = self._planner
+        if planner is not None and (target_extension == planner.target_extension or
+                                    target_extension in planner.extra_extensions):
+            # Respetar el nombre asignado por el plan si hubo una colisión
+            target = planner.target_for(source_path, target_extension)
+            archive_path = self._archive_paths.get(target_extension)
+            if archive_path is not None:
+                # Salida en archivo: la entrada dentro del archivo comprimido
+                entry = archive_entry_name(target, self.archive_dir)
+                return Path(archive_path), Path(archive_path, entry)
+            target = Path(target)
+            return target.parent, target
+        source = Path(source_path)
+        output_dir = source.parent / target_extension[1:]  # Quitar el punto inicial (.1 -> 1)
+        return output_dir, output_dir / f"{source.stem}{target_extension}"
     
     def convert_single_file(self, source_path: str, target_extension: str) -> bool:
         """
         Convertir un solo archivo a la nueva extensión.
         Crea automáticamente una subcarpeta con el nombre de la extensión.
         Optimizado para manejar archivos grandes de manera eficiente.
+        Las conversiones múltiples no pasan por aquí: usan la fase de
+        planificación (BatchPlanner), que no repite estas comprobaciones.
         
         Args:
             source_path: Ruta del archivo original
@@ -79,136 +337,850 @@ class ImageConverter:
         Returns:
             bool: True si la conversión fue exitosa, False en caso contrario
         """
+        # Con las métricas desactivadas cada fase solo cuesta comprobar None
+        metrics = self.metrics
+        started = metrics.now() if metrics else 0.0
         try:
             source = Path(source_path)
             
-            if not source.exists():
+            try:
+                source_stat = source.stat()
+            except OSError:
                 print(f"Archivo no encontrado: {source_path}")
+                if metrics:
+                    metrics.add_error('not_found')
                 return False
+            if metrics:
+                started = metrics.observe('stat', started)
             
             if not self.is_image_file(source_path):
                 print(f"No es un archivo de imagen válido: {source_path}")
+                if metrics:
+                    metrics.add_error('unsupported_extension')
                 return False
+            if metrics:
+                started = metrics.observe('is_image_file', started)
+            
+            # Comprobar la firma del contenido (caché por inodo y mtime)
+            if self.validate_content:
+                image_format = self._header_cache.get_format(source_path, source_stat)
+                if metrics:
+                    started = metrics.observe('validate', started)
+                if image_format is None:
+                    print(f"Contenido no reconocido como imagen: {source_path}")
+                    self._record_failure(source_path, self.INVALID_CONTENT_ERROR)
+                    if metrics:
+                        metrics.add_error('invalid_content')
+                    return False
             
             # Verificar que la nueva extensión sea válida
             if target_extension not in self.TARGET_EXTENSIONS:
                 print(f"Extensión de destino no válida: {target_extension}")
+                if metrics:
+                    metrics.add_error('invalid_target_extension')
                 return False
             
             # Crear subcarpeta con el nombre de la extensión
-            subfolder_name = target_extension[1:]  # Quitar el punto inicial (.1 -> 1)
-            output_dir = source.parent / subfolder_name
+            output_dir, target_path = self.target_path_for(source_path, target_extension)
             output_dir.mkdir(exist_ok=True)
+            if metrics:
+                started = metrics.observe('mkdir', started)
             
-            # Crear ruta del archivo de destino
-            target_path = output_dir / f"{source.stem}{target_extension}"
+            item = PlannedFile(source_path)
+            item.stat = source_stat
+            item.output_dir = str(output_dir)
+            item.target = str(target_path)
+            item.target_exists = target_path.exists()
+            if metrics:
+                started = metrics.observe('target_exists', started)
             
+        except Exception as e:
+            print(f"Error al convertir {source_path}: {e}")
+            self._record_failure(source_path, str(e))
+            if metrics:
+                metrics.add_error(type(e).__name__)
+            return False
+        
+        return self._write_target(item, target_extension, started)
+    
+    def _convert_planned(self, item: PlannedFile, target_extension: str) -> bool:
+        """
+        Convertir un archivo ya planificado: el stat, la carpeta de salida y
+        la comprobación del destino se hicieron en la fase de planificación.
+        
+        Args:
+            item: Archivo planificado sin error
+            target_extension: Nueva extensión
+            
+        Returns:
+            bool: True si la conversión fue exitosa
+        """
+        metrics = self.metrics
+        return self._write_target(item, target_extension, metrics.now() if metrics else 0.0)
+    
+    def _write_target(self, item: PlannedFile, target_extension: str, started: float) -> bool:
+        """
+        Escribir el destino de un archivo y registrar el resultado.
+        
+        Args:
+            item: Archivo con su stat, carpeta de salida y destino
+            target_extension: Nueva extensión
+            started: Inicio de la fase de copia (para las métricas)
+            
+        Returns:
+            bool: True si la conversión fue exitosa
+        """
+        metrics = self.metrics
+        try:
             # Verificar si el archivo de destino ya existe
-            if target_path.exists():
-                print(f"⚠️ Archivo ya existe, sobrescribiendo: {target_path.name}")
-            
-            # Copiar el archivo con la nueva extensión de manera eficiente
-            # Para archivos grandes, usar copyfileobj para mejor rendimiento
-            file_size = source.stat().st_size
-            if file_size > 50 * 1024 * 1024:  # 50MB
-                # Para archivos grandes, copiar en chunks
-                self._copy_large_file(source_path, str(target_path))
+            if item.target_exists:
+                print(f"⚠️ Archivo ya existe, sobrescribiendo: {os.path.basename(item.target)}")
+            
+            # Crear el archivo con la nueva extensión según el modo de salida.
+            # En modo copia el kernel hace el trabajo (reflink, copy_file_range
+            # o sendfile) siempre que puede; el bucle en Python es el último recurso
+            # Siempre se escribe en un temporal que se renombra al terminar
+            file_size = item.stat.st_size
+            fsync = self.fsync_policy == 'file'
+            digest = None
+            if self.transcode is not None:
+                write_atomically(lambda temp: transcode_file(item.source, temp, self.transcode),
+                                 item.target, fsync)
+                mode, strategy = 'transcode', self.transcode.image_format.lower()
+                if self.checksum:
+                    # El resultado es pequeño y acaba de escribirse: se lee de la caché
+                    digest = file_digest(item.target)
             else:
-                # Para archivos pequeños, usar copy2 (preserva metadatos)
-                shutil.copy2(source_path, target_path)
+                hasher = new_hasher() if self.checksum else None
+                mode, strategy = place_file(item.source, item.target, self.output_mode,
+                                            self.copy_strategies, fsync, self.cache_policy,
+                                            hasher, self.verify)
+                # Con hash toda copia pasa por el bucle en Python; los enlaces no leen datos
+                if hasher is not None and strategy == 'python':
+                    digest = hasher.hexdigest()
+            if metrics:
+                metrics.observe('copy', started)
+                metrics.add_bytes(strategy, file_size)
             
-            self.converted_files.append({
-                'original': source_path,
-                'converted': str(target_path),
+            self._record_success({
+                'original': item.source,
+                'converted': item.target,
                 'extension': target_extension,
-                'subfolder': str(output_dir),
-                'size': file_size
+                'subfolder': item.output_dir,
+                'size': file_size,
+                'mode': mode,
+                'strategy': strategy,
+                'digest': digest
             })
+            self._fan_out(item, file_size, digest)
             
             return True
             
         except Exception as e:
-            print(f"Error al convertir {source_path}: {e}")
-            self.failed_files.append({
-                'file': source_path,
-                'error': str(e)
-            })
+            print(f"Error al convertir {item.source}: {e}")
+            self._record_failure(item.source, str(e))
+            if metrics:
+                metrics.add_error(type(e).__name__)
             return False
     
-    def _copy_large_file(self, source_path: str, target_path: str, chunk_size: int = 1024 * 1024):
+    def _fan_out(self, item: PlannedFile, file_size: int, digest: Optional[str] = None):
         """
-        Copiar archivos grandes en chunks para optimizar memoria.
+        Crear los destinos de las extensiones adicionales sin volver a leer el
+        origen: se enlazan o se clonan desde el destino principal ya escrito.
         
         Args:
-            source_path: Ruta del archivo origen
-            target_path: Ruta del archivo destino
-            chunk_size: Tamaño del chunk en bytes (1MB por defecto)
+            item: Archivo cuyo destino principal ya existe
+            file_size: Tamaño del origen
+            digest: Hash del destino principal (los adicionales tienen el mismo contenido)
         """
-        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
-            while True:
-                chunk = src.read(chunk_size)
-                if not chunk:
-                    break
-                dst.write(chunk)
+        fsync = self.fsync_policy == 'file'
+        for extension, output_dir, target in item.extra_targets:
+            if self.transcode is None and self.output_mode in ('hardlink', 'symlink'):
+                # Los enlaces no leen datos: se crean igual que el principal
+                mode, strategy = place_file(item.source, target, self.output_mode,
+                                            self.copy_strategies, fsync, self.cache_policy)
+            else:
+                # Solo se vuelve a calcular el hash si hay que verificar la copia
+                hasher = new_hasher() if self.verify and digest is not None else None
+                mode, strategy = place_file(item.target, target, self.fan_out_mode,
+                                            self.copy_strategies, fsync, self.cache_policy,
+                                            hasher, self.verify)
+            if self.metrics:
+                self.metrics.add_bytes(strategy, file_size)
+            self._record_success({
+                'original': item.source,
+                'converted': target,
+                'extension': extension,
+                'subfolder': output_dir,
+                'size': file_size,
+                'mode': mode,
+                'strategy': strategy,
+                'digest': digest
+            })
+    
+    def _convert_to_archive(self, item: PlannedFile, target_extension: str,
+                            archives: Dict[str, ArchiveWriter]) -> bool:
+        """
+        Añadir un archivo planificado como entrada de los archivos comprimidos
+        de todas sus extensiones, leyendo el origen una sola vez.
+        
+        Args:
+            item: Archivo planificado sin error
+            target_extension: Extensión principal
+            archives: Archivo comprimido abierto de cada extensión
+            
+        Returns:
+            bool: True si la conversión fue exitosa
+        """
+        metrics = self.metrics
+        started = metrics.now() if metrics else 0.0
+        targets = [(target_extension, item.target)]
+        targets += [(extension, target) for extension, _, target in item.extra_targets]
+        entries = [(archives[extension], archive_entry_name(target, self.archive_dir))
+                   for extension, target in targets]
+        file_size = item.stat.st_size
+        hasher = new_hasher() if self.checksum else None
+        try:
+            if self.transcode is not None:
+                buffer = io.BytesIO()
+                transcode_to(item.source, buffer, self.transcode)
+                data = buffer.getvalue()
+                if hasher is not None:
+                    hasher.update(data)
+                for writer, name in entries:
+                    writer.add_bytes(name, data, item.stat.st_mtime)
+            else:
+                stream_file(item.source, entries, file_size, item.stat.st_mtime,
+                            hasher=hasher)
+        except Exception as e:
+            print(f"Error al convertir {item.source}: {e}")
+            self._record_failure(item.source, str(e))
+            if metrics:
+                metrics.add_error(type(e).__name__)
+            return False
+        
+        if metrics:
+            metrics.observe('copy', started)
+        for (extension, _), (writer, name) in zip(targets, entries):
+            if metrics:
+                metrics.add_bytes(writer.format, file_size)
+            self._record_success({
+                'original': item.source,
+                'converted': os.path.join(writer.path, name),
+                'extension': extension,
+                'subfolder': writer.path,
+                'size': file_size,
+                'mode': 'archive',
+                'strategy': writer.format,
+                'digest': hasher.hexdigest() if hasher is not None else None
+            })
+        return True
+    
+    def _open_archives(self, extensions: Sequence[str]) -> Dict[str, ArchiveWriter]:
+        """Crear el archivo comprimido de cada extensión de destino."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archives = {}
+        try:
+            for extension in extensions:
+                path = archive_path_for(self.archive_dir, extension, self.archive_format)
+                archives[extension] = ArchiveWriter(path, self.archive_format,
+                                                    fsync=self.fsync_policy != 'none')
+        except BaseException:
+            for writer in archives.values():
+                writer.abort()
+            raise
+        self._archive_paths = {extension: writer.path for extension, writer in archives.items()}
+        return archives
+    
+    @staticmethod
+    def _close_archives(archives: Dict[str, ArchiveWriter]):
+        """Terminar los archivos comprimidos (también tras cancelar)."""
+        for writer in archives.values():
+            try:
+                writer.close()
+                print(f"Archivo creado: {writer.path} ({writer.entries} entradas)")
+            except Exception as e:
+                print(f"No se pudo terminar el archivo {writer.path}: {e}")
+                writer.abort()
+    
+    def _reject_planned(self, item: PlannedFile):
+        """Registrar un archivo que la planificación descartó."""
+        print(f"{item.error}: {item.source}")
+        self._record_failure(item.source, item.error)
+        if self.metrics:
+            self.metrics.add_error(item.error_kind)
+    
+    def _record_success(self, record: dict):
+        """Registrar una conversión exitosa (seguro entre hilos)."""
+        with self._lock:
+            self.results.add_success(record)
+    
+    def _record_failure(self, source_path: str, error: str):
+        """Registrar una conversión fallida (seguro entre hilos)."""
+        with self._lock:
+            self.results.add_failure(source_path, error)
+    
+    def _record_skipped(self, source_path: str):
+        """Registrar un archivo omitido por no tener cambios (seguro entre hilos)."""
+        with self._lock:
+            self.results.add_skipped(source_path)
     
-    def convert_multiple_files(self, file_paths: List[str], target_extension: str) -> Tuple[int, int]:
+    def convert_multiple_files(self, file_paths: Iterable[str],
+                               target_extension: Union[str, Sequence[str]],
+                               max_workers: Optional[int] = None,
+                               executor: Optional[str] = None,
+                               progress_callback: Optional[Callable[[int, Optional[int], str, bool], None]] = None,
+                               should_cancel: Optional[Callable[[], bool]] = None,
+                               pool: Optional[Executor] = None) -> Tuple[int, int]:
         """
         Convertir múltiples archivos a la nueva extensión.
         Crea automáticamente subcarpetas organizadas por extensión.
+        Con más de un trabajador los archivos se procesan en paralelo.
         
         Args:
-            file_paths: Lista de rutas de archivos
-            target_extension: Nueva extensión
+            file_paths: Rutas de archivos (lista o cualquier iterable)
+            target_extension: Nueva extensión, o varias para escribirlas todas
+                con una sola lectura de cada origen (fan-out; ver fan_out_mode)
+            max_workers: Número de trabajadores (por defecto el del convertidor)
+            executor: 'thread' o 'process' (por defecto el del convertidor)
+            progress_callback: Función llamada tras cada archivo con
+                (procesados, total, ruta, éxito); total es None si se desconoce
+            should_cancel: Función que devuelve True para detener la conversión
+            pool: Pool ya creado que se reutiliza en lugar de crear uno nuevo
+                (no se cierra al terminar); su tipo determina el ejecutor
             
         Returns:
             Tuple[int, int]: (archivos convertidos exitosamente, archivos fallidos)
         """
-        self.converted_files = []
-        self.failed_files = []
+        self.results.close()
+        self.results = self._new_result_store()
+        self.bytes_saved = 0
+        if self.metrics is not None:
+            self.metrics = ConversionMetrics()
+        
+        workers = self.max_workers if max_workers is None else max(1, int(max_workers))
+        executor = executor or self.executor
+        if executor not in self.EXECUTOR_TYPES:
+            raise ValueError(f"Tipo de ejecutor no válido: {executor}")
+        # Decodificar imágenes es trabajo de CPU: usar procesos para evitar el GIL
+        if self.transcode is not None and workers > 1:
+            executor = 'process'
+        if pool is not None:
+            # Importación diferida: multiprocessing solo se carga si se usan procesos
+            from concurrent.futures import ProcessPoolExecutor
+            executor = 'process' if isinstance(pool, ProcessPoolExecutor) else 'thread'
+        if isinstance(target_extension, str):
+            extensions = [target_extension]
+        else:
+            extensions = list(dict.fromkeys(target_extension))
+        if not extensions:
+            raise ValueError("No se indicó ninguna extensión de destino")
+        for extension in extensions:
+            if extension not in self.TARGET_EXTENSIONS:
+                raise ValueError(f"Extensión de destino no válida: {extension}")
+        target_extension = extensions[0]
+        
+        # La planificación hace un stat por archivo y crea y lista cada carpeta
+        # de salida una sola vez; también decide el destino de las colisiones
+        # En la salida en archivo no se crean carpetas, solo los nombres de las entradas
+        planner = BatchPlanner(target_extension, self.SUPPORTED_EXTENSIONS,
+                               self.collision_policy, self.metrics,
+                               extra_extensions=extensions[1:],
+                               create_dirs=self.archive_format is None)
         
+        total_files = len(file_paths) if hasattr(file_paths, '__len__') else None
+        if total_files is not None and self.collision_policy == 'fail':
+            # Con la lista completa, abortar antes de escribir nada
+            planner.check_collisions(file_paths)
+        total_label = total_files if total_files is not None else '?'
         success_count = 0
-        total_files = len(file_paths)
+        processed = 0
+        
+        # En modo incremental el manifiesto lo gestiona solo este hilo
+        manifests = None
+        pending_manifest = {}
+        if self.incremental:
+            manifests = ManifestSet(self.manifest_hash)
+        
+        # Diario del trabajo: lo ya terminado en una ejecución interrumpida se omite
+        journal = None
+        pending_journal = {}
+        if self.journal_path:
+            journal = ConversionJournal(self.journal_path, extensions, self.fsync_policy)
+            if journal.completed:
+                print(f"Reanudando trabajo: {len(journal.completed)} archivos ya terminados")
+        unsynced = 0
         
-        print(f"\nIniciando conversión de {total_files} archivos...")
-        print(f"Extensión de destino: {target_extension}")
-        print(f"Los archivos se guardarán en subcarpetas organizadas por extensión.")
+        # Copias canónicas de los duplicados ya convertidas (o al día)
+        canonicals = set()
+        ready = set()
+        
+        def on_result(file_path: str, ok: bool):
+            nonlocal success_count, processed, unsynced
+            processed += 1
+            if ok:
+                success_count += 1
+                if file_path in canonicals:
+                    ready.add(file_path)
+            entry = pending_manifest.pop(file_path, None)
+            if ok and entry is not None:
+                manifest, stat, target_path = entry
+                manifest.record(file_path, target_path, stat)
+            stat = pending_journal.pop(file_path, None)
+            if ok and stat is not None:
+                journal.record(file_path, stat)
+            if ok and self.fsync_policy == 'batch':
+                unsynced += 1
+                if unsynced >= SYNC_BATCH_SIZE:
+                    # Los datos del lote llegan a disco antes que su entrada en el diario
+                    sync_all()
+                    if journal is not None:
+                        journal.flush()
+                    unsynced = 0
+            if progress_callback:
+                progress_callback(processed, total_files, file_path, ok)
+        
+        # Validar las firmas por lotes antes de cualquier copia
+        if self.validate_content:
+            file_paths = self._reject_invalid_content(file_paths, workers, on_result)
+        
+        # La deduplicación necesita ver todos los archivos antes de empezar
+        duplicates = {}
+        if self.dedup:
+            if self.archive_format is not None:
+                print("Deduplicación omitida: la salida en archivo no admite enlaces")
+            elif self.transcode is not None or self.output_mode in ('copy', 'reflink'):
+                file_paths = list(file_paths)
+                duplicates = find_duplicates(f for f in file_paths if self.is_image_file(f))
+                canonicals.update(duplicates.values())
+            else:
+                print(f"Deduplicación omitida: el modo '{self.output_mode}' no duplica contenido")
+        
+        print(f"\nIniciando conversión de {total_label} archivos...")
+        print(f"Extensión de destino: {', '.join(extensions)}")
+        archives = {}
+        if self.archive_format is not None:
+            archives = self._open_archives(extensions)
+            print(f"Salida en archivo ({self.archive_format}): " +
+                  ", ".join(writer.path for writer in archives.values()))
+        elif workers > 1:
+            print(f"Modo paralelo: {workers} trabajadores ({executor})")
+        if not archives:
+            print(f"Los archivos se guardarán en subcarpetas organizadas por extensión.")
         print("-" * 60)
         
-        for i, file_path in enumerate(file_paths, 1):
-            print(f"[{i}/{total_files}] Procesando: {Path(file_path).name}")
+        def planned_files(sources):
+            # Los rechazos y los archivos al día se resuelven sin llegar al ejecutor
+            for item in planner.plan(sources):
+                if item.error is not None:
+                    self._reject_planned(item)
+                    on_result(item.source, False)
+                elif journal is not None and item.target_exists and \
+                        journal.is_done(item.source, item.stat):
+                    self._record_skipped(item.source)
+                    on_result(item.source, True)
+                elif manifests is not None and self._is_up_to_date(
+                        item, manifests, pending_manifest):
+                    self._record_skipped(item.source)
+                    on_result(item.source, True)
+                else:
+                    if journal is not None:
+                        pending_journal[item.source] = item.stat
+                    yield item
+        
+        finished = False
+        # target_path_for resuelve los destinos con este plan solo mientras dura el lote
+        self._planner = planner
+        try:
+            pending = planned_files(f for f in file_paths if f not in duplicates)
+            if archives:
+                # Un archivo comprimido es un flujo secuencial: un único escritor
+                for item in pending:
+                    if should_cancel and should_cancel():
+                        break
+                    print(f"[{processed + 1}/{total_label}] Procesando: {os.path.basename(item.source)}")
+                    on_result(item.source, self._convert_to_archive(item, target_extension, archives))
+            elif workers == 1 and pool is None:
+                for item in self._device_scheduler(pending) or pending:
+                    if should_cancel and should_cancel():
+                        break
+                    print(f"[{processed + 1}/{total_label}] Procesando: {os.path.basename(item.source)}")
+                    on_result(item.source, self._convert_planned(item, target_extension))
+            else:
+                self._convert_parallel(pending, target_extension, workers, executor,
+                                       on_result, should_cancel, pool)
             
-            if self.convert_single_file(file_path, target_extension):
-                success_count += 1
+            # Los duplicados se enlazan a la copia ya escrita de su contenido
+            for item in planned_files(duplicates):
+                if should_cancel and should_cancel():
+                    break
+                canonical = duplicates[item.source]
+                on_result(item.source, self._convert_duplicate(
+                    item, canonical, target_extension, canonical in ready))
+            finished = not (should_cancel and should_cancel())
+        finally:
+            self._planner = None
+            self._archive_paths = {}
+            self._close_archives(archives)
+            if manifests is not None:
+                manifests.close()
+            self.results.close()
+            planner.close()
+            if self.fsync_policy == 'batch':
+                sync_all()
+            if journal is not None:
+                # Con fallos o cancelación el diario queda abierto para reanudar
+                if finished and processed == success_count:
+                    journal.finish()
+                else:
+                    journal.close()
         
-        failed_count = total_files - success_count
+        failed_count = processed - success_count
         
         print("-" * 60)
         print(f"Conversión completada:")
         print(f"✓ Exitosos: {success_count}")
+        if self.results.total_skipped:
+            print(f"⏭ Sin cambios (omitidos): {self.results.total_skipped}")
+        if self.bytes_saved:
+            print(f"♻ Duplicados enlazados: {self.bytes_saved / (1024 * 1024):.1f} MB ahorrados")
         print(f"✗ Fallidos: {failed_count}")
         
         # Mostrar información sobre las subcarpetas creadas
-        if self.converted_files:
-            subfolders = set(item['subfolder'] for item in self.converted_files)
-            print(f"\nSubcarpetas creadas:")
-            for subfolder in sorted(subfolders):
-                print(f"  📁 {subfolder}")
+        if self.results.total_converted:
+            # Los archivos comprimidos ya se listaron al cerrarlos
+            if not archives:
+                print(f"\nSubcarpetas creadas:")
+                for subfolder in sorted(self.results.subfolders):
+                    print(f"  📁 {subfolder}")
+            
+            print(f"Estrategias de copia: " + ", ".join(
+                f"{name}={count}" for name, count in sorted(self.results.strategies.items())))
+        
+        if self.metrics_path:
+            try:
+                self.metrics.write(self.metrics_path)
+                print(f"Métricas guardadas en {self.metrics_path}")
+            except OSError as e:
+                print(f"No se pudieron guardar las métricas: {e}")
         
         return success_count, failed_count
     
-    def get_conversion_summary(self) -> dict:
+    def _reject_invalid_content(self, file_paths: Iterable[str], workers: int,
+                                on_result: Callable[[str, bool], None]) -> Iterator[str]:
         """
-        Obtener resumen de la última conversión.
+        Filtrar por lotes los archivos cuya firma no es de una imagen.
+        Cada lote se lee en paralelo y los rechazados se registran como fallidos.
         
+        Args:
+            file_paths: Rutas de archivos
+            workers: Número de trabajadores de la conversión
+            on_result: Función llamada con (ruta, False) por cada rechazo
+            
+        Yields:
+            str: Rutas que pasan la validación (o que se validarán al convertir)
+        """
+        def flush(batch):
+            formats = self._header_cache.sniff_many(
+                [f for f in batch if self.is_image_file(f)],
+                max_workers=max(4, workers))
+            for file_path in batch:
+                if file_path in formats and formats[file_path] is None:
+                    print(f"Contenido no reconocido como imagen: {file_path}")
+                    self._record_failure(file_path, self.INVALID_CONTENT_ERROR)
+                    if self.metrics:
+                        self.metrics.add_error('invalid_content')
+                    on_result(file_path, False)
+                else:
+                    yield file_path
+        
+        batch = []
+        for file_path in file_paths:
+            batch.append(file_path)
+            if len(batch) >= BATCH_SIZE * max(4, workers):
+                yield from flush(batch)
+                batch = []
+        yield from flush(batch)
+    
+    def _convert_duplicate(self, item: PlannedFile, canonical_path: str,
+                           target_extension: str, canonical_ready: bool) -> bool:
+        """
+        Crear el destino de un duplicado como enlace duro al destino de su
+        copia canónica. Si la canónica no se convirtió, se convierte normalmente.
+        
+        Args:
+            item: Archivo duplicado ya planificado
+            canonical_path: Ruta del archivo con el mismo contenido ya convertido
+            target_extension: Nueva extensión
+            canonical_ready: Si el destino de la copia canónica está al día
+            
+        Returns:
+            bool: True si el destino quedó creado
+        """
+        _, canonical_target = self.target_path_for(canonical_path, target_extension)
+        if not canonical_ready or not canonical_target.exists():
+            return self._convert_planned(item, target_extension)
+        
+        try:
+            file_size = item.stat.st_size
+            
+            # Mismo destino (ej: a.jpg y a.png idénticos con la política 'overwrite')
+            if item.target == str(canonical_target):
+                mode, strategy = 'hardlink', 'dedup'
+            else:
+                mode, strategy = place_file(str(canonical_target), item.target, 'hardlink',
+                                            self.copy_strategies, self.fsync_policy == 'file')
+                if mode == 'hardlink':
+                    strategy = 'dedup'
+            
+            if mode == 'hardlink':
+                with self._lock:
+                    self.bytes_saved += file_size
+            if self.metrics:
+                self.metrics.add_bytes(strategy, file_size)
+            
+            self._record_success({
+                'original': item.source,
+                'converted': item.target,
+                'extension': target_extension,
+                'subfolder': item.output_dir,
+                'size': file_size,
+                'mode': mode,
+                'strategy': strategy
+            })
+            self._fan_out(item, file_size)
+            return True
+            
+        except Exception as e:
+            print(f"Error al convertir {item.source}: {e}")
+            self._record_failure(item.source, str(e))
+            if self.metrics:
+                self.metrics.add_error(type(e).__name__)
+            return False
+    
+    def _is_up_to_date(self, item: PlannedFile, manifests: ManifestSet,
+                       pending_manifest: dict) -> bool:
+        """
+        Consultar el manifiesto para saber si un archivo puede omitirse.
+        Si hay que convertirlo, guarda su estado previo para registrarlo
+        en el manifiesto cuando la conversión termine.
+        
+        Args:
+            item: Archivo planificado (con su stat y su destino)
+            manifests: Manifiestos abiertos de la ejecución
+            pending_manifest: Estados pendientes de registrar, por ruta
+            
         Returns:
-            dict: Resumen con archivos convertidos y fallidos
+            bool: True si el destino ya está al día
         """
+        manifest = manifests.get(item.output_dir)
+        if manifest.is_unchanged(item.source, item.stat, item.target) and \
+                all(os.path.exists(target) for _, _, target in item.extra_targets):
+            return True
+        pending_manifest[item.source] = (manifest, item.stat, item.target)
+        return False
+    
+    def _convert_parallel(self, items: Iterable[PlannedFile], target_extension: str,
+                          workers: int, executor: str,
+                          on_result: Callable[[str, bool], None],
+                          should_cancel: Optional[Callable[[], bool]],
+                          pool: Optional[Executor] = None):
+        """
+        Ejecutar las conversiones en un pool de hilos o procesos.
+        Mantiene una ventana acotada de tareas pendientes para no materializar
+        todo el iterable en memoria.
+        
+        Args:
+            items: Archivos planificados
+            target_extension: Nueva extensión
+            workers: Número de trabajadores
+            executor: 'thread' o 'process'
+            on_result: Función llamada en este hilo con (ruta, éxito)
+            should_cancel: Función que devuelve True para detener la conversión
+            pool: Pool externo a reutilizar (None = crear uno para esta ejecución)
+        """
+        scheduler = self._device_scheduler(items)
+        # Con límite por dispositivo solo se envía lo que puede empezar ya,
+        # así una cola llena de un disco lento no retiene al resto
+        max_pending = workers if scheduler is not None else workers * 4
+        
+        own_pool = pool is None
+        if own_pool:
+            if executor == 'process':
+                from concurrent.futures import ProcessPoolExecutor
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers)
+        
+        def submit(item):
+            if executor == 'process':
+                return pool.submit(_convert_in_subprocess, item, target_extension,
+                                   self._worker_options())
+            return pool.submit(self._convert_task, item, target_extension)
+        
+        def collect(futures):
+            for future in futures:
+                item = pending.pop(future)
+                if scheduler is not None:
+                    scheduler.finished(item)
+                if future.cancelled():
+                    continue
+                if executor == 'process':
+                    file_path, ok, payload, metrics = future.result()
+                    if metrics is not None:
+                        self.metrics.merge(metrics)
+                    if ok:
+                        for record in payload:
+                            self._record_success(record)
+                    elif payload is not None:
+                        self._record_failure(file_path, payload)
+                else:
+                    file_path, ok = future.result()
+                on_result(file_path, ok)
+        
+        pending = {}
+        try:
+            if scheduler is None:
+                for item in items:
+                    if should_cancel and should_cancel():
+                        break
+                    pending[submit(item)] = item
+                    
+                    if len(pending) >= max_pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+            else:
+                while not (should_cancel and should_cancel()):
+                    while len(pending) < max_pending:
+                        item = scheduler.next_ready()
+                        if item is None:
+                            break
+                        pending[submit(item)] = item
+                    if not pending:
+                        break
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            
+            while pending:
+                if should_cancel and should_cancel():
+                    for future in pending:
+                        future.cancel()
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        finally:
+            if own_pool:
+                pool.shutdown(wait=True)
+    
+    def _device_scheduler(self, items: Iterable[PlannedFile]) -> Optional[DeviceScheduler]:
+        """Planificador por dispositivo, o None si no se pidió límite ni orden."""
+        if self.device_workers is None and self.io_order == 'none':
+            return None
+        return DeviceScheduler(items, self.device_workers, self.io_order)
+    
+    def _worker_options(self) -> dict:
+        """Opciones para reconstruir este convertidor en un proceso hijo."""
         return {
-            'converted': self.converted_files,
-            'failed': self.failed_files,
-            'total_converted': len(self.converted_files),
-            'total_failed': len(self.failed_files)
+            'copy_strategies': self.copy_strategies,
+            'output_mode': self.output_mode,
+            'fan_out_mode': self.fan_out_mode,
+            'fsync_policy': self.fsync_policy,
+            'cache_policy': self.cache_policy,
+            'checksum': self.checksum,
+            'verify': self.verify,
+            'transcode': self.transcode,
+            # El proceso padre ya validó las firmas por lotes
+            'validate_content': False,
+            # El hijo mide y devuelve sus métricas; el padre las exporta
+            'collect_metrics': self.metrics is not None,
         }
+    
+    def _convert_task(self, item: PlannedFile, target_extension: str) -> Tuple[str, bool]:
+        """Tarea de conversión para el pool de hilos."""
+        return item.source, self._convert_planned(item, target_extension)
+    
+    def last_error(self, file_path: str) -> str:
+        """
+        Obtener el error más reciente registrado para un archivo.
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            str: Mensaje de error (genérico si el archivo se rechazó sin registrarlo)
+        """
+        with self._lock:
+            error = self.results.last_error(file_path)
+        return error if error is not None else "Conversión rechazada"
+    
+    def last_digest(self, file_path: str) -> Optional[str]:
+        """
+        Obtener el hash del destino más reciente de un archivo (con checksum).
+        
+        Args:
+            file_path: Ruta del archivo origen
+            
+        Returns:
+            Optional[str]: Hash en hexadecimal, o None si no se calculó
+        """
+        with self._lock:
+            record = self.results.last_record(file_path)
+        return record.digest if record is not None else None
+    
+    def get_conversion_summary(self) -> dict:
+        """
+        Obtener resumen de la última conversión.
+        Los totales cubren toda la ejecución; las listas 'converted', 'failed'
+        y 'skipped' solo contienen los registros más recientes (max_records).
+        
+        Returns:
+            dict: Resumen con archivos convertidos, fallidos y omitidos por no
+                tener cambios, los bytes convertidos y los ahorrados por
+                deduplicación, el número de archivos por subcarpeta, por
+                estrategia de copia y por modo de salida; con las métricas
+                activadas incluye 'metrics' (ver ConversionMetrics.as_dict)
+        """
+        with self._lock:
+            results = self.results
+            summary = {
+                'converted': list(results.records),
+                'failed': list(results.failures),
+                'total_converted': results.total_converted,
+                'total_failed': results.total_failed,
+                'skipped': list(results.skipped),
+                'total_skipped': results.total_skipped,
+                'bytes_converted': results.bytes_converted,
+                'bytes_saved': self.bytes_saved,
+                'subfolders': dict(results.subfolders),
+                'strategies': dict(results.strategies),
+                'modes': dict(results.modes)
+            }
+        if self.metrics is not None:
+            summary['metrics'] = self.metrics.as_dict()
+        return summary
+
+
+def _convert_in_subprocess(item: PlannedFile, target_extension: str,
+                           options: dict) -> Tuple[str, bool, object, Optional[ConversionMetrics]]:
+    """
+    Tarea de conversión para el pool de procesos.
+    El convertidor del proceso hijo no comparte estado con el padre, así que
+    se devuelve el registro (o el error) para que el padre lo agregue.
+    
+    Args:
+        item: Archivo planificado por el proceso padre
+        target_extension: Nueva extensión
+        options: Argumentos para construir el convertidor del proceso hijo
+    
+    Returns:
+        Tuple[str, bool, object, Optional[ConversionMetrics]]: (ruta, éxito,
+            registros de cada destino o mensaje de error, métricas del hijo
+            si están activadas)
+    """
+    converter = ImageConverter(**options)
+    if converter._convert_planned(item, target_extension):
+        return item.source, True, list(converter.converted_files), converter.metrics
+    error = converter.failed_files[0]['error'] if converter.failed_files else None
+    return item.source, False, error, converter.metrics
 
 
 def main():
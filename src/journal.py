@@ -0,0 +1,124 @@
+"""
+Diario de trabajo para reanudar conversiones interrumpidas.
+Es un archivo JSONL de solo añadir: una cabecera con las extensiones del
+trabajo y una línea por archivo terminado. Si el proceso muere, la siguiente
+ejecución con el mismo diario omite los archivos ya terminados (si no han
+cambiado) y continúa donde se quedó. Un trabajo completo termina con una
+línea {"done": true} y la siguiente ejecución empieza de cero.
+"""
+
+import json
+import os
+from typing import Dict, List, Sequence, Tuple
+
+
+class ConversionJournal:
+    """
+    Diario de un trabajo de conversión. Solo lo usa el hilo coordinador.
+    """
+
+    def __init__(self, path: str, extensions: Sequence[str], fsync_policy: str = 'none'):
+        """
+        Abrir el diario, cargando lo terminado si el trabajo quedó a medias.
+
+        Args:
+            path: Ruta del archivo de diario
+            extensions: Extensiones de destino del trabajo
+            fsync_policy: 'file' (fsync por entrada), 'batch' (las entradas
+                esperan a flush()) o 'none'
+        """
+        self.path = path
+        self.extensions = list(extensions)
+        self.fsync_policy = fsync_policy
+        self.completed: Dict[str, Tuple[int, int]] = {}
+        self._pending: List[str] = []
+
+        resumed = self._load()
+        self._file = open(path, 'a' if resumed else 'w', encoding='utf-8')
+        if not resumed:
+            self._append({'job': {'extensions': self.extensions}})
+            self._sync()
+
+    def _load(self) -> bool:
+        """
+        Leer un diario previo.
+
+        Returns:
+            bool: True si hay un trabajo a medias con las mismas extensiones
+        """
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                content = f.read()
+        except FileNotFoundError:
+            return False
+        lines = content.splitlines()
+
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Última línea cortada por la caída: se ignora
+                continue
+        if not entries or entries[0].get('job', {}).get('extensions') != self.extensions:
+            return False
+        if entries[-1].get('done'):
+            return False
+
+        for entry in entries[1:]:
+            if 'source' in entry:
+                self.completed[entry['source']] = (entry['size'], entry['mtime_ns'])
+        # Asegurar que la siguiente entrada empieza en una línea nueva
+        if not content.endswith("\n"):
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n")
+        return True
+
+    def is_done(self, source_path: str, stat: os.stat_result) -> bool:
+        """
+        Comprobar si un archivo ya se terminó en este trabajo y no ha cambiado.
+
+        Args:
+            source_path: Ruta del archivo origen
+            stat: Resultado de os.stat del origen
+        """
+        return self.completed.get(source_path) == (stat.st_size, stat.st_mtime_ns)
+
+    def record(self, source_path: str, stat: os.stat_result):
+        """Anotar un archivo terminado (todos sus destinos escritos)."""
+        line = json.dumps({'source': source_path, 'size': stat.st_size,
+                           'mtime_ns': stat.st_mtime_ns}, ensure_ascii=False)
+        if self.fsync_policy == 'batch':
+            # Se escribe cuando los datos del lote ya están en disco
+            self._pending.append(line)
+            return
+        self._file.write(line + "\n")
+        self._sync()
+
+    def flush(self):
+        """Escribir las entradas del lote (llamar tras sincronizar los datos)."""
+        if self._pending:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._pending = []
+        self._sync()
+
+    def finish(self):
+        """Marcar el trabajo como completo y cerrar el diario."""
+        self.flush()
+        self._append({'done': True})
+        self._sync()
+        self.close()
+
+    def close(self):
+        """Cerrar el diario (el trabajo queda pendiente de reanudar)."""
+        if self._file is not None and not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def _append(self, entry: dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _sync(self):
+        self._file.flush()
+        if self.fsync_policy != 'none':
+            os.fsync(self._file.fileno())
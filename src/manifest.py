@@ -0,0 +1,158 @@
+"""
+Manifiesto persistente para conversiones incrementales.
+Cada carpeta de salida guarda un índice SQLite con el estado de los archivos
+origen ya convertidos, de modo que las ejecuciones siguientes solo procesan
+archivos nuevos o modificados.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from .hashing import file_digest
+
+# Nombre del archivo de manifiesto dentro de cada carpeta de salida
+MANIFEST_NAME = '.manifest.sqlite'
+
+# Número de registros entre confirmaciones de la transacción
+COMMIT_INTERVAL = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    source TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT
+)
+"""
+
+
+class ConversionManifest:
+    """
+    Índice de archivos convertidos de una carpeta de salida.
+    """
+
+    def __init__(self, output_dir: str, use_hash: bool = False):
+        """
+        Abrir (o crear) el manifiesto de una carpeta de salida.
+
+        Args:
+            output_dir: Carpeta de salida
+            use_hash: Guardar y comparar el hash del contenido además de los metadatos
+        """
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.use_hash = use_hash
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+    def is_unchanged(self, source_path: str, stat: os.stat_result, target_path: str) -> bool:
+        """
+        Comprobar si el origen ya está convertido y no ha cambiado.
+
+        Args:
+            source_path: Ruta del archivo origen
+            stat: Resultado de os.stat del origen
+            target_path: Ruta esperada del archivo destino
+
+        Returns:
+            bool: True si se puede omitir la conversión
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT target, size, mtime_ns, inode, digest FROM entries WHERE source = ?",
+                (source_path,)).fetchone()
+        if row is None:
+            return False
+
+        target, size, mtime_ns, inode, digest = row
+        if target != target_path or size != stat.st_size:
+            return False
+        try:
+            if os.stat(target_path).st_size != size:
+                return False
+        except OSError:
+            return False
+
+        if mtime_ns == stat.st_mtime_ns and inode == stat.st_ino:
+            return True
+
+        # Los metadatos cambiaron (copia, touch...): el hash decide si el contenido también
+        if self.use_hash and digest is not None and file_digest(source_path) == digest:
+            self.record(source_path, target_path, stat, digest)
+            return True
+        return False
+
+    def record(self, source_path: str, target_path: str, stat: os.stat_result,
+               digest: Optional[str] = None):
+        """
+        Registrar un archivo convertido.
+
+        Args:
+            source_path: Ruta del archivo origen
+            target_path: Ruta del archivo destino
+            stat: Resultado de os.stat del origen antes de convertirlo
+            digest: Hash del contenido (se calcula si use_hash y no se indica)
+        """
+        if digest is None and self.use_hash and os.path.exists(source_path):
+            digest = file_digest(source_path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (source_path, target_path, stat.st_size, stat.st_mtime_ns, stat.st_ino, digest))
+            self._pending += 1
+            if self._pending >= COMMIT_INTERVAL:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self):
+        """Confirmar los cambios pendientes y cerrar el manifiesto."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+class ManifestSet:
+    """
+    Conjunto de manifiestos abiertos, uno por carpeta de salida.
+    """
+
+    def __init__(self, use_hash: bool = False):
+        """
+        Args:
+            use_hash: Guardar y comparar el hash del contenido
+        """
+        self.use_hash = use_hash
+        self._manifests: Dict[str, ConversionManifest] = {}
+        self._lock = threading.Lock()
+
+    def get(self, output_dir: str) -> ConversionManifest:
+        """
+        Obtener el manifiesto de una carpeta de salida, creándola si no existe.
+
+        Args:
+            output_dir: Carpeta de salida
+
+        Returns:
+            ConversionManifest: Manifiesto de la carpeta
+        """
+        with self._lock:
+            manifest = self._manifests.get(output_dir)
+            if manifest is None:
+                os.makedirs(output_dir, exist_ok=True)
+                manifest = ConversionManifest(output_dir, self.use_hash)
+                self._manifests[output_dir] = manifest
+            return manifest
+
+    def close(self):
+        """Cerrar todos los manifiestos abiertos."""
+        with self._lock:
+            for manifest in self._manifests.values():
+                manifest.close()
+            self._manifests.clear()
@@ -0,0 +1,217 @@
+"""
+Instrumentación opcional del camino crítico de la conversión.
+Registra histogramas de latencia por fase, bytes por estrategia de copia y
+errores por tipo, y los exporta como JSON o como archivo de texto de
+Prometheus (node_exporter textfile collector).
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+# Fases medidas en convert_single_file, en orden de ejecución
+PHASES = ('stat', 'is_image_file', 'validate', 'mkdir', 'target_exists', 'copy')
+
+# Límites superiores de los cubos del histograma, en segundos
+BUCKETS = (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+           0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+           2.5, 5.0, 10.0)
+
+# Prefijo de las métricas exportadas a Prometheus
+PROMETHEUS_PREFIX = 'image_converter'
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con cubos fijos (compatible con Prometheus).
+    """
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        # Un cubo por límite más el de desbordamiento (+Inf)
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        """Añadir una observación."""
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def merge(self, other: "LatencyHistogram"):
+        """Sumar las observaciones de otro histograma."""
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.total += other.total
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimar un cuantil como el límite superior de su cubo.
+
+        Args:
+            q: Cuantil entre 0 y 1
+
+        Returns:
+            Optional[float]: Segundos (None si no hay observaciones o cae en +Inf)
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        accumulated = 0
+        for index, value in enumerate(self.counts):
+            accumulated += value
+            if accumulated >= rank and value:
+                return BUCKETS[index] if index < len(BUCKETS) else None
+        return None
+
+    def cumulative(self) -> List[int]:
+        """Recuentos acumulados por cubo (el último es el total)."""
+        result = []
+        accumulated = 0
+        for value in self.counts:
+            accumulated += value
+            result.append(accumulated)
+        return result
+
+
+class ConversionMetrics:
+    """
+    Métricas de una ejecución. Seguro entre hilos; se puede enviar a un
+    proceso hijo y fusionar después con merge().
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in PHASES}
+        self.bytes_by_strategy: Dict[str, int] = {}
+        self.files_by_strategy: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        """Reloj monótono usado para medir las fases."""
+        return time.perf_counter()
+
+    def observe(self, phase: str, start: float) -> float:
+        """
+        Registrar la duración de una fase que empezó en 'start'.
+
+        Returns:
+            float: Instante actual, para usarlo como inicio de la fase siguiente
+        """
+        end = time.perf_counter()
+        with self._lock:
+            self.phases[phase].observe(end - start)
+        return end
+
+    def add_bytes(self, strategy: str, size: int):
+        """Contar un archivo escrito con una estrategia de copia."""
+        with self._lock:
+            self.bytes_by_strategy[strategy] = self.bytes_by_strategy.get(strategy, 0) + size
+            self.files_by_strategy[strategy] = self.files_by_strategy.get(strategy, 0) + 1
+
+    def add_error(self, kind: str):
+        """Contar un error por su tipo."""
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def merge(self, other: "ConversionMetrics"):
+        """Sumar las métricas de otro convertidor (ej: de un proceso hijo)."""
+        with self._lock:
+            for name, histogram in other.phases.items():
+                self.phases[name].merge(histogram)
+            for name, value in other.bytes_by_strategy.items():
+                self.bytes_by_strategy[name] = self.bytes_by_strategy.get(name, 0) + value
+            for name, value in other.files_by_strategy.items():
+                self.files_by_strategy[name] = self.files_by_strategy.get(name, 0) + value
+            for name, value in other.errors.items():
+                self.errors[name] = self.errors.get(name, 0) + value
+
+    def as_dict(self) -> dict:
+        """
+        Obtener las métricas como diccionario serializable.
+
+        Returns:
+            dict: Por fase: número, tiempo total, p50 y p99 (segundos) y cubos
+                acumulados; bytes y archivos por estrategia; errores por tipo
+        """
+        with self._lock:
+            phases = {}
+            for name, histogram in self.phases.items():
+                cumulative = histogram.cumulative()
+                phases[name] = {
+                    'count': histogram.count,
+                    'total_seconds': histogram.total,
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p99_seconds': histogram.quantile(0.99),
+                    'buckets': {str(bound): cumulative[i] for i, bound in enumerate(BUCKETS)},
+                }
+            return {
+                'phases': phases,
+                'bytes_by_strategy': dict(self.bytes_by_strategy),
+                'files_by_strategy': dict(self.files_by_strategy),
+                'errors': dict(self.errors),
+            }
+
+    def to_prometheus(self) -> str:
+        """Formatear las métricas en el formato de texto de Prometheus."""
+        prefix = PROMETHEUS_PREFIX
+        lines = [f"# HELP {prefix}_phase_seconds Latencia de cada fase de la conversión",
+                 f"# TYPE {prefix}_phase_seconds histogram"]
+        with self._lock:
+            for name, histogram in self.phases.items():
+                cumulative = histogram.cumulative()
+                for index, bound in enumerate(BUCKETS):
+                    lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{bound}"}} '
+                                 f'{cumulative[index]}')
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="+Inf"}} '
+                             f'{histogram.count}')
+                lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {histogram.total}')
+                lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {histogram.count}')
+
+            lines += [f"# HELP {prefix}_bytes_total Bytes escritos por estrategia de copia",
+                      f"# TYPE {prefix}_bytes_total counter"]
+            lines += [f'{prefix}_bytes_total{{strategy="{name}"}} {value}'
+                      for name, value in sorted(self.bytes_by_strategy.items())]
+            lines += [f"# HELP {prefix}_files_total Archivos escritos por estrategia de copia",
+                      f"# TYPE {prefix}_files_total counter"]
+            lines += [f'{prefix}_files_total{{strategy="{name}"}} {value}'
+                      for name, value in sorted(self.files_by_strategy.items())]
+            lines += [f"# HELP {prefix}_errors_total Errores por tipo",
+                      f"# TYPE {prefix}_errors_total counter"]
+            lines += [f'{prefix}_errors_total{{kind="{name}"}} {value}'
+                      for name, value in sorted(self.errors.items())]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Guardar las métricas en un archivo: formato Prometheus si la extensión
+        es .prom y JSON en otro caso. Se escribe en un temporal y se renombra
+        para que el recolector nunca lea un archivo a medias.
+
+        Args:
+            path: Ruta del archivo de métricas
+        """
+        if path.endswith('.prom'):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.as_dict(), indent=2) + "\n"
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
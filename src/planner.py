@@ -0,0 +1,295 @@
+"""
+Fase de planificación de una conversión por lotes.
+Antes de copiar nada se hace un stat por archivo, se agrupan los destinos por
+carpeta de salida (cada una se crea y se lista una sola vez) y se calculan
+las rutas finales, resolviendo las colisiones de nombre (a.jpg y a.png ->
+a.1) según una política. Con varias extensiones (fan-out) el destino de
+cada extensión adicional usa el mismo nombre en su propia subcarpeta.
+El ejecutor recibe el plan y ya no repite esas llamadas al sistema por archivo.
+"""
+
+import os
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .copy_backends import is_stale_temp
+
+# Políticas ante dos orígenes con el mismo destino:
+#   overwrite = el último sobrescribe al anterior (comportamiento histórico)
+#   suffix    = añadir _1, _2... al nombre de los siguientes
+#   skip      = convertir solo el primero y marcar el resto como fallidos
+# "Primero" es el de menor ruta dentro de la ventana, no el primero en llegar,
+# para que los nombres no cambien si la entrada llega en otro orden
+#   fail      = abortar la conversión antes de escribir el lote
+COLLISION_POLICIES = ('overwrite', 'suffix', 'skip', 'fail')
+
+# Archivos planificados a la vez cuando la entrada es un flujo
+PLAN_WINDOW = 10_000
+
+
+class CollisionError(ValueError):
+    """Colisión de nombres de destino con la política 'fail'."""
+
+
+class PlannedFile:
+    """
+    Archivo listo para ejecutar: origen, destino final y estado previo.
+    """
+
+    __slots__ = ('source', 'stat', 'output_dir', 'target', 'target_exists', 'extra_targets',
+                 'error', 'error_kind')
+
+    def __init__(self, source: str):
+        self.source = source
+        self.stat: Optional[os.stat_result] = None
+        self.output_dir: Optional[str] = None
+        self.target: Optional[str] = None
+        self.target_exists = False
+        # Destinos de las extensiones adicionales: (extensión, carpeta, ruta)
+        self.extra_targets: Tuple[Tuple[str, str, str], ...] = ()
+        # Motivo por el que no se debe convertir (None = convertir)
+        self.error: Optional[str] = None
+        # Tipo de error para las métricas
+        self.error_kind: Optional[str] = None
+
+    def fail(self, error: str, kind: str):
+        """Marcar el archivo como no convertible."""
+        self.error = error
+        self.error_kind = kind
+
+
+class _OutputDir:
+    """Estado de una carpeta de salida durante la ejecución."""
+
+    __slots__ = ('existing', 'claimed', 'error')
+
+    def __init__(self):
+        # Nombres presentes antes de la ejecución
+        self.existing: Set[str] = set()
+        # Nombres ya asignados a un origen en esta ejecución
+        self.claimed: Dict[str, str] = {}
+        self.error: Optional[str] = None
+
+
+class BatchPlanner:
+    """
+    Planificador de una ejecución. Conserva los nombres asignados para que
+    las colisiones se detecten también entre ventanas de un flujo.
+    """
+
+    def __init__(self, target_extension: str, supported_extensions: Iterable[str],
+                 policy: str = 'suffix', metrics=None,
+                 extra_extensions: Sequence[str] = (), create_dirs: bool = True):
+        """
+        Args:
+            target_extension: Extensión de destino principal (ej: '.1')
+            supported_extensions: Extensiones de origen admitidas
+            policy: Política de colisiones (ver COLLISION_POLICIES)
+            metrics: ConversionMetrics donde medir stat, mkdir y listado (opcional)
+            extra_extensions: Extensiones adicionales que se escriben a partir
+                del destino principal (fan-out)
+            create_dirs: Crear y listar las carpetas de salida; sin ellas
+                (salida en archivo comprimido) solo se calculan los nombres
+        """
+        if policy not in COLLISION_POLICIES:
+            raise ValueError(f"Política de colisiones no válida: {policy}")
+        self.target_extension = target_extension
+        self.supported_extensions = set(supported_extensions)
+        self.policy = policy
+        self.metrics = metrics
+        self.extra_extensions = tuple(extra_extensions)
+        self.create_dirs = create_dirs
+        self._dirs: Dict[str, _OutputDir] = {}
+        # Solo los destinos renombrados por colisión (el resto es predecible)
+        self.renamed: Dict[str, str] = {}
+
+    def default_target(self, source_path: str):
+        """
+        Calcular la carpeta y el destino sin considerar colisiones.
+
+        Returns:
+            Tuple[str, str]: (carpeta de salida, ruta destino)
+        """
+        folder, name = os.path.split(source_path)
+        output_dir = os.path.join(folder, self.target_extension[1:])
+        stem = os.path.splitext(name)[0]
+        return output_dir, os.path.join(output_dir, stem + self.target_extension)
+
+    def target_for(self, source_path: str, extension: Optional[str] = None) -> str:
+        """
+        Destino asignado a un origen (incluido el renombrado por colisión).
+
+        Args:
+            source_path: Ruta del archivo origen
+            extension: Extensión principal o adicional (None = la principal)
+        """
+        renamed = self.renamed.get(source_path)
+        target = renamed if renamed is not None else self.default_target(source_path)[1]
+        if extension is None or extension == self.target_extension:
+            return target
+        return self._sibling_target(source_path, target, extension)
+
+    def _sibling_target(self, source_path: str, target: str, extension: str) -> str:
+        """Destino de una extensión adicional con el mismo nombre que el principal."""
+        stem = os.path.basename(target)[:-len(self.target_extension)]
+        return os.path.join(os.path.dirname(source_path), extension[1:], stem + extension)
+
+    def check_collisions(self, file_paths: Iterable[str]):
+        """
+        Buscar colisiones en la lista completa solo con operaciones de texto,
+        para que la política 'fail' aborte antes de escribir nada.
+
+        Raises:
+            CollisionError: Si dos orígenes tienen el mismo destino
+        """
+        owners: Dict[str, str] = {}
+        for source in file_paths:
+            if os.path.splitext(source)[1].lower() not in self.supported_extensions:
+                continue
+            target = self.default_target(source)[1]
+            owner = owners.setdefault(target, source)
+            if owner != source:
+                raise CollisionError(f"Colisión de nombre: {source} y {owner} -> {target}")
+
+    def close(self):
+        """Liberar el estado por carpeta; se conservan los destinos renombrados."""
+        self._dirs = {}
+
+    def plan(self, file_paths: Iterable[str], window: int = PLAN_WINDOW) -> Iterator[PlannedFile]:
+        """
+        Planificar los archivos por ventanas.
+
+        Args:
+            file_paths: Rutas de archivos (lista o cualquier iterable)
+            window: Archivos por ventana
+
+        Yields:
+            PlannedFile: Cada archivo con su destino o con el motivo del rechazo
+
+        Raises:
+            CollisionError: Con la política 'fail', si una ventana tiene colisiones
+        """
+        iterator = iter(file_paths)
+        while True:
+            batch = list(islice(iterator, window))
+            if not batch:
+                return
+            yield from self._plan_window(batch)
+
+    def _plan_window(self, batch: List[str]) -> List[PlannedFile]:
+        """Planificar una ventana de archivos."""
+        metrics = self.metrics
+        items = []
+        for source in batch:
+            item = PlannedFile(source)
+            items.append(item)
+            if os.path.splitext(source)[1].lower() not in self.supported_extensions:
+                item.fail("No es un archivo de imagen válido", 'unsupported_extension')
+                continue
+            started = metrics.now() if metrics else 0.0
+            try:
+                item.stat = os.stat(source)
+            except OSError:
+                item.fail("Archivo no encontrado", 'not_found')
+                continue
+            if metrics:
+                metrics.observe('stat', started)
+            item.output_dir, item.target = self.default_target(source)
+
+        # Primera pasada: cada origen reclama su nombre natural. Se recorren por
+        # ruta para que el ganador y los sufijos no dependan del orden de entrada
+        losers = []
+        for item in sorted((item for item in items if item.error is None),
+                           key=lambda item: item.source):
+            state = self._output_dir(item.output_dir)
+            if state.error is not None:
+                item.fail(state.error, 'mkdir')
+                continue
+            name = os.path.basename(item.target)
+            owner = state.claimed.get(name)
+            if owner is None or owner == item.source or self.policy == 'overwrite':
+                state.claimed[name] = item.source
+            else:
+                losers.append((item, owner))
+
+        if losers and self.policy == 'fail':
+            item, owner = losers[0]
+            raise CollisionError(f"{len(losers)} colisiones de nombre; la primera: "
+                                 f"{item.source} y {owner} -> {item.target}")
+
+        # Segunda pasada: resolver las colisiones una vez reservados todos los nombres
+        for item, owner in losers:
+            if self.policy == 'skip':
+                item.fail(f"Colisión de nombre con {owner}", 'collision')
+                continue
+            state = self._dirs[item.output_dir]
+            stem = os.path.splitext(os.path.basename(item.target))[0]
+            counter = 1
+            while f"{stem}_{counter}{self.target_extension}" in state.claimed:
+                counter += 1
+            name = f"{stem}_{counter}{self.target_extension}"
+            state.claimed[name] = item.source
+            item.target = os.path.join(item.output_dir, name)
+            self.renamed[item.source] = item.target
+
+        for item in items:
+            if item.error is None:
+                item.target_exists = os.path.basename(item.target) in \
+                    self._dirs[item.output_dir].existing
+            if item.error is None and self.extra_extensions:
+                self._plan_extras(item)
+        return items
+
+    def _plan_extras(self, item: PlannedFile):
+        """Calcular los destinos adicionales y crear sus carpetas."""
+        extras = []
+        for extension in self.extra_extensions:
+            target = self._sibling_target(item.source, item.target, extension)
+            output_dir = os.path.dirname(target)
+            state = self._output_dir(output_dir, list_existing=False)
+            if state.error is not None:
+                item.fail(state.error, 'mkdir')
+                return
+            extras.append((extension, output_dir, target))
+        item.extra_targets = tuple(extras)
+
+    def _output_dir(self, output_dir: str, list_existing: bool = True) -> _OutputDir:
+        """Crear (una sola vez) la carpeta de salida y listar su contenido."""
+        state = self._dirs.get(output_dir)
+        if state is not None:
+            return state
+        state = _OutputDir()
+        self._dirs[output_dir] = state
+        if not self.create_dirs:
+            return state
+        metrics = self.metrics
+        started = metrics.now() if metrics else 0.0
+        try:
+            os.mkdir(output_dir)
+            if metrics:
+                metrics.observe('mkdir', started)
+        except FileExistsError:
+            if metrics:
+                started = metrics.observe('mkdir', started)
+            # Un único listado sustituye a un exists() por archivo
+            if list_existing:
+                try:
+                    state.existing = set(os.listdir(output_dir))
+                    self._remove_stale_temps(output_dir, state.existing)
+                except OSError as e:
+                    state.error = f"No se pudo leer la carpeta de salida: {e}"
+                if metrics:
+                    metrics.observe('target_exists', started)
+        except OSError as e:
+            state.error = f"No se pudo crear la carpeta de salida: {e}"
+        return state
+
+    @staticmethod
+    def _remove_stale_temps(output_dir: str, names: Set[str]):
+        """Borrar los temporales que dejó una ejecución que se cayó."""
+        for name in [n for n in names if is_stale_temp(n)]:
+            try:
+                os.unlink(os.path.join(output_dir, name))
+            except OSError:
+                continue
+            names.discard(name)
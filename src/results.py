@@ -0,0 +1,202 @@
+"""
+Almacén compacto de resultados de conversión.
+Guarda cada conversión en un registro con __slots__ cuyas carpetas son
+cadenas compartidas (una sola copia por carpeta), mantiene los totales de
+forma incremental y conserva en memoria solo los registros más recientes;
+el detalle completo puede volcarse a un registro JSONL en disco.
+"""
+
+import json
+import os
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterator, Optional, Union
+
+# Registros detallados que se conservan en memoria por defecto
+MAX_RECORDS = 100_000
+
+# Fallos detallados que se conservan en memoria por defecto
+MAX_FAILURES = 10_000
+
+
+class ConversionRecord:
+    """
+    Resultado de una conversión exitosa.
+    Se lee como el diccionario que sustituye: record['original'],
+    record['converted'], record['subfolder'], etc.
+    """
+
+    __slots__ = ('source_dir', 'source_name', 'target_dir', 'target_name',
+                 'extension', 'size', 'mode', 'strategy', 'digest')
+
+    # Claves del diccionario equivalente
+    KEYS = ('original', 'converted', 'extension', 'subfolder', 'size', 'mode', 'strategy',
+            'digest')
+
+    def __init__(self, source_dir: str, source_name: str, target_dir: str, target_name: str,
+                 extension: str, size: int, mode: str, strategy: str,
+                 digest: Optional[str] = None):
+        self.source_dir = source_dir
+        self.source_name = source_name
+        self.target_dir = target_dir
+        self.target_name = target_name
+        self.extension = extension
+        self.size = size
+        self.mode = mode
+        self.strategy = strategy
+        # Hash del contenido escrito (None si no se calculó)
+        self.digest = digest
+
+    @property
+    def original(self) -> str:
+        return os.path.join(self.source_dir, self.source_name)
+
+    @property
+    def converted(self) -> str:
+        return os.path.join(self.target_dir, self.target_name)
+
+    @property
+    def subfolder(self) -> str:
+        return self.target_dir
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+
+    def as_dict(self) -> dict:
+        """Convertir a diccionario (para JSON o compatibilidad)."""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def __repr__(self):
+        return f"ConversionRecord({self.as_dict()!r})"
+
+
+class ResultStore:
+    """
+    Resultados de una ejecución con memoria acotada.
+    Los contadores (archivos, bytes, subcarpetas, estrategias, modos) cubren
+    toda la ejecución aunque los registros antiguos se descarten.
+    No es seguro entre hilos: el convertidor lo protege con su propio lock.
+    """
+
+    def __init__(self, max_records: Optional[int] = MAX_RECORDS,
+                 max_failures: Optional[int] = MAX_FAILURES,
+                 spill_path: Optional[str] = None):
+        """
+        Args:
+            max_records: Registros detallados en memoria (None = sin límite)
+            max_failures: Fallos detallados en memoria (None = sin límite)
+            spill_path: Archivo JSONL donde escribir todos los resultados
+                (una línea por archivo convertido, fallido u omitido)
+        """
+        self.records: Deque[ConversionRecord] = deque(maxlen=max_records)
+        self.failures: Deque[dict] = deque(maxlen=max_failures)
+        # Fallo más reciente de cada archivo entre los de 'failures'
+        self._last_failure: Dict[str, dict] = {}
+        self.skipped: Deque[str] = deque(maxlen=max_records)
+        self.total_converted = 0
+        self.total_failed = 0
+        self.total_skipped = 0
+        self.bytes_converted = 0
+        self.subfolders: Dict[str, int] = {}
+        self.strategies: Dict[str, int] = {}
+        self.modes: Dict[str, int] = {}
+        self._strings: Dict[str, str] = {}
+        self.spill_path = spill_path
+        self._spill = None
+
+    def _intern(self, value: str) -> str:
+        """Compartir una única copia de cada carpeta o etiqueta repetida."""
+        return self._strings.setdefault(value, value)
+
+    def _write_spill(self, entry: dict):
+        # Se abre al primer resultado y se añade al final (registro acumulativo)
+        if self._spill is None:
+            self._spill = open(self.spill_path, 'a', encoding='utf-8')
+        self._spill.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def add_success(self, record: Union[dict, ConversionRecord]) -> ConversionRecord:
+        """
+        Registrar una conversión exitosa.
+
+        Args:
+            record: Diccionario con las claves de ConversionRecord.KEYS, con
+                'digest' opcional (o un registro de otro almacén, ej: de un
+                proceso hijo)
+
+        Returns:
+            ConversionRecord: Registro compacto guardado
+        """
+        source_dir, source_name = os.path.split(record['original'])
+        target_dir, target_name = os.path.split(record['converted'])
+        compact = ConversionRecord(
+            self._intern(source_dir), source_name, self._intern(target_dir), target_name,
+            self._intern(record['extension']), record['size'],
+            self._intern(record['mode']), self._intern(record['strategy']),
+            record.get('digest'))
+
+        self.records.append(compact)
+        self.total_converted += 1
+        self.bytes_converted += compact.size
+        self.subfolders[compact.target_dir] = self.subfolders.get(compact.target_dir, 0) + 1
+        self.strategies[compact.strategy] = self.strategies.get(compact.strategy, 0) + 1
+        self.modes[compact.mode] = self.modes.get(compact.mode, 0) + 1
+        if self.spill_path:
+            self._write_spill(dict(compact.as_dict(), ok=True))
+        return compact
+
+    def add_failure(self, source_path: str, error: str):
+        """Registrar una conversión fallida."""
+        failure = {'file': source_path, 'error': error}
+        if len(self.failures) == self.failures.maxlen:
+            evicted = self.failures[0]
+            if self._last_failure.get(evicted['file']) is evicted:
+                del self._last_failure[evicted['file']]
+        self.failures.append(failure)
+        self._last_failure[source_path] = failure
+        self.total_failed += 1
+        if self.spill_path:
+            self._write_spill(dict(failure, ok=False))
+
+    def add_skipped(self, source_path: str):
+        """Registrar un archivo omitido por no tener cambios."""
+        self.skipped.append(source_path)
+        self.total_skipped += 1
+        if self.spill_path:
+            self._write_spill({'file': source_path, 'ok': True, 'skipped': True})
+
+    def last_error(self, source_path: str) -> Optional[str]:
+        """Error más reciente de un archivo entre los fallos en memoria."""
+        failure = self._last_failure.get(source_path)
+        return failure['error'] if failure is not None else None
+
+    def last_record(self, source_path: str, limit: int = 1024) -> Optional[ConversionRecord]:
+        """
+        Registro más reciente de un archivo entre los últimos 'limit' registros
+        (los de un archivo recién terminado están siempre al final).
+        """
+        source_dir, source_name = os.path.split(source_path)
+        for record in islice(reversed(self.records), limit):
+            if record.source_name == source_name and record.source_dir == source_dir:
+                return record
+        return None
+
+    def iter_spilled(self) -> Iterator[dict]:
+        """Leer todos los resultados volcados a disco."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        if self._spill:
+            self._spill.flush()
+        with open(self.spill_path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self):
+        """Cerrar el registro en disco."""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
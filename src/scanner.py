@@ -0,0 +1,97 @@
+"""
+Exploración de carpetas basada en os.scandir.
+Genera las rutas a medida que las encuentra, sin construir listas completas.
+"""
+
+import os
+from fnmatch import fnmatch
+from typing import Callable, Collection, Iterator, Optional, Sequence
+
+
+def _matches(patterns: Sequence[str], name: str, relative_path: str) -> bool:
+    """
+    Comprobar si una entrada coincide con algún patrón glob.
+    Los patrones sin separador se comparan con el nombre; el resto con la
+    ruta relativa a la carpeta raíz (con '/' como separador).
+    """
+    for pattern in patterns:
+        if fnmatch(relative_path if '/' in pattern else name, pattern):
+            return True
+    return False
+
+
+def iter_image_files(folder_path: str, extensions: Collection[str],
+                     recursive: bool = False, max_depth: Optional[int] = None,
+                     include: Optional[Sequence[str]] = None,
+                     exclude: Optional[Sequence[str]] = None,
+                     onerror: Optional[Callable[[OSError], None]] = None) -> Iterator[str]:
+    """
+    Recorrer una carpeta y generar las rutas de imagen a medida que aparecen.
+    Usa el tipo cacheado de cada DirEntry, por lo que no hace un stat extra
+    por archivo en la mayoría de sistemas de archivos. No ordena la salida.
+    Sigue los enlaces simbólicos a carpetas, pero cada carpeta (st_dev, st_ino)
+    se visita una sola vez: un enlace que apunta a un ancestro no crea un ciclo.
+
+    Args:
+        folder_path: Carpeta raíz
+        extensions: Extensiones aceptadas en minúsculas (ej: {'.jpg', '.png'})
+        recursive: Descender a subcarpetas
+        max_depth: Niveles máximos de subcarpetas (None = sin límite)
+        include: Patrones glob que deben cumplir los archivos (None = todos)
+        exclude: Patrones glob de archivos y carpetas a ignorar
+        onerror: Función llamada con el error si una carpeta no se puede leer
+
+    Yields:
+        str: Ruta de cada archivo de imagen encontrado
+    """
+    if not recursive:
+        max_depth = 0
+    include = tuple(include or ())
+    exclude = tuple(exclude or ())
+
+    # Pila explícita de (carpeta, ruta relativa, profundidad): la memoria crece
+    # con el número de carpetas pendientes, no con el de archivos
+    stack = [(folder_path, '', 0)]
+    visited = set()
+    try:
+        root = os.stat(folder_path)
+        visited.add((root.st_dev, root.st_ino))
+    except OSError:
+        pass  # scandir informará del error
+    while stack:
+        directory, relative_dir, depth = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    name = entry.name
+                    relative_path = f"{relative_dir}{name}"
+                    try:
+                        if entry.is_dir():
+                            if (max_depth is None or depth < max_depth) and \
+                                    not _matches(exclude, name, relative_path):
+                                stat = entry.stat()
+                                key = (stat.st_dev, stat.st_ino)
+                                if key not in visited:
+                                    visited.add(key)
+                                    subdirs.append((entry.path, relative_path + '/', depth + 1))
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue
+
+                    if os.path.splitext(name)[1].lower() not in extensions:
+                        continue
+                    if include and not _matches(include, name, relative_path):
+                        continue
+                    if exclude and _matches(exclude, name, relative_path):
+                        continue
+                    yield entry.path
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            continue
+
+        # Invertir para visitar las subcarpetas en el orden en que se listaron
+        stack.extend(reversed(subdirs))
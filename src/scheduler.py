@@ -0,0 +1,170 @@
+"""
+Planificador de E/S por dispositivo.
+Se sitúa entre la lista de archivos planificados y la ejecución: agrupa los
+archivos por dispositivo (st_dev), limita los trabajadores simultáneos en
+cada uno para que un disco lento no acapare el pool, y dentro de cada
+dispositivo empieza por los archivos grandes (los trabajadores terminan a la
+vez) y sigue por orden de inodo o de posición física en disco (FIEMAP), lo
+que evita saltos del cabezal en discos mecánicos.
+"""
+
+import os
+import struct
+import sys
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from .planner import PlannedFile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Orden dentro de un dispositivo: inodo, bloque físico (FIEMAP) o el de llegada
+SCHEDULE_ORDERS = ('inode', 'physical', 'none')
+
+# Archivos ordenados a la vez (la memoria del planificador no pasa de aquí)
+SCHEDULE_WINDOW = 4096
+
+# A partir de este tamaño un archivo se adelanta, de mayor a menor
+LARGE_FILE_SIZE = 16 * 1024 * 1024
+
+# ioctl FS_IOC_FIEMAP de Linux (_IOWR('f', 11, struct fiemap))
+FS_IOC_FIEMAP = 0xC020660B
+_FIEMAP_HEADER = struct.Struct('QQIIII')
+_FIEMAP_EXTENT = struct.Struct('QQQQQIIII')
+
+
+def physical_offset(path: str) -> Optional[int]:
+    """
+    Posición física del primer extent de un archivo (FIEMAP).
+
+    Returns:
+        int o None si el sistema de archivos no lo admite
+    """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return None
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0)
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        fcntl.ioctl(fd, FS_IOC_FIEMAP, request)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    mapped = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if not mapped:
+        # Archivo vacío o en línea con sus metadatos
+        return None
+    return _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
+
+
+class DeviceScheduler:
+    """
+    Colas por dispositivo con un límite de trabajos simultáneos en cada una.
+    Lo usa solo el hilo coordinador de la conversión.
+    """
+
+    def __init__(self, items: Iterable[PlannedFile], per_device: Optional[int] = None,
+                 order: str = 'inode', window: int = SCHEDULE_WINDOW):
+        """
+        Args:
+            items: Archivos planificados (sin error, con su stat)
+            per_device: Trabajos simultáneos por dispositivo (None = sin límite)
+            order: Orden dentro de cada dispositivo (ver SCHEDULE_ORDERS)
+            window: Archivos leídos y ordenados a la vez
+        """
+        if order not in SCHEDULE_ORDERS:
+            raise ValueError(f"Orden de planificación no válido: {order}")
+        if per_device is not None and per_device < 1:
+            raise ValueError(f"Trabajadores por dispositivo no válidos: {per_device}")
+        self._items = iter(items)
+        self.per_device = per_device
+        self.order = order
+        self.window = window
+        self._queues: Dict[int, Deque[PlannedFile]] = {}
+        self._running: Dict[int, int] = {}
+        # Dispositivos donde FIEMAP no está disponible (se usa el inodo)
+        self._no_fiemap = set()
+        self._queued = 0
+        self._exhausted = False
+        # Dispositivo por el que empieza la siguiente búsqueda (reparto circular)
+        self._turn = 0
+
+    def __iter__(self) -> Iterator[PlannedFile]:
+        """Recorrer todos los archivos en orden (ejecución secuencial)."""
+        while True:
+            item = self.next_ready()
+            if item is None:
+                return
+            self.finished(item)
+            yield item
+
+    def _sort_key(self, item: PlannedFile):
+        """Clave de orden: grandes primero (de mayor a menor) y luego por posición."""
+        stat = item.stat
+        if stat.st_size >= LARGE_FILE_SIZE:
+            return 0, -stat.st_size
+        if self.order == 'physical' and stat.st_dev not in self._no_fiemap:
+            offset = physical_offset(item.source)
+            if offset is not None:
+                return 1, offset
+            self._no_fiemap.add(stat.st_dev)
+        return 1, stat.st_ino
+
+    def _refill(self):
+        """Leer la siguiente ventana de archivos, ordenarla y repartirla por dispositivo."""
+        if self._queued >= self.window:
+            return
+        batch = list(islice(self._items, self.window - self._queued))
+        if not batch:
+            self._exhausted = True
+            return
+        groups: Dict[int, List[PlannedFile]] = {}
+        for item in batch:
+            groups.setdefault(item.stat.st_dev, []).append(item)
+        for device, group in groups.items():
+            if self.order != 'none':
+                group.sort(key=self._sort_key)
+            self._queues.setdefault(device, deque()).extend(group)
+            self._running.setdefault(device, 0)
+        self._queued += len(batch)
+
+    def next_ready(self) -> Optional[PlannedFile]:
+        """
+        Siguiente archivo de un dispositivo con trabajadores libres.
+
+        Returns:
+            PlannedFile, o None si todos los dispositivos con trabajo están al
+            límite (esperar a finished()) o no queda nada
+        """
+        if not self._exhausted and self._queued < self.window // 2:
+            self._refill()
+        devices = list(self._queues)
+        for offset in range(len(devices)):
+            device = devices[(self._turn + offset) % len(devices)]
+            queue = self._queues[device]
+            if not queue:
+                continue
+            if self.per_device is not None and self._running[device] >= self.per_device:
+                continue
+            self._turn = (self._turn + offset + 1) % len(devices)
+            self._running[device] += 1
+            self._queued -= 1
+            return queue.popleft()
+        if not self._exhausted and self._queued < self.window:
+            # Todo lo leído está bloqueado en dispositivos ocupados: buscar más
+            self._refill()
+            if self._queued:
+                return self.next_ready()
+        return None
+
+    def finished(self, item: PlannedFile):
+        """Liberar el hueco del dispositivo de un archivo terminado."""
+        self._running[item.stat.st_dev] -= 1
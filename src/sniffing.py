@@ -0,0 +1,172 @@
+"""
+Detección del tipo de imagen por su firma (magic bytes).
+Lee solo los primeros bytes de cada archivo (y opcionalmente los últimos
+para detectar archivos truncados), por lo que cuesta poco más que un stat.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Bytes de cabecera necesarios para reconocer todos los formatos
+HEADER_SIZE = 32
+
+# Bytes finales donde se busca el marcador de cierre del formato
+TRAILER_SIZE = 1024
+
+# Número de archivos por lote en la validación en paralelo
+BATCH_SIZE = 256
+
+# Marcadores de cierre: un archivo truncado no los contiene al final
+_TRAILERS = {
+    'JPEG': b'\xff\xd9',
+    'PNG': b'IEND',
+    'GIF': b'\x3b',
+}
+
+
+def _read_at(fd: int, size: int, offset: int) -> bytes:
+    """Leer bytes en una posición (os.pread no existe en Windows)."""
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def sniff_header(header: bytes) -> Optional[str]:
+    """
+    Identificar el formato de imagen a partir de sus primeros bytes.
+
+    Args:
+        header: Primeros bytes del archivo
+
+    Returns:
+        Optional[str]: 'JPEG', 'PNG', 'GIF', 'BMP', 'TIFF', 'WEBP' o None
+    """
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'JPEG'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'PNG'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'TIFF'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    if header[:2] == b'BM' and len(header) >= 14:
+        return 'BMP'
+    return None
+
+
+def sniff_file(file_path: str, check_trailer: bool = True,
+               size: Optional[int] = None) -> Optional[str]:
+    """
+    Identificar el formato de un archivo leyendo solo su cabecera.
+
+    Args:
+        file_path: Ruta del archivo
+        check_trailer: Rechazar JPEG/PNG/GIF sin marcador de cierre (truncados)
+        size: Tamaño del archivo si ya se conoce (evita un fstat)
+
+    Returns:
+        Optional[str]: Formato detectado o None si no es una imagen válida
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        image_format = sniff_header(_read_at(fd, HEADER_SIZE, 0))
+        trailer = _TRAILERS.get(image_format) if check_trailer else None
+        if trailer is not None:
+            if size is None:
+                size = os.fstat(fd).st_size
+            offset = max(0, size - TRAILER_SIZE)
+            if trailer not in _read_at(fd, size - offset, offset):
+                return None
+        return image_format
+    finally:
+        os.close(fd)
+
+
+class HeaderCache:
+    """
+    Caché acotada de formatos detectados, indexada por (dispositivo, inodo, mtime).
+    Un archivo modificado cambia de mtime y se vuelve a leer.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000, check_trailer: bool = True):
+        """
+        Args:
+            max_entries: Número máximo de entradas (se descartan las más antiguas)
+            check_trailer: Comprobar también el marcador de cierre
+        """
+        self.max_entries = max_entries
+        self.check_trailer = check_trailer
+        self._entries: "OrderedDict[Tuple[int, int, int], Optional[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_format(self, file_path: str, stat: Optional[os.stat_result] = None) -> Optional[str]:
+        """
+        Obtener el formato de un archivo, leyéndolo solo si no está en caché.
+
+        Args:
+            file_path: Ruta del archivo
+            stat: Resultado de os.stat si ya se tiene
+
+        Returns:
+            Optional[str]: Formato detectado o None si no es una imagen válida
+        """
+        if stat is None:
+            stat = os.stat(file_path)
+        key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        image_format = sniff_file(file_path, self.check_trailer, stat.st_size)
+
+        with self._lock:
+            self._entries[key] = image_format
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return image_format
+
+    def _sniff_batch(self, file_paths: Sequence[str]) -> List[Tuple[str, Optional[str]]]:
+        """Validar un lote de archivos (una tarea del pool)."""
+        results = []
+        for file_path in file_paths:
+            try:
+                results.append((file_path, self.get_format(file_path)))
+            except OSError:
+                # Archivos ilegibles: se dejan fuera para que la conversión informe el error
+                continue
+        return results
+
+    def sniff_many(self, file_paths: Iterable[str], max_workers: int = 8,
+                   batch_size: int = BATCH_SIZE) -> Dict[str, Optional[str]]:
+        """
+        Validar muchos archivos en lotes repartidos entre varios hilos.
+        La lectura de cabeceras es E/S pura, así que los hilos bastan.
+
+        Args:
+            file_paths: Rutas de archivos
+            max_workers: Número de hilos
+            batch_size: Archivos por tarea
+
+        Returns:
+            Dict[str, Optional[str]]: Ruta -> formato detectado (None si no es
+                imagen); los archivos que no se pueden leer no aparecen
+        """
+        file_paths = list(file_paths)
+        batches = [file_paths[i:i + batch_size] for i in range(0, len(file_paths), batch_size)]
+        results: Dict[str, Optional[str]] = {}
+        if len(batches) <= 1 or max_workers <= 1:
+            for batch in batches:
+                results.update(self._sniff_batch(batch))
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for batch_result in pool.map(self._sniff_batch, batches):
+                results.update(batch_result)
+        return results
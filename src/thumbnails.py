@@ -0,0 +1,243 @@
+"""
+Miniaturas para la vista previa de la interfaz gráfica.
+Un hilo en segundo plano las genera con Pillow (draft() deja que el
+decodificador JPEG reduzca la imagen mientras la lee) y las guarda como PNG
+en una caché LRU limitada en bytes y, opcionalmente, en una caché en disco
+indexada por (ruta, tamaño, fecha de modificación). El módulo no usa tkinter:
+la interfaz solo convierte los PNG ya hechos en imágenes de Tk. Las
+imágenes con más píxeles que el límite del transcodificador no se decodifican.
+"""
+
+import hashlib
+import io
+import os
+import queue
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Iterable, Optional, Tuple
+
+from .copy_backends import write_atomically
+from .transcoder import MAX_PIXELS, check_image_size, open_image
+
+# Lado máximo de las miniaturas en píxeles (ancho, alto)
+THUMBNAIL_SIZE = (160, 160)
+
+# Memoria máxima de la caché de miniaturas
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024
+
+# Clave de una miniatura: (ruta absoluta, tamaño, st_mtime_ns)
+ThumbnailKey = Tuple[str, int, int]
+
+
+def make_thumbnail(path: str, size: Tuple[int, int] = THUMBNAIL_SIZE,
+                   max_pixels: int = MAX_PIXELS) -> bytes:
+    """
+    Generar la miniatura de una imagen.
+
+    Args:
+        path: Ruta de la imagen
+        size: Lado máximo (ancho, alto)
+        max_pixels: Píxeles decodificados como máximo
+
+    Returns:
+        bytes: Miniatura en PNG
+
+    Raises:
+        ImageTooLargeError: Si la imagen supera max_pixels (sin decodificarla)
+        Exception: Cualquier error de Pillow al leer la imagen
+    """
+    with open_image(path) as image:
+        # Solo JPEG: decodificar ya reducido a 1/2, 1/4 o 1/8. draft() no
+        # decodifica nada, así que el límite se comprueba al tamaño reducido
+        image.draft('RGB', size)
+        check_image_size(image, max_pixels)
+        image.thumbnail(size)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            has_alpha = image.mode in ('LA', 'PA', 'RGBa') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        output = io.BytesIO()
+        image.save(output, 'PNG', compress_level=1)
+    return output.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Caché LRU de miniaturas limitada por el total de bytes. Segura entre hilos.
+    """
+
+    def __init__(self, max_bytes: int = THUMBNAIL_CACHE_BYTES):
+        """
+        Args:
+            max_bytes: Memoria máxima; se descartan las menos usadas al superarla
+        """
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[ThumbnailKey, bytes]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes ocupados por las miniaturas guardadas."""
+        return self._bytes
+
+    def get(self, key: ThumbnailKey) -> Optional[bytes]:
+        """Obtener una miniatura y marcarla como la más reciente."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: ThumbnailKey, data: bytes):
+        """
+        Guardar una miniatura. b'' marca una imagen que no se pudo leer, para
+        no volver a intentarlo mientras siga en la caché.
+        """
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+class DiskThumbnailCache:
+    """
+    Caché persistente: un PNG por miniatura en <carpeta>/<ancho>x<alto>/<xx>/<hash>.png.
+    Como la clave incluye tamaño y fecha de modificación, una imagen que
+    cambia genera otra entrada y la antigua simplemente deja de usarse.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Carpeta de la caché (se crea al guardar)
+        """
+        self.directory = directory
+
+    def path_for(self, key: ThumbnailKey, size: Tuple[int, int] = THUMBNAIL_SIZE) -> str:
+        """Ruta del archivo de una miniatura de un tamaño dado."""
+        name = hashlib.blake2b(repr(key).encode('utf-8', 'surrogateescape'),
+                               digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{size[0]}x{size[1]}", name[:2], name + '.png')
+
+    def get(self, key: ThumbnailKey, size: Tuple[int, int] = THUMBNAIL_SIZE) -> Optional[bytes]:
+        """Leer una miniatura guardada (None si no existe)."""
+        try:
+            with open(self.path_for(key, size), 'rb') as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def put(self, key: ThumbnailKey, data: bytes, size: Tuple[int, int] = THUMBNAIL_SIZE):
+        """Guardar una miniatura de forma atómica."""
+        path = self.path_for(key, size)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        def create(temp_path):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+
+        write_atomically(create, path)
+
+
+class ThumbnailWorker:
+    """
+    Hilo que genera miniaturas bajo demanda. Cada petición reemplaza a la
+    anterior, así que al desplazarse por una lista larga solo se generan las
+    de las filas visibles en ese momento. Los resultados se publican en
+    'results' como (ruta, PNG o None) para que la interfaz los consuma en su
+    propio bucle.
+    """
+
+    def __init__(self, cache: Optional[ThumbnailCache] = None,
+                 disk_cache: Optional[DiskThumbnailCache] = None,
+                 size: Tuple[int, int] = THUMBNAIL_SIZE):
+        """
+        Args:
+            cache: Caché en memoria (por defecto una de THUMBNAIL_CACHE_BYTES)
+            disk_cache: Caché en disco opcional
+            size: Lado máximo de las miniaturas
+        """
+        self.cache = cache if cache is not None else ThumbnailCache()
+        self.disk_cache = disk_cache
+        self.size = tuple(size)
+        self.results: 'queue.Queue[Tuple[str, Optional[bytes]]]' = queue.Queue()
+        self._wanted: Deque[str] = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Arrancar el hilo (idempotente)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="thumbnails", daemon=True)
+            self._thread.start()
+
+    def request(self, paths: Iterable[str]):
+        """
+        Pedir las miniaturas de estas rutas, en orden, descartando las
+        peticiones pendientes anteriores. No bloquea.
+        """
+        with self._condition:
+            self._wanted = deque(dict.fromkeys(paths))
+            self._condition.notify()
+
+    def close(self, timeout: Optional[float] = 1.0):
+        """Detener el hilo (la miniatura en curso se termina)."""
+        with self._condition:
+            self._closed = True
+            self._wanted.clear()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def thumbnail(self, path: str) -> Optional[bytes]:
+        """
+        Obtener la miniatura de una ruta: memoria, disco o Pillow, por ese orden.
+
+        Returns:
+            bytes: PNG, o None si la imagen no existe o no se puede leer
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        data = self.cache.get(key)
+        if data is None and self.disk_cache is not None:
+            data = self.disk_cache.get(key, self.size)
+            if data is not None:
+                self.cache.put(key, data)
+        if data is None:
+            try:
+                data = make_thumbnail(path, self.size)
+            except Exception:
+                # Formato no admitido, archivo dañado o Pillow no instalado
+                data = b''
+            self.cache.put(key, data)
+            if data and self.disk_cache is not None:
+                try:
+                    self.disk_cache.put(key, data, self.size)
+                except OSError:
+                    pass
+        return data or None
+
+    def _run(self):
+        """Bucle del hilo: atender las peticiones de una en una."""
+        while True:
+            with self._condition:
+                while not self._wanted and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                path = self._wanted.popleft()
+            self.results.put((path, self.thumbnail(path)))
@@ -0,0 +1,197 @@
+"""
+Transcodificación real de imágenes con Pillow.
+Normaliza las imágenes a JPEG, WebP o PNG y opcionalmente las reduce a un
+tamaño máximo antes de escribir el archivo con la extensión de destino.
+Pillow se importa al transcodificar la primera imagen, no al importar el
+módulo: las conversiones que solo copian no pagan su carga.
+La memoria por imagen está acotada por un límite de píxeles decodificados
+que se comprueba con la cabecera, antes de decodificar nada.
+"""
+
+import contextlib
+import warnings
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Formatos de salida soportados
+TRANSCODE_FORMATS = ('JPEG', 'WEBP', 'PNG')
+
+# Píxeles que se decodifican como máximo por imagen (unos 256 MB en RGBA).
+# Los JPEG se comprueban al tamaño reducido por draft(); el resto de formatos
+# se decodifican completos, así que cuentan a su tamaño original
+MAX_PIXELS = 64 * 1024 * 1024
+
+
+class ImageTooLargeError(ValueError):
+    """La imagen supera el límite de píxeles decodificados."""
+
+
+# Modos de color que cada formato puede guardar sin conversión
+_SAVE_MODES = {
+    'JPEG': {'RGB', 'L', 'CMYK'},
+    'WEBP': {'RGB', 'RGBA'},
+    'PNG': {'RGB', 'RGBA', 'L', 'LA', 'P', '1', 'I', 'I;16'},
+}
+
+
+class TranscodeOptions:
+    """
+    Opciones de transcodificación (serializable para el pool de procesos).
+    """
+
+    def __init__(self, image_format: str = 'JPEG', quality: int = 85,
+                 max_dimension: Optional[int] = None, max_pixels: int = MAX_PIXELS):
+        """
+        Args:
+            image_format: Formato de salida ('JPEG', 'WEBP' o 'PNG')
+            quality: Calidad de compresión de 1 a 100 (JPEG y WebP)
+            max_dimension: Lado máximo en píxeles (None = tamaño original)
+            max_pixels: Píxeles decodificados como máximo; las imágenes mayores
+                fallan con ImageTooLargeError sin decodificarse
+        """
+        image_format = image_format.upper()
+        if image_format not in TRANSCODE_FORMATS:
+            raise ValueError(f"Formato de transcodificación no válido: {image_format}")
+        if not 1 <= quality <= 100:
+            raise ValueError(f"Calidad no válida: {quality}")
+        if max_dimension is not None and max_dimension < 1:
+            raise ValueError(f"Tamaño máximo no válido: {max_dimension}")
+        if max_pixels < 1:
+            raise ValueError(f"Límite de píxeles no válido: {max_pixels}")
+        self.image_format = image_format
+        self.quality = quality
+        self.max_dimension = max_dimension
+        self.max_pixels = max_pixels
+
+    def __repr__(self):
+        return (f"TranscodeOptions({self.image_format!r}, quality={self.quality}, "
+                f"max_dimension={self.max_dimension}, max_pixels={self.max_pixels})")
+
+
+def _convert_mode(image: 'Image.Image', image_format: str) -> 'Image.Image':
+    """Convertir el modo de color a uno que el formato de salida admita."""
+    from PIL import Image
+
+    if image.mode in _SAVE_MODES[image_format]:
+        return image
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or \
+        (image.mode == 'P' and 'transparency' in image.info)
+    if image_format == 'JPEG' and has_alpha:
+        # JPEG no tiene transparencia: componer sobre fondo blanco
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+@contextlib.contextmanager
+def open_image(source_path: str):
+    """
+    Abrir una imagen (solo la cabecera) para usarla dentro del bloque with.
+    Mientras dura el bloque se ignora el aviso de Pillow para imágenes
+    grandes, que sustituye el límite explícito de píxeles; el filtro es local
+    y no cambia los avisos del resto del proceso. El error de Pillow para
+    imágenes enormes se convierte en ImageTooLargeError.
+    """
+    from PIL import Image
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+        try:
+            image = Image.open(source_path)
+        except Image.DecompressionBombError as e:
+            raise ImageTooLargeError(f"Imagen demasiado grande: {e}") from None
+        with image:
+            yield image
+
+
+def check_image_size(image: 'Image.Image', max_pixels: int = MAX_PIXELS):
+    """
+    Comprobar el límite de píxeles con el tamaño que se va a decodificar
+    (el reducido, si ya se pidió draft()). Solo mira la cabecera.
+
+    Raises:
+        ImageTooLargeError: Si la imagen supera max_pixels
+    """
+    width, height = image.size
+    if width * height > max_pixels:
+        raise ImageTooLargeError(f"Imagen demasiado grande: {width}x{height} píxeles "
+                                 f"(límite {max_pixels})")
+
+
+def _reducing_draft(image: 'Image.Image', max_dimension: int, reducing_gap: float):
+    """
+    Pedir a un JPEG que se decodifique ya reducido (en el dominio DCT) al
+    mismo tamaño que usaría thumbnail(); en los demás formatos no hace nada.
+    """
+    width, height = image.size
+    scale = min(max_dimension / width, max_dimension / height)
+    if scale < 1:
+        image.draft(None, (int(width * scale * reducing_gap),
+                           int(height * scale * reducing_gap)))
+
+
+def transcode_to(source_path: str, target, options: TranscodeOptions) -> int:
+    """
+    Decodificar una imagen y guardarla en el formato indicado.
+    Para reducir tamaño se usa thumbnail() con reducing_gap, que aplica
+    draft() a los JPEG (el decodificador escala en el dominio DCT) y reduce()
+    al resto antes del remuestreo final, así la imagen completa nunca se
+    remuestrea a resolución original. Antes de decodificar se comprueba el
+    límite de píxeles con el tamaño que realmente se va a decodificar.
+
+    Args:
+        source_path: Ruta de la imagen original
+        target: Archivo binario abierto donde escribir (ej: io.BytesIO)
+        options: Opciones de transcodificación
+
+    Returns:
+        int: Bytes escritos
+
+    Raises:
+        ImageTooLargeError: Si la imagen supera options.max_pixels
+    """
+    from PIL import Image
+
+    with open_image(source_path) as image:
+        if options.max_dimension is not None:
+            _reducing_draft(image, options.max_dimension, 2.0)
+        check_image_size(image, options.max_pixels)
+
+        if options.max_dimension is not None:
+            box = (options.max_dimension, options.max_dimension)
+            image.thumbnail(box, Image.LANCZOS, reducing_gap=2.0)
+        else:
+            image.load()
+
+        output = _convert_mode(image, options.image_format)
+        save_args = {}
+        if options.image_format in ('JPEG', 'WEBP'):
+            save_args['quality'] = options.quality
+        if options.image_format == 'JPEG':
+            save_args['optimize'] = True
+            if 'icc_profile' in image.info:
+                save_args['icc_profile'] = image.info['icc_profile']
+
+        start = target.tell()
+        output.save(target, format=options.image_format, **save_args)
+        return target.tell() - start
+
+
+def transcode_file(source_path: str, target_path: str, options: TranscodeOptions) -> int:
+    """
+    Transcodificar una imagen a un archivo (ver transcode_to).
+
+    Args:
+        source_path: Ruta de la imagen original
+        target_path: Ruta del archivo destino
+        options: Opciones de transcodificación
+
+    Returns:
+        int: Tamaño en bytes del archivo escrito
+    """
+    with open(target_path, 'wb') as target:
+        return transcode_to(source_path, target, options)
@@ -0,0 +1,398 @@
+"""
+Modo vigilancia para carpetas de entrada que reciben imágenes todo el día.
+En Linux usa inotify (a través de ctypes, sin dependencias) y el proceso
+queda bloqueado en select() mientras no llega nada; en otros sistemas, o si
+inotify no está disponible, compara instantáneas de la carpeta (scandir +
+tamaño y mtime) a intervalos. Solo se convierten los archivos nuevos o
+modificados, y cada uno espera a que deje de cambiar durante un tiempo
+(debounce) para no copiar archivos a medio escribir.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .image_converter import ImageConverter
+
+# Segundos sin cambios antes de convertir un archivo
+DEFAULT_DEBOUNCE = 2.0
+
+# Segundos entre instantáneas cuando no hay inotify
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+               IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+# Huella de un archivo: (tamaño, mtime en ns)
+Signature = Tuple[int, int]
+
+
+def _load_libc():
+    """Cargar libc si expone inotify (None en otros sistemas)."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class _Inotify:
+    """Descriptor de inotify con una vigilancia por carpeta."""
+
+    def __init__(self, libc):
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._libc = libc
+        self.fd = fd
+        self.dirs: Dict[int, str] = {}
+
+    def add(self, directory: str):
+        """Vigilar una carpeta (sin sus subcarpetas)."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self.dirs[wd] = directory
+
+    def read(self) -> List[Tuple[Optional[str], int, str]]:
+        """
+        Leer los eventos pendientes.
+
+        Returns:
+            Lista de (carpeta o None, máscara, nombre)
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                directory = self.dirs.get(wd)
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                events.append((directory, mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """
+    Vigilar una carpeta y convertir las imágenes que llegan o cambian.
+    """
+
+    def __init__(self, converter: ImageConverter, folder_path: str,
+                 target_extension: Union[str, Sequence[str]], recursive: bool = False,
+                 debounce: float = DEFAULT_DEBOUNCE,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 use_inotify: Optional[bool] = None, process_existing: bool = False):
+        """
+        Args:
+            converter: Convertidor ya configurado (modo de salida, trabajadores...)
+            folder_path: Carpeta de entrada
+            target_extension: Extensión de destino o varias (fan-out)
+            recursive: Vigilar también las subcarpetas
+            debounce: Segundos que un archivo debe pasar sin cambios antes de
+                convertirse (evita copiar archivos a medio escribir)
+            poll_interval: Segundos entre instantáneas sin inotify
+            use_inotify: True = exigir inotify, False = usar instantáneas,
+                None = inotify si está disponible
+            process_existing: Convertir también los archivos presentes al empezar
+        """
+        self.converter = converter
+        self.folder_path = folder_path
+        self.extensions = [target_extension] if isinstance(target_extension, str) \
+            else list(target_extension)
+        self.recursive = recursive
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.process_existing = process_existing
+        # Las subcarpetas de salida (1/, 2/...) no se vigilan
+        self.exclude = [ext[1:] for ext in converter.TARGET_EXTENSIONS]
+
+        libc = _load_libc() if use_inotify is not False else None
+        if use_inotify and libc is None:
+            raise ValueError("inotify no está disponible en este sistema")
+        self._inotify = _Inotify(libc) if libc is not None else None
+        # Huella de cada archivo ya convertido (o presente al empezar)
+        self.done: Dict[str, Signature] = {}
+        # Archivos con cambios: ruta -> momento a partir del cual convertir
+        self.pending: Dict[str, float] = {}
+        self._snapshot: Dict[str, Signature] = {}
+        self._next_scan = 0.0
+        self._stop_read, self._stop_write = os.pipe()
+        self.total_converted = 0
+        self.total_failed = 0
+
+    @property
+    def backend(self) -> str:
+        """Mecanismo de vigilancia en uso ('inotify' o 'polling')."""
+        return 'inotify' if self._inotify is not None else 'polling'
+
+    def _scan(self, folder_path: str) -> Dict[str, Signature]:
+        """Instantánea de las imágenes de una carpeta: ruta -> (tamaño, mtime)."""
+        snapshot = {}
+        for path in self.converter.iter_image_files(folder_path, recursive=self.recursive,
+                                                    exclude=self.exclude):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def _watch_tree(self, folder_path: str):
+        """Añadir vigilancias a una carpeta y, si es recursivo, a sus subcarpetas."""
+        stack = [folder_path]
+        while stack:
+            directory = stack.pop()
+            try:
+                self._inotify.add(directory)
+            except OSError as e:
+                print(f"No se pudo vigilar {directory}: {e}")
+                continue
+            if not self.recursive:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(entry.path for entry in entries
+                                 if entry.is_dir(follow_symlinks=False)
+                                 and entry.name not in self.exclude)
+            except OSError:
+                continue
+
+    def start(self):
+        """Tomar la situación inicial de la carpeta."""
+        if self._inotify is not None:
+            # Primero las vigilancias: lo que llegue durante la exploración no se pierde
+            self._watch_tree(self.folder_path)
+        snapshot = self._scan(self.folder_path)
+        if self.process_existing:
+            now = time.monotonic()
+            for path in snapshot:
+                self.pending[path] = now
+        else:
+            self.done.update(snapshot)
+        if self._inotify is None:
+            self._snapshot = snapshot
+            self._next_scan = time.monotonic() + self.poll_interval
+
+    def stop(self):
+        """Pedir que run() termine (seguro desde otro hilo o un manejador de señal)."""
+        os.write(self._stop_write, b'x')
+
+    def close(self):
+        """Liberar el descriptor de inotify y la tubería de parada."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        for fd in (self._stop_read, self._stop_write):
+            os.close(fd)
+
+    def _mark_changed(self, path: str, now: float):
+        """Aplazar la conversión de un archivo hasta que deje de cambiar."""
+        self.pending[path] = now + self.debounce
+
+    def _handle_events(self, now: float):
+        """Traducir los eventos de inotify a archivos pendientes."""
+        for directory, mask, name in self._inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                # Se perdieron eventos: comparar con una exploración completa
+                for path, signature in self._scan(self.folder_path).items():
+                    if self.done.get(path) != signature:
+                        self._mark_changed(path, now)
+                continue
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and \
+                        name not in self.exclude:
+                    # Carpeta nueva: vigilarla y recoger lo que ya contenga
+                    self._watch_tree(path)
+                    for found in self._scan(path):
+                        self._mark_changed(found, now)
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.pending.pop(path, None)
+                self.done.pop(path, None)
+            elif self.converter.is_image_file(path):
+                self._mark_changed(path, now)
+
+    def _diff_snapshot(self, now: float):
+        """Comparar una instantánea nueva con la anterior (sin inotify)."""
+        snapshot = self._scan(self.folder_path)
+        previous = self._snapshot
+        for path, signature in snapshot.items():
+            if previous.get(path) != signature:
+                self._mark_changed(path, now)
+        for path in previous.keys() - snapshot.keys():
+            self.pending.pop(path, None)
+            self.done.pop(path, None)
+        self._snapshot = snapshot
+
+    def _ready_files(self, now: float) -> Dict[str, Signature]:
+        """Archivos pendientes que llevan 'debounce' segundos sin cambiar."""
+        ready = {}
+        wall_now = time.time_ns()
+        for path, due in list(self.pending.items()):
+            if due > now:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                del self.pending[path]
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            quiet = (wall_now - stat.st_mtime_ns) / 1e9
+            if quiet < self.debounce:
+                # Sigue cambiando (o el evento se perdió): esperar lo que falte
+                self.pending[path] = now + self.debounce - max(quiet, 0.0)
+                continue
+            del self.pending[path]
+            if self.done.get(path) != signature:
+                ready[path] = signature
+        return ready
+
+    def _convert(self, ready: Dict[str, Signature]):
+        """Convertir un lote de archivos listos y anotar los que terminaron bien."""
+        converted = []
+
+        def on_progress(processed, total, file_path, ok):
+            if ok:
+                converted.append(file_path)
+
+        success, failed = self.converter.convert_multiple_files(
+            list(ready), self.extensions, progress_callback=on_progress)
+        for path in converted:
+            self.done[path] = ready[path]
+        self.total_converted += success
+        self.total_failed += failed
+
+    def _timeout(self, now: float) -> Optional[float]:
+        """Espera máxima hasta el próximo archivo pendiente o la próxima instantánea."""
+        timeout = None
+        if self.pending:
+            timeout = max(0.0, min(self.pending.values()) - now)
+        if self._inotify is None:
+            until_scan = max(0.0, self._next_scan - now)
+            timeout = until_scan if timeout is None else min(timeout, until_scan)
+        return timeout
+
+    def poll_once(self, timeout: Optional[float] = 0.0) -> bool:
+        """
+        Esperar cambios como mucho 'timeout' segundos y convertir lo que esté listo.
+
+        Returns:
+            bool: False si se pidió parar con stop()
+        """
+        readers = [self._stop_read]
+        if self._inotify is not None:
+            readers.append(self._inotify.fd)
+        # Sin archivos pendientes y con inotify, se bloquea sin consumir CPU
+        readable, _, _ = select.select(readers, [], [], timeout)
+        if self._stop_read in readable:
+            os.read(self._stop_read, 64)
+            return False
+
+        now = time.monotonic()
+        if self._inotify is not None:
+            if readable:
+                self._handle_events(now)
+        elif now >= self._next_scan:
+            self._diff_snapshot(now)
+            self._next_scan = now + self.poll_interval
+
+        ready = self._ready_files(now)
+        if ready:
+            self._convert(ready)
+        return True
+
+    def run(self):
+        """Vigilar hasta que se llame a stop() o se interrumpa el proceso."""
+        self.start()
+        print(f"Vigilando {self.folder_path} ({self.backend}); Ctrl+C para terminar")
+        while self.poll_once(self._timeout(time.monotonic())):
+            pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada del comando 'watch'."""
+    parser = argparse.ArgumentParser(
+        prog="main.py watch",
+        description="Vigilar una carpeta y convertir las imágenes que llegan")
+    parser.add_argument("folder", help="Carpeta de entrada")
+    parser.add_argument("-e", "--ext", required=True, action="append",
+                        choices=ImageConverter.TARGET_EXTENSIONS,
+                        help="Extensión de destino (repetible para fan-out)")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Vigilar subcarpetas")
+    parser.add_argument("--existing", action="store_true",
+                        help="Convertir también las imágenes presentes al empezar")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="Segundos sin cambios antes de convertir un archivo")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Segundos entre exploraciones si no hay inotify")
+    parser.add_argument("--polling", action="store_true",
+                        help="Comparar instantáneas aunque inotify esté disponible")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Trabajadores en paralelo")
+    parser.add_argument("--mode", choices=ImageConverter.OUTPUT_MODES, default="copy",
+                        help="Modo de salida")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.folder):
+        parser.error(f"No es una carpeta: {args.folder}")
+
+    try:
+        converter = ImageConverter(max_workers=args.workers, output_mode=args.mode)
+    except ValueError as e:
+        parser.error(str(e))
+    watcher = FolderWatcher(converter, args.folder, args.ext, recursive=args.recursive,
+                            debounce=args.debounce, poll_interval=args.poll_interval,
+                            use_inotify=False if args.polling else None,
+                            process_existing=args.existing)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    print(f"Vigilancia terminada: {watcher.total_converted} convertidos, "
+          f"{watcher.total_failed} fallidos")
+    return 0 if watcher.total_failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
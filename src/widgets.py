@@ -0,0 +1,185 @@
+"""
+Widgets de Tk reutilizables para la interfaz gráfica.
+"""
+
+import os
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Optional, Sequence
+
+
+class VirtualFileList(ttk.Frame):
+    """
+    Lista de archivos virtualizada sobre un ttk.Treeview.
+    Solo existen tantas filas de Tk como caben en pantalla; al desplazarse se
+    reescribe el texto de esas filas, así que el coste no depende del número
+    total de archivos.
+    """
+
+    # Alto de fila por defecto si el tema no lo define
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, master, items: Sequence[str], height: int = 6,
+                 on_select: Optional[Callable[[int, str], None]] = None,
+                 on_view_change: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            master: Widget contenedor
+            items: Secuencia de rutas (se lee por índice, no se copia)
+            height: Número inicial de filas visibles
+            on_select: Función llamada con (índice, ruta) al seleccionar una fila
+            on_view_change: Función llamada con (primera, última) fila visible
+        """
+        super().__init__(master)
+        self._items = items
+        self._first = 0
+        self._rows = height
+        self._selected_index: Optional[int] = None
+        self._row_ids = []
+        self._updating = False
+        self.on_select = on_select
+        self.on_view_change = on_view_change
+
+        self.tree = ttk.Treeview(self, columns=("name", "folder"), show="headings",
+                                 height=height, selectmode="browse")
+        self.tree.heading("name", text="Archivo")
+        self.tree.heading("folder", text="Carpeta")
+        self.tree.column("name", width=220, stretch=False)
+        self.tree.column("folder", width=380, stretch=True)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda e: self._move_selection(-self._rows))
+        self.tree.bind("<Next>", lambda e: self._move_selection(self._rows))
+
+    def set_items(self, items: Sequence[str]):
+        """Cambiar la secuencia mostrada."""
+        self._items = items
+        if self._selected_index is not None and self._selected_index >= len(items):
+            self._selected_index = None
+        self.refresh()
+
+    def visible_range(self):
+        """
+        Obtener el rango de índices visibles.
+
+        Returns:
+            Tuple[int, int]: (primer índice, índice siguiente al último)
+        """
+        return self._first, min(len(self._items), self._first + self._rows)
+
+    def refresh(self):
+        """Redibujar solo las filas visibles."""
+        total = len(self._items)
+        self._first = max(0, min(self._first, total - self._rows))
+        visible = min(self._rows, total - self._first)
+
+        # Ajustar el número de filas de Tk a las que caben en pantalla
+        while len(self._row_ids) < visible:
+            self._row_ids.append(self.tree.insert("", tk.END, values=("", "")))
+        while len(self._row_ids) > visible:
+            self.tree.delete(self._row_ids.pop())
+
+        self._updating = True
+        try:
+            selected_row = None
+            for offset, row_id in enumerate(self._row_ids):
+                index = self._first + offset
+                file_path = self._items[index]
+                self.tree.item(row_id, values=(os.path.basename(file_path),
+                                               os.path.dirname(file_path)))
+                if index == self._selected_index:
+                    selected_row = row_id
+            if selected_row is not None:
+                self.tree.selection_set(selected_row)
+            elif self.tree.selection():
+                self.tree.selection_remove(self.tree.selection())
+        finally:
+            self._updating = False
+
+        if total:
+            self.scrollbar.set(self._first / total, (self._first + visible) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.on_view_change:
+            self.on_view_change(self._first, self._first + visible)
+
+    def yview(self, *args):
+        """Comando de la barra de desplazamiento (moveto / scroll)."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._first = int(float(args[1]) * len(self._items))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._first += amount * self._rows if args[2] == "pages" else amount
+        self.refresh()
+
+    def _scroll_by(self, rows: int):
+        """Desplazar la vista un número de filas."""
+        self._first += rows
+        self.refresh()
+        return "break"
+
+    def _on_mousewheel(self, event):
+        """Desplazamiento con la rueda del ratón (Windows/macOS)."""
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_configure(self, event):
+        """Recalcular cuántas filas caben al cambiar el tamaño."""
+        style = ttk.Style()
+        row_height = style.lookup("Treeview", "rowheight")
+        try:
+            row_height = int(row_height)
+        except (TypeError, ValueError):
+            row_height = self.DEFAULT_ROW_HEIGHT
+        # Descontar la fila de encabezados
+        rows = max(1, event.height // row_height - 1)
+        if rows != self._rows:
+            self._rows = rows
+            self.refresh()
+
+    def _on_tree_select(self, event):
+        """Traducir la fila seleccionada de Tk al índice real."""
+        if self._updating:
+            return
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._row_ids:
+            return
+        index = self._first + self._row_ids.index(selection[0])
+        self._select_index(index)
+
+    def _move_selection(self, delta: int):
+        """Mover la selección con el teclado desplazando la vista si hace falta."""
+        total = len(self._items)
+        if not total:
+            return "break"
+        current = self._selected_index if self._selected_index is not None else self._first
+        index = max(0, min(total - 1, current + delta))
+        if index < self._first:
+            self._first = index
+        elif index >= self._first + self._rows:
+            self._first = index - self._rows + 1
+        self._selected_index = index
+        self.refresh()
+        self._select_index(index)
+        return "break"
+
+    def _select_index(self, index: int):
+        """Registrar la selección y notificarla."""
+        self._selected_index = index
+        if self.on_select:
+            self.on_select(index, self._items[index])
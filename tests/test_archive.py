@@ -0,0 +1,120 @@
+"""
+Pruebas unitarias para la salida en archivo comprimido.
+"""
+
+import os
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.archive import ArchiveWriter, stream_file
+from src.image_converter import ImageConverter
+
+
+def test_archive_output_streams_entries(tmp_path):
+    """
+    Prueba que la salida en archivo escriba un tar o zip por extensión y
+    ninguna subcarpeta.
+    """
+    source = tmp_path / 'fotos'
+    source.mkdir()
+    files = []
+    for i in range(3):
+        path = source / f"img_{i:03d}.jpg"
+        path.write_bytes(bytes([i]) * 700)
+        files.append(str(path))
+    (source / 'img_000.png').write_bytes(b'png')
+    files.append(str(source / 'img_000.png'))
+    out = tmp_path / 'out'
+
+    converter = ImageConverter(archive_format='tar.gz', archive_dir=str(out))
+    targets = {}
+
+    def on_progress(processed, total, file_path, ok):
+        targets[file_path] = converter.target_path_for(file_path, '.4')[1]
+
+    assert converter.convert_multiple_files(files, ['.1', '.4'],
+                                            progress_callback=on_progress) == (4, 0)
+
+    assert sorted(os.listdir(source)) == sorted(os.path.basename(f) for f in files)
+    with tarfile.open(out / '1.tar.gz') as archive:
+        names = archive.getnames()
+        assert archive.extractfile(names[1]).read() == bytes([1]) * 700
+    # Fuera de archive_dir las entradas llevan la ruta absoluta sin la barra inicial
+    assert names == [str(source / '1' / name).lstrip('/')
+                     for name in ['img_000.1', 'img_001.1', 'img_002.1', 'img_000_1.1']]
+    assert targets[files[3]] == \
+        out / '4.tar.gz' / str(source / '4' / 'img_000_1.4').lstrip('/')
+
+    converter = ImageConverter(archive_format='zip', archive_dir=str(source))
+    assert converter.convert_multiple_files(files[:2], '.2') == (2, 0)
+    with zipfile.ZipFile(source / '2.zip') as archive:
+        assert archive.read('2/img_001.2') == bytes([1]) * 700
+    assert converter.get_conversion_summary()['modes'] == {'archive': 2}
+
+    # Terminado el lote, los destinos vuelven a ser archivos sueltos
+    assert converter.target_path_for(files[0], '.2')[1] == source / '2' / 'img_000.2'
+    assert converter.convert_single_file(files[0], '.2')
+    assert (source / '2' / 'img_000.2').read_bytes() == bytes([0]) * 700
+
+
+@pytest.mark.parametrize("archive_format", ['tar', 'zip'])
+def test_stream_file_skips_sources_that_change_while_read(tmp_path, archive_format):
+    """
+    Prueba que un origen que se acorta o crece no deje una entrada en el archivo
+    y que las entradas siguientes se escriban bien.
+    """
+    good = tmp_path / 'good.jpg'
+    good.write_bytes(b'g' * 700)
+    changed = tmp_path / 'changed.jpg'
+    changed.write_bytes(b'c' * 500)
+    writer = ArchiveWriter(str(tmp_path / f'1.{archive_format}'), archive_format)
+
+    stream_file(str(good), [(writer, 'good.1')], 700, 0)
+    # El stat decía 1000 bytes (se acortó) o 100 (creció) antes de leerlo
+    for size in (1000, 100):
+        with pytest.raises(OSError):
+            stream_file(str(changed), [(writer, 'changed.1')], size, 0)
+    stream_file(str(good), [(writer, 'after.1')], 700, 0)
+    writer.close()
+
+    assert writer.entries == 2
+    if archive_format == 'tar':
+        with tarfile.open(tmp_path / '1.tar') as archive:
+            assert archive.getnames() == ['good.1', 'after.1']
+            assert archive.extractfile('after.1').read() == b'g' * 700
+    else:
+        with zipfile.ZipFile(tmp_path / '1.zip') as archive:
+            assert archive.namelist() == ['good.1', 'after.1']
+            assert archive.testzip() is None
+            assert archive.read('after.1') == b'g' * 700
+
+
+def test_stream_file_discards_compressed_archive_when_source_changes(tmp_path):
+    """
+    Prueba que un tar.gz, que no se puede rebobinar, se descarte entero si un
+    origen cambia durante la lectura.
+    """
+    source = tmp_path / 'a.jpg'
+    source.write_bytes(b'a' * 500)
+    path = tmp_path / '1.tar.gz'
+    writer = ArchiveWriter(str(path), 'tar.gz')
+
+    stream_file(str(source), [(writer, 'a.1')], 500, 0)
+    with pytest.raises(OSError, match='descartado'):
+        stream_file(str(source), [(writer, 'b.1')], 1000, 0)
+    with pytest.raises(OSError):
+        stream_file(str(source), [(writer, 'c.1')], 500, 0)
+    with pytest.raises(OSError):
+        writer.close()
+
+    assert os.listdir(tmp_path) == ['a.jpg']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,84 @@
+"""
+Pruebas unitarias para la interfaz de línea de comandos.
+"""
+
+import io
+import json
+import pytest
+import sys
+import os
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.cli import EXIT_FAILURES, EXIT_OK, main, read_paths
+
+
+def test_read_paths_streams_nul_and_newline_lists():
+    """
+    Prueba la lectura de rutas separadas por NUL y por salto de línea.
+    """
+    assert list(read_paths(io.BytesIO(b'a.jpg\0dir/b c.png\0'), b'\0')) == ['a.jpg', 'dir/b c.png']
+    assert list(read_paths(io.BytesIO(b'a.jpg\r\n\nb.png'))) == ['a.jpg', 'b.png']
+
+
+def test_convert_from_stdin_writes_jsonl(tmp_path, monkeypatch, capsys):
+    """
+    Prueba que cada archivo produzca una línea JSON y el código de salida.
+    """
+    for name in ['a.jpg', 'b.png']:
+        (tmp_path / name).write_bytes(b'data')
+    paths = [str(tmp_path / 'a.jpg'), str(tmp_path / 'b.png'), str(tmp_path / 'missing.gif')]
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO('\0'.join(paths).encode())))
+
+    assert main(['--ext', '.3', '-0', '-j', '2']) == EXIT_FAILURES
+
+    captured = capsys.readouterr()
+    records = {r['file']: r for r in map(json.loads, captured.out.splitlines())}
+    assert records[paths[0]] == {'file': paths[0], 'ok': True,
+                                 'target': str(tmp_path / '3' / 'a.3')}
+    assert records[paths[2]]['ok'] is False
+    assert 'Conversión completada' in captured.err
+
+
+def test_convert_folder_recursive(tmp_path, capsys):
+    """
+    Prueba la conversión de una carpeta con subcarpetas.
+    """
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'x.webp').write_bytes(b'data')
+
+    assert main([str(tmp_path), '--ext', '.1', '--recursive', '--quiet']) == EXIT_OK
+    assert (tmp_path / 'sub' / '1' / 'x.1').exists()
+
+
+def test_convert_to_several_extensions(tmp_path, capsys):
+    """
+    Prueba que -e repetido escriba todas las extensiones e informe cada destino.
+    """
+    (tmp_path / 'a.png').write_bytes(b'data')
+
+    assert main([str(tmp_path / 'a.png'), '-e', '.2', '-e', '.4', '--fan-out', 'copy']) == EXIT_OK
+
+    record = json.loads(capsys.readouterr().out)
+    assert record['targets'] == [str(tmp_path / '2' / 'a.2'), str(tmp_path / '4' / 'a.4')]
+    assert (tmp_path / '4' / 'a.4').read_bytes() == b'data'
+    assert not os.path.samefile(tmp_path / '2' / 'a.2', tmp_path / '4' / 'a.4')
+
+
+def test_headless_imports_skip_tkinter_and_pillow():
+    """
+    Prueba que los modos sin interfaz no carguen tkinter ni Pillow al importarse.
+    """
+    import subprocess
+
+    code = ("import sys, src.cli, src.app, src.watcher; "
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'tkinter', 'PIL'}))")
+    root = os.path.join(os.path.dirname(__file__), '..')
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, check=True,
+                            capture_output=True, text=True).stdout
+    assert output.strip() == '[]'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,80 @@
+"""
+Pruebas unitarias para el demonio de conversión.
+"""
+
+import asyncio
+import io
+import json
+import pytest
+import sys
+import os
+import threading
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.daemon import ConversionDaemon, submit
+
+pytestmark = pytest.mark.skipif(not hasattr(asyncio, 'start_unix_server'),
+                                reason="Requiere sockets Unix")
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """
+    Arrancar el demonio en un hilo y detenerlo al terminar la prueba.
+    """
+    server = ConversionDaemon(str(tmp_path / 'daemon.sock'), max_workers=2)
+    thread = threading.Thread(target=asyncio.run, args=(server.serve(),), daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+    yield server
+    server.stop()
+    thread.join(5)
+
+
+def test_submit_streams_results(tmp_path, daemon):
+    """
+    Prueba que dos clientes reciban un resultado por archivo y el resumen final.
+    """
+    files = []
+    for i in range(3):
+        path = tmp_path / f"img_{i}.png"
+        path.write_bytes(b'data')
+        files.append(str(path))
+
+    for extension in ('.1', '.2'):
+        output = io.StringIO()
+        exit_code = submit(files + [str(tmp_path / 'missing.png')], extension,
+                           socket_path=daemon.socket_path, output=output)
+        messages = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        assert exit_code == 1
+        assert sum(1 for m in messages if m.get('ok')) == 3
+        assert messages[-1] == {'done': True, 'success': 3, 'failed': 1}
+        assert (tmp_path / extension[1:] / f'img_0{extension}').exists()
+
+
+def test_socket_is_private_to_its_owner(daemon):
+    """
+    Prueba que el socket solo sea accesible para el usuario que lo creó.
+    """
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+def test_invalid_transcode_option_gets_an_error_reply(tmp_path, daemon):
+    """
+    Prueba que una opción 'transcode' que no es un objeto reciba un error.
+    """
+    output = io.StringIO()
+
+    exit_code = submit([str(tmp_path / 'a.png')], '.1', {'transcode': 'jpeg'},
+                       socket_path=daemon.socket_path, output=output)
+
+    messages = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert exit_code != 0
+    assert 'transcode' in messages[-1]['error']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,537 @@
+"""
+Pruebas unitarias para el módulo image_converter.
+"""
+
+import pytest
+import sys
+import os
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.image_converter import ImageConverter
+from src.copy_backends import copy_file
+from src.planner import CollisionError
+from src.results import MAX_FAILURES, ResultStore
+from src.transcoder import TranscodeOptions, transcode_file
+
+
+def make_images(folder, count, size=16):
+    """
+    Crear archivos de imagen falsos (solo importa la extensión).
+    """
+    paths = []
+    for i in range(count):
+        path = folder / f"img_{i:03d}.jpg"
+        path.write_bytes(bytes([i % 256]) * size)
+        paths.append(str(path))
+    return paths
+
+
+def test_convert_single_file(tmp_path):
+    """
+    Prueba que un archivo se copie a la subcarpeta de la extensión.
+    """
+    source = make_images(tmp_path, 1)[0]
+    converter = ImageConverter()
+
+    assert converter.convert_single_file(source, '.1')
+
+    target = tmp_path / '1' / 'img_000.1'
+    assert target.read_bytes() == (tmp_path / 'img_000.jpg').read_bytes()
+    assert converter.converted_files[0]['converted'] == str(target)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_convert_multiple_files_parallel(tmp_path, executor):
+    """
+    Prueba el modo paralelo manteniendo el contrato (exitosos, fallidos).
+    """
+    files = make_images(tmp_path, 20)
+    files.append(str(tmp_path / 'missing.jpg'))
+    progress = []
+
+    converter = ImageConverter(max_workers=4, executor=executor)
+    success, failed = converter.convert_multiple_files(
+        iter(files), '.2',
+        progress_callback=lambda done, total, path, ok: progress.append(done))
+
+    assert (success, failed) == (20, 1)
+    assert len(converter.converted_files) == 20
+    assert progress == list(range(1, 22))
+    assert len(list((tmp_path / '2').iterdir())) == 20
+
+
+def test_convert_multiple_files_cancel(tmp_path):
+    """
+    Prueba que la cancelación detenga el procesamiento.
+    """
+    files = make_images(tmp_path, 5)
+    converter = ImageConverter()
+
+    success, failed = converter.convert_multiple_files(files, '.1', should_cancel=lambda: True)
+
+    assert (success, failed) == (0, 0)
+
+
+@pytest.mark.parametrize("strategies", [None, ("sendfile", "python"), ("python",)])
+def test_copy_file_strategies(tmp_path, strategies):
+    """
+    Prueba que cada cadena de estrategias produzca una copia idéntica.
+    """
+    source = tmp_path / 'big.tiff'
+    source.write_bytes(os.urandom(3 * 1024 * 1024 + 17))
+    target = tmp_path / 'big.1'
+
+    used = copy_file(str(source), str(target), strategies)
+
+    assert target.read_bytes() == source.read_bytes()
+    assert used in (strategies or (used,))
+    assert target.stat().st_mtime == source.stat().st_mtime
+
+
+@pytest.mark.parametrize("mode", ["hardlink", "symlink", "reflink", "move"])
+def test_output_modes(tmp_path, mode):
+    """
+    Prueba los modos de salida y que el contenido del destino sea el original.
+    """
+    source = make_images(tmp_path, 1, size=4096)[0]
+    content = (tmp_path / 'img_000.jpg').read_bytes()
+    converter = ImageConverter(output_mode=mode)
+
+    assert converter.convert_single_file(source, '.3')
+
+    target = tmp_path / '3' / 'img_000.3'
+    record = converter.converted_files[0]
+    assert target.read_bytes() == content
+    assert record['mode'] in (mode, 'copy')
+    assert os.path.exists(source) == (mode != 'move')
+    if mode == 'hardlink':
+        assert os.path.samefile(source, target)
+
+
+def test_copy_over_previous_hardlink_keeps_source(tmp_path):
+    """
+    Prueba que copiar sobre un enlace duro previo no trunque el original.
+    """
+    source = make_images(tmp_path, 1, size=4096)[0]
+    ImageConverter(output_mode='hardlink').convert_single_file(source, '.1')
+
+    assert ImageConverter().convert_single_file(source, '.1')
+
+    assert os.path.getsize(source) == 4096
+    assert not os.path.samefile(source, tmp_path / '1' / 'img_000.1')
+
+
+@pytest.mark.parametrize("previous", ['hardlink', 'symlink'])
+def test_move_over_previous_link_removes_source(tmp_path, previous):
+    """
+    Prueba que mover sobre un enlace previo al origen quite el origen y deje
+    el contenido en el destino.
+    """
+    source = make_images(tmp_path, 1, size=4096)[0]
+    content = open(source, 'rb').read()
+    ImageConverter(output_mode=previous).convert_single_file(source, '.1')
+
+    converter = ImageConverter(output_mode='move')
+    assert converter.convert_single_file(source, '.1')
+
+    target = tmp_path / '1' / 'img_000.1'
+    assert not os.path.lexists(source)
+    assert not target.is_symlink()
+    assert target.read_bytes() == content
+    assert converter.converted_files[0]['mode'] == 'move'
+
+
+def test_get_image_files_from_folder_recursive(tmp_path):
+    """
+    Prueba la exploración recursiva con límite de profundidad y patrones.
+    """
+    (tmp_path / 'a' / 'b').mkdir(parents=True)
+    for relative in ['x.jpg', 'notes.txt', 'a/y.PNG', 'a/skip.gif', 'a/b/z.webp']:
+        (tmp_path / relative).write_bytes(b'data')
+    converter = ImageConverter()
+
+    flat = converter.get_image_files_from_folder(str(tmp_path))
+    deep = converter.get_image_files_from_folder(str(tmp_path), recursive=True,
+                                                 exclude=['skip.*'])
+    limited = set(converter.iter_image_files(str(tmp_path), recursive=True, max_depth=1))
+
+    assert flat == [str(tmp_path / 'x.jpg')]
+    assert deep == sorted(str(tmp_path / p) for p in ['x.jpg', 'a/y.PNG', 'a/b/z.webp'])
+    assert limited == {str(tmp_path / p) for p in ['x.jpg', 'a/y.PNG', 'a/skip.gif']}
+
+
+def test_recursive_scan_does_not_loop_through_symlinks(tmp_path):
+    """
+    Prueba que un enlace a una carpeta ya visitada no se recorra otra vez.
+    """
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'a' / 'img.jpg').write_bytes(b'data')
+    os.symlink('..', tmp_path / 'a' / 'loop')
+    converter = ImageConverter()
+
+    found = converter.get_image_files_from_folder(str(tmp_path), recursive=True)
+
+    assert found == [str(tmp_path / 'a' / 'img.jpg')]
+
+
+def test_incremental_skips_unchanged_files(tmp_path):
+    """
+    Prueba que una segunda ejecución incremental omita los archivos sin cambios.
+    """
+    files = make_images(tmp_path, 3)
+    converter = ImageConverter(incremental=True)
+
+    assert converter.convert_multiple_files(files, '.4') == (3, 0)
+    assert converter.get_conversion_summary()['total_skipped'] == 0
+
+    os.utime(files[0], ns=(1, 1))
+    assert converter.convert_multiple_files(files, '.4') == (3, 0)
+
+    summary = converter.get_conversion_summary()
+    assert summary['total_skipped'] == 2
+    assert [item['original'] for item in summary['converted']] == [files[0]]
+    assert (tmp_path / '4' / '.manifest.sqlite').exists()
+
+
+def test_dedup_links_identical_sources(tmp_path):
+    """
+    Prueba que los duplicados se enlacen a una única copia física.
+    """
+    (tmp_path / 'sub').mkdir()
+    payload = os.urandom(2048)
+    files = []
+    for relative in ['a.jpg', 'b.png', 'sub/c.gif']:
+        (tmp_path / relative).write_bytes(payload)
+        files.append(str(tmp_path / relative))
+    files += make_images(tmp_path, 1, size=2048)
+
+    converter = ImageConverter(dedup=True)
+    assert converter.convert_multiple_files(files, '.5') == (4, 0)
+
+    summary = converter.get_conversion_summary()
+    assert summary['bytes_saved'] == 2 * 2048
+    assert os.path.samefile(tmp_path / '5' / 'a.5', tmp_path / '5' / 'b.5')
+    assert os.path.samefile(tmp_path / '5' / 'a.5', tmp_path / 'sub' / '5' / 'c.5')
+    assert not os.path.samefile(tmp_path / '5' / 'a.5', tmp_path / '5' / 'img_000.5')
+
+
+def test_transcode_to_webp_with_max_dimension(tmp_path):
+    """
+    Prueba la transcodificación real con reducción de tamaño.
+    """
+    from PIL import Image
+
+    source = tmp_path / 'photo.jpg'
+    Image.new('RGB', (640, 480), (200, 30, 30)).save(source, format='JPEG')
+    converter = ImageConverter(transcode=TranscodeOptions('webp', quality=70, max_dimension=100))
+
+    assert converter.convert_single_file(str(source), '.6')
+
+    with Image.open(tmp_path / '6' / 'photo.6') as result:
+        assert result.format == 'WEBP'
+        assert max(result.size) == 100
+    assert converter.converted_files[0]['mode'] == 'transcode'
+
+
+def test_transcode_rejects_images_over_the_pixel_limit(tmp_path):
+    """
+    Prueba que una imagen con más píxeles que el límite falle sin decodificarse.
+    """
+    from PIL import Image
+
+    Image.new('RGB', (400, 300)).save(tmp_path / 'wide.png')
+    Image.new('RGB', (1600, 1200)).save(tmp_path / 'photo.jpg')
+    options = TranscodeOptions('PNG', max_dimension=100, max_pixels=100_000)
+    converter = ImageConverter(transcode=options)
+
+    assert converter.convert_multiple_files([str(tmp_path / 'wide.png'),
+                                             str(tmp_path / 'photo.jpg')], '.3') == (1, 1)
+
+    # El JPEG se decodifica reducido por draft() (200x150) y cabe en el límite
+    assert os.listdir(tmp_path / '3') == ['photo.3']
+    assert 'demasiado grande' in converter.last_error(str(tmp_path / 'wide.png'))
+
+
+def test_transcode_silences_bomb_warning_only_while_decoding(tmp_path, monkeypatch):
+    """
+    Prueba que el aviso de Pillow para imágenes grandes se ignore al
+    transcodificar sin cambiar los filtros de avisos del proceso.
+    """
+    import warnings
+
+    from PIL import Image
+
+    Image.new('RGB', (40, 30)).save(tmp_path / 'a.png')
+    # 1200 píxeles: entre el límite de Pillow y su doble, solo avisa
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 1000)
+    filters = list(warnings.filters)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        transcode_file(str(tmp_path / 'a.png'), str(tmp_path / 'a.1'), TranscodeOptions('PNG'))
+        assert caught == []
+        with pytest.warns(Image.DecompressionBombWarning):
+            Image.open(tmp_path / 'a.png').close()
+    assert warnings.filters == filters
+
+
+def test_validate_content_rejects_non_images(tmp_path):
+    """
+    Prueba que los archivos sin firma de imagen o truncados se rechacen sin copiarse.
+    """
+    from PIL import Image
+
+    good = tmp_path / 'good.jpg'
+    Image.new('RGB', (32, 32)).save(good, format='JPEG')
+    truncated = tmp_path / 'truncated.jpg'
+    truncated.write_bytes(good.read_bytes()[:200])
+    fake = tmp_path / 'fake.png'
+    fake.write_text('esto no es una imagen')
+    files = [str(good), str(truncated), str(fake)]
+
+    converter = ImageConverter(max_workers=2, validate_content=True)
+    assert converter.convert_multiple_files(files, '.1') == (1, 2)
+
+    failed = {item['file'] for item in converter.get_conversion_summary()['failed']}
+    assert failed == {str(truncated), str(fake)}
+    assert sorted(os.listdir(tmp_path / '1')) == ['good.1']
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_metrics_per_phase_and_export(tmp_path, executor):
+    """
+    Prueba que las métricas cuenten cada fase, los bytes por estrategia y los errores.
+    """
+    files = make_images(tmp_path, 4)
+    missing = str(tmp_path / "missing.jpg")
+    metrics_file = tmp_path / "run.prom"
+    converter = ImageConverter(max_workers=2, executor=executor,
+                               metrics_path=str(metrics_file))
+
+    success, failed = converter.convert_multiple_files(files + [missing], '.3')
+
+    assert (success, failed) == (4, 1)
+    metrics = converter.get_conversion_summary()['metrics']
+    assert metrics['phases']['stat']['count'] == 4
+    assert metrics['phases']['copy']['count'] == 4
+    assert sum(metrics['files_by_strategy'].values()) == 4
+    assert sum(metrics['bytes_by_strategy'].values()) == sum(os.path.getsize(f) for f in files)
+    assert metrics['errors'] == {'not_found': 1}
+    assert 'image_converter_phase_seconds_count{phase="copy"} 4' in metrics_file.read_text()
+
+
+def test_metrics_disabled_by_default(tmp_path):
+    """
+    Prueba que sin activar las métricas el resumen no las incluya.
+    """
+    converter = ImageConverter()
+    converter.convert_multiple_files(make_images(tmp_path, 1), '.1')
+    assert converter.metrics is None
+    assert 'metrics' not in converter.get_conversion_summary()
+
+
+def test_result_store_is_bounded_and_spills_to_log(tmp_path):
+    """
+    Prueba que solo los registros recientes queden en memoria y que el registro
+    en disco los tenga todos.
+    """
+    files = make_images(tmp_path, 10)
+    log = tmp_path / "results.jsonl"
+    converter = ImageConverter(max_records=3, results_log=str(log))
+
+    converter.convert_multiple_files(files, '.1')
+
+    summary = converter.get_conversion_summary()
+    assert summary['total_converted'] == 10
+    assert len(summary['converted']) == 3
+    assert summary['converted'][-1]['original'] == files[-1]
+    assert summary['bytes_converted'] == 10 * 16
+    assert summary['subfolders'] == {str(tmp_path / "1"): 10}
+    entries = list(converter.results.iter_spilled())
+    assert [e['original'] for e in entries] == files
+    # Los fallos tienen su propio límite
+    assert converter.results.failures.maxlen == MAX_FAILURES
+    assert ImageConverter(max_failures=2).results.failures.maxlen == 2
+
+
+def test_result_store_last_error_follows_bounded_failures():
+    """
+    Prueba que el último error de un archivo se olvide junto con su fallo al
+    superar el límite de fallos en memoria.
+    """
+    store = ResultStore(max_failures=2)
+    store.add_failure('a.jpg', 'primero')
+    store.add_failure('b.jpg', 'b')
+    store.add_failure('a.jpg', 'segundo')
+    assert store.last_error('a.jpg') == 'segundo'
+    assert store.last_error('b.jpg') == 'b'
+
+    store.add_failure('c.jpg', 'c')
+    store.add_failure('d.jpg', 'd')
+    assert store.last_error('a.jpg') is None
+    assert store.last_error('b.jpg') is None
+    assert store.last_error('d.jpg') == 'd'
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ('suffix', ['a.1', 'a_1.1', 'a_2.1', 'a_3.1']),
+    ('skip', ['a.1', 'a_1.1']),
+])
+def test_stem_collisions_follow_policy(tmp_path, policy, expected):
+    """
+    Prueba las políticas de colisión: a.jpg, a.png y a.gif comparten destino y
+    a_1.jpg conserva su nombre natural.
+    """
+    files = []
+    for name in ['a.jpg', 'a.png', 'a_1.jpg', 'a.gif']:
+        (tmp_path / name).write_bytes(name.encode())
+        files.append(str(tmp_path / name))
+    converter = ImageConverter(max_workers=2, collision_policy=policy)
+
+    success, failed = converter.convert_multiple_files(files, '.1')
+
+    assert sorted(os.listdir(tmp_path / '1')) == sorted(set(expected))
+    # El nombre natural y los sufijos se asignan por orden de ruta
+    assert (tmp_path / '1' / 'a.1').read_bytes() == b'a.gif'
+    if policy == 'suffix':
+        assert (success, failed) == (4, 0)
+        assert (tmp_path / '1' / 'a_1.1').read_bytes() == b'a_1.jpg'
+        assert (tmp_path / '1' / 'a_2.1').read_bytes() == b'a.jpg'
+        assert (tmp_path / '1' / 'a_3.1').read_bytes() == b'a.png'
+    else:
+        assert (success, failed) == (2, 2)
+
+
+def test_stem_collision_suffixes_do_not_depend_on_input_order(tmp_path):
+    """
+    Prueba que el orden inverso dé los mismos destinos y que la ejecución
+    incremental los omita.
+    """
+    files = []
+    for name in ['a.jpg', 'a.png']:
+        (tmp_path / name).write_bytes(name.encode())
+        files.append(str(tmp_path / name))
+    converter = ImageConverter(incremental=True)
+
+    assert converter.convert_multiple_files(files, '.1') == (2, 0)
+    assert converter.convert_multiple_files(files[::-1], '.1') == (2, 0)
+
+    assert converter.results.total_skipped == 2
+    assert (tmp_path / '1' / 'a.1').read_bytes() == b'a.jpg'
+    assert (tmp_path / '1' / 'a_1.1').read_bytes() == b'a.png'
+
+
+def test_stem_collision_fail_policy_writes_nothing(tmp_path):
+    """
+    Prueba que con la política 'fail' la colisión se detecte antes de escribir.
+    """
+    files = []
+    for name in ['a.jpg', 'b.jpg', 'a.png']:
+        (tmp_path / name).write_bytes(b'x')
+        files.append(str(tmp_path / name))
+    converter = ImageConverter(collision_policy='fail')
+
+    with pytest.raises(CollisionError):
+        converter.convert_multiple_files(files, '.2')
+    assert not (tmp_path / '2').exists()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_fan_out_writes_every_extension_from_one_read(tmp_path, executor):
+    """
+    Prueba que con varias extensiones el primer destino se copie y el resto se enlace.
+    """
+    files = make_images(tmp_path, 3)
+    converter = ImageConverter(max_workers=2, executor=executor)
+
+    assert converter.convert_multiple_files(files, ['.1', '.3', '.5']) == (3, 0)
+
+    for i in range(3):
+        first = tmp_path / '1' / f'img_{i:03d}.1'
+        assert first.read_bytes() == bytes([i]) * 16
+        assert os.path.samefile(first, tmp_path / '3' / f'img_{i:03d}.3')
+        assert os.path.samefile(first, tmp_path / '5' / f'img_{i:03d}.5')
+    summary = converter.get_conversion_summary()
+    assert summary['total_converted'] == 9
+    assert summary['modes'] == {'copy': 3, 'hardlink': 6}
+    assert converter.target_path_for(files[0], '.5')[1] == tmp_path / '5' / 'img_000.5'
+
+
+def test_parallel_conversion_with_device_scheduler(tmp_path):
+    """
+    Prueba que el planificador por dispositivo convierta todos los archivos.
+    """
+    files = make_images(tmp_path, 20)
+    converter = ImageConverter(max_workers=4, device_workers=2, io_order='physical')
+
+    assert converter.convert_multiple_files(files, '.6') == (20, 0)
+    assert len(os.listdir(tmp_path / '6')) == 20
+
+
+@pytest.mark.parametrize("cache_policy", ['normal', 'nocache', 'direct'])
+def test_python_copy_reuses_buffer_with_cache_policies(tmp_path, monkeypatch, cache_policy):
+    """
+    Prueba que el bucle en Python copie con su búfer reutilizable en cualquier
+    política de caché.
+    """
+    from src import copy_backends
+
+    monkeypatch.setattr(copy_backends, 'WRITEBACK_WINDOW', 64 * 1024)
+    monkeypatch.setattr(copy_backends, 'DIRECT_IO_MIN_SIZE', 0)
+    data = os.urandom(300 * 1024 + 7)
+    (tmp_path / 'big.png').write_bytes(data)
+
+    for name in ['a.1', 'b.1']:
+        used = copy_file(str(tmp_path / 'big.png'), str(tmp_path / name), ('python',),
+                         chunk_size=4096, cache_policy=cache_policy)
+        assert used == 'python'
+        assert (tmp_path / name).read_bytes() == data
+    buffer = copy_backends._copy_buffer()
+    assert buffer is copy_backends._copy_buffer()
+    assert len(buffer) == copy_backends.MAX_CHUNK_SIZE
+
+
+@pytest.mark.parametrize("transcode", [False, True])
+def test_checksum_is_computed_while_copying(tmp_path, transcode):
+    """
+    Prueba que el hash del destino se calcule en la copia y se guarde en los registros.
+    """
+    from src.hashing import file_digest
+
+    files = make_images(tmp_path, 2, size=5000)
+    if transcode:
+        from PIL import Image
+        Image.new('RGB', (8, 8), 'red').save(files[0], 'JPEG')
+        files = files[:1]
+    options = TranscodeOptions('PNG') if transcode else None
+    converter = ImageConverter(verify=True, transcode=options, fan_out_mode='copy')
+
+    assert converter.convert_multiple_files(files, ['.1', '.2']) == (len(files), 0)
+    for record in converter.get_conversion_summary()['converted']:
+        assert record['digest'] == file_digest(record['converted'])
+        assert record.as_dict()['digest'] == record['digest']
+    assert converter.last_digest(files[0]) == file_digest(str(tmp_path / '1' / 'img_000.1'))
+
+
+def test_atomic_writes_remove_stale_temporaries(tmp_path):
+    """
+    Prueba que los temporales de un proceso muerto se borren y no queden
+    temporales nuevos.
+    """
+    import subprocess
+
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    files = make_images(tmp_path, 2)
+    (tmp_path / '1').mkdir()
+    (tmp_path / '1' / f'.img_000.1.{dead.pid}-1.tmp').write_bytes(b'partial')
+
+    converter = ImageConverter(fsync_policy='file')
+    assert converter.convert_multiple_files(files, '.1') == (2, 0)
+    assert sorted(os.listdir(tmp_path / '1')) == ['img_000.1', 'img_001.1']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
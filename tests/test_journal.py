@@ -0,0 +1,67 @@
+"""
+Pruebas unitarias para el diario de trabajo.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.image_converter import ImageConverter
+from src.journal import ConversionJournal
+
+
+def test_journal_resumes_interrupted_job(tmp_path):
+    """
+    Prueba que un trabajo cancelado continúe donde se quedó con el mismo diario.
+    """
+    files = []
+    for i in range(6):
+        path = tmp_path / f"img_{i:03d}.jpg"
+        path.write_bytes(bytes([i]) * 16)
+        files.append(str(path))
+    journal = str(tmp_path / "job.journal")
+    converter = ImageConverter(journal_path=journal, fsync_policy='batch')
+
+    processed = []
+    converter.convert_multiple_files(
+        files, '.2', progress_callback=lambda *args: processed.append(args[2]),
+        should_cancel=lambda: len(processed) >= 2)
+    assert processed == files[:2]
+
+    assert converter.convert_multiple_files(files, '.2') == (6, 0)
+    assert converter.get_conversion_summary()['total_skipped'] == 2
+    assert converter.get_conversion_summary()['total_converted'] == 4
+    with open(journal) as f:
+        assert f.read().splitlines()[-1] == '{"done": true}'
+
+
+def test_journal_forgets_changed_files_and_other_jobs(tmp_path):
+    """
+    Prueba que un archivo modificado o un diario de otras extensiones no se
+    den por terminados.
+    """
+    source = tmp_path / 'a.jpg'
+    source.write_bytes(b'data')
+    path = str(tmp_path / 'job.journal')
+
+    journal = ConversionJournal(path, ['.1'])
+    journal.record(str(source), os.stat(source))
+    journal.close()
+
+    resumed = ConversionJournal(path, ['.1'])
+    assert resumed.is_done(str(source), os.stat(source))
+    source.write_bytes(b'changed')
+    assert not resumed.is_done(str(source), os.stat(source))
+    resumed.close()
+
+    other = ConversionJournal(path, ['.2'])
+    assert not other.completed
+    other.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
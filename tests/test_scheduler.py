@@ -0,0 +1,46 @@
+"""
+Pruebas unitarias para el planificador de E/S por dispositivo.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.planner import PlannedFile
+from src.scheduler import LARGE_FILE_SIZE, DeviceScheduler
+
+
+def planned(name, dev, ino, size):
+    """
+    Crear un archivo planificado con un stat sintético.
+    """
+    item = PlannedFile(name)
+    item.stat = os.stat_result((0o100644, ino, dev, 1, 0, 0, size, 0, 0, 0))
+    return item
+
+
+def test_device_scheduler_limits_each_device_and_orders_files():
+    """
+    Prueba que cada dispositivo respete su límite y que los archivos grandes
+    vayan primero y el resto por inodo.
+    """
+    items = [planned('a3', 1, 30, 10), planned('a1', 1, 10, 10),
+             planned('big', 1, 90, LARGE_FILE_SIZE), planned('b1', 2, 5, 10),
+             planned('b2', 2, 6, 10)]
+    scheduler = DeviceScheduler(items, per_device=1, order='inode')
+
+    first, second = scheduler.next_ready(), scheduler.next_ready()
+    assert (first.source, second.source) == ('big', 'b1')
+    assert scheduler.next_ready() is None
+    scheduler.finished(second)
+    assert scheduler.next_ready().source == 'b2'
+    scheduler.finished(first)
+    assert [item.source for item in scheduler] == ['a1', 'a3']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
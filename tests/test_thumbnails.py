@@ -0,0 +1,81 @@
+"""
+Pruebas unitarias para las miniaturas de la vista previa.
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.thumbnails import DiskThumbnailCache, ThumbnailCache, ThumbnailWorker, make_thumbnail
+from src.transcoder import ImageTooLargeError
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_cache_evicts_least_recently_used_within_byte_limit():
+    """
+    Prueba que al superar el límite se descarte la miniatura menos usada.
+    """
+    cache = ThumbnailCache(max_bytes=10)
+    cache.put(('a', 1, 1), b'aaaa')
+    cache.put(('b', 1, 1), b'bbbb')
+    assert cache.get(('a', 1, 1)) == b'aaaa'
+    cache.put(('c', 1, 1), b'cccc')
+    assert cache.get(('b', 1, 1)) is None
+    assert cache.get(('a', 1, 1)) == b'aaaa'
+    assert len(cache) == 2 and cache.size_bytes == 8
+
+
+def test_worker_generates_and_persists_thumbnails(tmp_path):
+    """
+    Prueba que las miniaturas se reduzcan, se guarden en disco y se reutilicen.
+    """
+    photo = tmp_path / 'photo.jpg'
+    Image.new('RGB', (1200, 800), 'red').save(photo)
+    (tmp_path / 'fake.png').write_bytes(b'no es una imagen')
+    disk_cache = DiskThumbnailCache(str(tmp_path / 'cache'))
+
+    worker = ThumbnailWorker(disk_cache=disk_cache, size=(64, 64))
+    worker.start()
+    try:
+        worker.request([str(photo), str(tmp_path / 'fake.png')])
+        results = dict(worker.results.get(timeout=10) for _ in range(2))
+    finally:
+        worker.close()
+    assert results[str(tmp_path / 'fake.png')] is None
+    with Image.open(io.BytesIO(results[str(photo)])) as thumbnail:
+        assert thumbnail.size == (64, 43)
+
+    # Otra sesión: con el mismo tamaño y fecha la miniatura sale del disco
+    # sin abrir la imagen (aquí ya ni siquiera es una imagen)
+    stat = os.stat(photo)
+    assert os.path.exists(disk_cache.path_for((str(photo), stat.st_size, stat.st_mtime_ns),
+                                              (64, 64)))
+    photo.write_bytes(bytes(stat.st_size))
+    os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    fresh = ThumbnailWorker(disk_cache=DiskThumbnailCache(str(tmp_path / 'cache')), size=(64, 64))
+    assert fresh.thumbnail(str(photo)) == results[str(photo)]
+    os.utime(photo, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert fresh.thumbnail(str(photo)) is None
+
+
+def test_thumbnail_respects_pixel_limit(tmp_path):
+    """
+    Prueba que una imagen con más píxeles que el límite no se decodifique y
+    que un JPEG se compruebe al tamaño reducido por draft().
+    """
+    Image.new('RGB', (400, 300)).save(tmp_path / 'wide.png')
+    Image.new('RGB', (1600, 1200)).save(tmp_path / 'photo.jpg')
+
+    with pytest.raises(ImageTooLargeError):
+        make_thumbnail(str(tmp_path / 'wide.png'), (64, 64), max_pixels=100_000)
+    make_thumbnail(str(tmp_path / 'photo.jpg'), (64, 64), max_pixels=100_000)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,64 @@
+"""
+Pruebas unitarias para el modo vigilancia.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.image_converter import ImageConverter
+from src.watcher import FolderWatcher, _load_libc
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(
+    _load_libc() is None, reason="inotify no disponible"))]
+
+
+@pytest.mark.parametrize("use_inotify", BACKENDS)
+def test_watcher_converts_new_and_modified_files(tmp_path, use_inotify):
+    """
+    Prueba que solo se conviertan los archivos que lleguen o cambien tras empezar.
+    """
+    (tmp_path / 'old.jpg').write_bytes(b'old')
+    watcher = FolderWatcher(ImageConverter(), str(tmp_path), '.1', debounce=0.0,
+                            poll_interval=0.0, use_inotify=use_inotify)
+    try:
+        watcher.start()
+        assert watcher.backend == ('inotify' if use_inotify else 'polling')
+        (tmp_path / 'new.png').write_bytes(b'new')
+        watcher.poll_once(0.1)
+        assert (tmp_path / '1' / 'new.1').read_bytes() == b'new'
+        assert not (tmp_path / '1' / 'old.1').exists()
+
+        (tmp_path / 'new.png').write_bytes(b'changed')
+        os.utime(tmp_path / 'new.png', ns=(0, 10 ** 9))
+        watcher.poll_once(0.1)
+        assert (tmp_path / '1' / 'new.1').read_bytes() == b'changed'
+        assert watcher.poll_once(0.0) and watcher.total_converted == 2
+        watcher.stop()
+        assert watcher.poll_once(None) is False
+    finally:
+        watcher.close()
+
+
+def test_watcher_waits_for_files_still_being_written(tmp_path):
+    """
+    Prueba que un archivo modificado hace menos de 'debounce' segundos espere.
+    """
+    watcher = FolderWatcher(ImageConverter(), str(tmp_path), '.2', debounce=60.0,
+                            poll_interval=0.0, use_inotify=False, process_existing=True)
+    try:
+        (tmp_path / 'partial.jpg').write_bytes(b'half')
+        watcher.start()
+        watcher.poll_once(0.0)
+        assert not (tmp_path / '2').exists()
+        assert list(watcher.pending) == [str(tmp_path / 'partial.jpg')]
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])